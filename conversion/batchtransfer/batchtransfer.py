@@ -0,0 +1,275 @@
+# $Id$
+
+# Copyright (C) 2008-2014, Roman Lygin. All rights reserved.
+# Copyright (C) 2014-2022, CADEX. All rights reserved.
+
+# This file is part of the CAD Exchanger software.
+
+# You may use this file under the terms of the BSD license as follows:
+
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+# * Redistributions of source code must retain the above copyright notice,
+# this list of conditions and the following disclaimer.
+# * Redistributions in binary form must reproduce the above copyright notice,
+# this list of conditions and the following disclaimer in the documentation
+# and/or other materials provided with the distribution.
+
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+
+
+import sys
+from pathlib import Path
+import os
+import time
+import json
+import heapq
+import multiprocessing
+
+import cadexchanger.CadExCore as cadex
+
+sys.path.append(os.path.abspath(os.path.dirname(Path(__file__).resolve()) + "/../../"))
+import cadex_license as license
+sys.path.append(os.path.abspath(os.path.dirname(Path(__file__).resolve()) + "/../common"))
+from instrumentation import ConversionRecorder
+
+
+# Set once per worker process by InitWorker()
+gIsLicenseActivated = False
+
+# Every worker process activates the license only once and then converts
+# many files. The pool recycles the worker after a given number of jobs
+def InitWorker():
+    global gIsLicenseActivated
+    gIsLicenseActivated = cadex.LicenseManager.Activate(license.Value())
+
+# Appends the target extension to the source file name, so that a.stp and a.jt converted
+# to the same format do not overwrite each other (a.stp.jt and a.jt.jt)
+def DestinationName(theSource: Path, theExtension: str) -> str:
+    return theSource.name + theExtension
+
+# Directory input converts every file found in it (recursively), keeping the relative layout.
+# Any other input is treated as a manifest: one source path per line, optionally followed
+# by a tab and the destination path. Empty lines and lines starting with '#' are skipped
+def CollectJobs(theInput: str, theOutputDir: str, theExtension: str) -> list:
+    if not theExtension.startswith("."):
+        theExtension = "." + theExtension
+
+    aJobs = []
+    anInput = Path(theInput)
+    if anInput.is_dir():
+        for aSource in sorted(anInput.rglob("*")):
+            if aSource.is_file():
+                aRelative = aSource.relative_to(anInput)
+                aDest = Path(theOutputDir) / aRelative.parent / DestinationName(aRelative, theExtension)
+                aJobs.append((str(aSource), str(aDest)))
+        return aJobs
+
+    with open(anInput, encoding="utf-8") as aManifest:
+        for aLine in aManifest:
+            aLine = aLine.strip()
+            if not aLine or aLine.startswith("#"):
+                continue
+            aFields = aLine.split("\t")
+            aSource = anInput.parent / aFields[0]
+            if len(aFields) > 1:
+                aDest = Path(theOutputDir) / aFields[1]
+            else:
+                aDest = Path(theOutputDir) / DestinationName(Path(aFields[0]), theExtension)
+            aJobs.append((str(aSource.resolve()), str(aDest.resolve())))
+    return aJobs
+
+# Returns destinations that more than one job would write, e.g. two manifest lines with
+# files of the same name from different directories
+def DuplicateDestinations(theJobs: list) -> dict:
+    aSources = {}
+    for aSource, aDest in theJobs:
+        aSources.setdefault(aDest, []).append(aSource)
+    return {aDest: aList for aDest, aList in aSources.items() if len(aList) > 1}
+
+# Converts a single file inside a worker process and reports how long it took.
+# Any error is reported in the result with status "failed", so that one broken
+# file does not stop the whole batch
+def ConvertFile(theJob: tuple) -> dict:
+    aSource, aDest = theJob
+    aResult = {"source": aSource, "dest": aDest, "pid": os.getpid(),
+               "size": 0, "seconds": 0.0, "status": "ok", "message": ""}
+
+    def Fail(theMessage: str) -> dict:
+        aResult["status"] = "failed"
+        aResult["message"] = theMessage
+        return aResult
+
+    try:
+        aResult["size"] = os.path.getsize(aSource)
+    except OSError as anError:
+        return Fail(str(anError))
+
+    if not gIsLicenseActivated:
+        return Fail("Failed to activate CAD Exchanger license.")
+
+    aRecorder = ConversionRecorder("batchtransfer", aSource, aDest)
+    aStart = time.perf_counter()
+
+    try:
+        aModel = cadex.ModelData_Model()
+        with aRecorder.Phase("read"):
+            anIsRead = cadex.ModelData_ModelReader().Read(cadex.Base_UTF16String(aSource), aModel)
+        if not anIsRead:
+            Fail("Failed to open and convert the file")
+        else:
+            os.makedirs(os.path.dirname(aDest), exist_ok=True)
+            with aRecorder.Phase("write"):
+                anIsWritten = cadex.ModelData_ModelWriter().Write(aModel, cadex.Base_UTF16String(aDest))
+            if not anIsWritten:
+                Fail("Failed to convert and write the file to specified format")
+    except Exception as anError:
+        Fail(f"{type(anError).__name__}: {anError}")
+
+    aResult["seconds"] = time.perf_counter() - aStart
+    aRecorder.Finish(0 if aResult["status"] == "ok" else 1)
+    return aResult
+
+# Estimates conversion time of a file from its size and format using timings of previous runs.
+# A file converted before is expected to take as long as last time, other files are estimated
+# from the average seconds per megabyte of their format (or of all formats if the format is new)
+class JobCostModel:
+    myDefaultSecondsPerMB = 1.0
+
+    def __init__(self, thePath: str):
+        self.myPath = thePath
+        self.myHistory = {"files": {}, "formats": {}}
+        if os.path.exists(thePath):
+            with open(thePath, encoding="utf-8") as aFile:
+                self.myHistory = json.load(aFile)
+
+    @staticmethod
+    def Format(theSource: str) -> str:
+        return os.path.splitext(theSource)[1].lower()
+
+    def SecondsPerMB(self, theFormat: str) -> float:
+        aFormats = self.myHistory["formats"]
+        if theFormat in aFormats:
+            aStats = aFormats[theFormat]
+        elif aFormats:
+            aStats = {"seconds": sum(s["seconds"] for s in aFormats.values()),
+                      "megabytes": sum(s["megabytes"] for s in aFormats.values())}
+        else:
+            return self.myDefaultSecondsPerMB
+        return aStats["seconds"] / aStats["megabytes"] if aStats["megabytes"] > 0 else self.myDefaultSecondsPerMB
+
+    # A file that cannot be accessed gets the default estimate of a megabyte,
+    # ConvertFile() then reports it as failed
+    def Estimate(self, theSource: str) -> float:
+        try:
+            aSize = os.path.getsize(theSource)
+        except OSError:
+            return self.myDefaultSecondsPerMB
+        aFile = self.myHistory["files"].get(theSource)
+        if aFile and aFile["size"] == aSize:
+            return aFile["seconds"]
+        return aSize / (1024 * 1024) * self.SecondsPerMB(self.Format(theSource))
+
+    def Update(self, theResult: dict):
+        self.myHistory["files"][theResult["source"]] = {"size": theResult["size"], "seconds": theResult["seconds"]}
+        aStats = self.myHistory["formats"].setdefault(self.Format(theResult["source"]), {"seconds": 0.0, "megabytes": 0.0})
+        aStats["seconds"] += theResult["seconds"]
+        aStats["megabytes"] += theResult["size"] / (1024 * 1024)
+
+    def Save(self):
+        os.makedirs(os.path.dirname(self.myPath), exist_ok=True)
+        with open(self.myPath, "w", encoding="utf-8") as aFile:
+            json.dump(self.myHistory, aFile, indent=1)
+
+# Simulates longest-first list scheduling: every job goes to the worker that becomes free first
+def PredictMakespan(theCosts: list, theNumberOfWorkers: int) -> float:
+    aWorkers = [0.0] * theNumberOfWorkers
+    for aCost in sorted(theCosts, reverse=True):
+        heapq.heappush(aWorkers, heapq.heappop(aWorkers) + aCost)
+    return max(aWorkers)
+
+def PrintResult(theResult: dict):
+    aMegabytes = theResult["size"] / (1024 * 1024)
+    aThroughput = aMegabytes / theResult["seconds"] if theResult["seconds"] > 0 else 0.0
+    aStatus = theResult["status"]
+    if theResult["message"]:
+        aStatus += " (" + theResult["message"] + ")"
+    print(f"[{theResult['pid']}] {theResult['source']}: {aStatus}, "
+          f"{theResult['seconds']:.2f} s, {aMegabytes:.2f} MB, {aThroughput:.2f} MB/s")
+
+def main(theInput: str, theOutputDir: str, theExtension: str,
+         theNumberOfWorkers: int = os.cpu_count(), theJobsPerWorker: int = 50, theHistoryPath: str = None):
+    aJobs = CollectJobs(theInput, theOutputDir, theExtension)
+    if not aJobs:
+        print("No files to convert in " + theInput)
+        return 1
+
+    aDuplicates = DuplicateDestinations(aJobs)
+    if aDuplicates:
+        for aDest, aSources in aDuplicates.items():
+            print(f"Several files would be converted to {aDest}: " + ", ".join(aSources))
+        print("Specify distinct destinations for them in the manifest")
+        return 1
+
+    # Longest jobs go first so that no worker is left with a big file at the end of the batch
+    aCostModel = JobCostModel(theHistoryPath or os.path.join(theOutputDir, "batch_timings.json"))
+    anEstimates = {aJob: aCostModel.Estimate(aJob[0]) for aJob in aJobs}
+    aJobs.sort(key=lambda aJob: anEstimates[aJob], reverse=True)
+    aPredictedMakespan = PredictMakespan(list(anEstimates.values()), theNumberOfWorkers)
+
+    print(f"Conversion of {len(aJobs)} files started on {theNumberOfWorkers} workers...")
+
+    aStart = time.perf_counter()
+    aNumberOfFailed = 0
+    aTotalSize = 0
+
+    with multiprocessing.Pool(theNumberOfWorkers, initializer=InitWorker,
+                              maxtasksperchild=theJobsPerWorker) as aPool:
+        # chunksize=1 hands the jobs out one by one in the sorted order
+        for aResult in aPool.imap_unordered(ConvertFile, aJobs, chunksize=1):
+            PrintResult(aResult)
+            aTotalSize += aResult["size"]
+            if aResult["status"] != "ok":
+                aNumberOfFailed += 1
+            else:
+                aCostModel.Update(aResult)
+
+    anElapsed = time.perf_counter() - aStart
+    aCostModel.Save()
+    aMegabytes = aTotalSize / (1024 * 1024)
+    print(f"Converted {len(aJobs) - aNumberOfFailed} of {len(aJobs)} files in {anElapsed:.2f} s: "
+          f"{len(aJobs) / anElapsed:.2f} files/s, {aMegabytes / anElapsed:.2f} MB/s")
+    print(f"Makespan: predicted {aPredictedMakespan:.2f} s, actual {anElapsed:.2f} s")
+
+    print("Completed")
+    return 0 if aNumberOfFailed == 0 else 1
+
+if __name__ == "__main__":
+    if len(sys.argv) < 4 or len(sys.argv) > 6:
+        print("Usage: " + os.path.abspath(Path(__file__).resolve()) +
+              " <input> <output_dir> <extension> [<workers>] [<jobs_per_worker>], where:")
+        print("    <input>           is a directory with files to convert or a manifest file listing them")
+        print("    <output_dir>      is a directory where converted files are saved")
+        print("    <extension>       is an extension of the target format, e.g. jt")
+        print("    <workers>         is a number of worker processes, defaults to the number of CPUs")
+        print("    <jobs_per_worker> is a number of files a worker converts before it is restarted, defaults to 50")
+        print("Timings of converted files are kept in <output_dir>/batch_timings.json to convert the longest files first.")
+        sys.exit(1)
+
+    anInput = os.path.abspath(sys.argv[1])
+    anOutputDir = os.path.abspath(sys.argv[2])
+    aNumberOfWorkers = int(sys.argv[4]) if len(sys.argv) > 4 else os.cpu_count()
+    aJobsPerWorker = int(sys.argv[5]) if len(sys.argv) > 5 else 50
+
+    sys.exit(main(anInput, anOutputDir, sys.argv[3], aNumberOfWorkers, aJobsPerWorker))
@@ -0,0 +1,210 @@
+# $Id$
+
+# Copyright (C) 2008-2014, Roman Lygin. All rights reserved.
+# Copyright (C) 2014-2022, CADEX. All rights reserved.
+
+# This file is part of the CAD Exchanger software.
+
+# You may use this file under the terms of the BSD license as follows:
+
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+# * Redistributions of source code must retain the above copyright notice,
+# this list of conditions and the following disclaimer.
+# * Redistributions in binary form must reproduce the above copyright notice,
+# this list of conditions and the following disclaimer in the documentation
+# and/or other materials provided with the distribution.
+
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+
+
+import sys
+from pathlib import Path
+import os
+import json
+import math
+import platform
+import shutil
+import statistics
+import subprocess
+import tempfile
+import time
+
+aRootDir = os.path.abspath(os.path.dirname(Path(__file__).resolve()) + "/../../")
+
+
+# Conversion paths: example directory, module, whether it accepts the source and the destination file name
+PATHS = {
+    "transfer":       ("conversion/transfer",       "transfer",       lambda theSource: True,
+                       lambda theName: theName + ".jt"),
+    "import":         ("conversion/import",         "importexample",  lambda theSource: theSource.suffix.lower() in (".stp", ".step"),
+                       lambda theName: theName + ".xml"),
+    "export":         ("conversion/export",         "export",         lambda theSource: True,
+                       lambda theName: theName + ".obj"),
+    "cdxfbconverter": ("conversion/cdxfbconverter", "cdxfbconverter", lambda theSource: True,
+                       lambda theName: os.path.join(theName + ".cdxfb", "scenegraph.cdxfb")),
+}
+
+# Every run is a separate process, as if the example was started from the command line.
+# Peak memory and phase timings come from the instrumentation record of that process
+def RunOnce(thePath: str, theSource: Path, theWorkDir: str) -> dict:
+    anExampleDir, aModule, _, aDestName = PATHS[thePath]
+    aDestDir = tempfile.mkdtemp(dir=theWorkDir)
+    aDest = os.path.join(aDestDir, aDestName(theSource.stem))
+    os.makedirs(os.path.dirname(aDest), exist_ok=True)
+    aRecordPath = os.path.join(aDestDir, "record.jsonl")
+
+    aScript = (f"import sys; sys.path.insert(0, {os.path.join(aRootDir, anExampleDir)!r}); import {aModule}; "
+               f"sys.exit({aModule}.main({str(theSource)!r}, {aDest!r}))")
+    anEnvironment = dict(os.environ, CADEX_INSTRUMENTATION=aRecordPath)
+
+    aStart = time.perf_counter()
+    aProcess = subprocess.run([sys.executable, "-c", aScript], env=anEnvironment,
+                              stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    aLatency = time.perf_counter() - aStart
+
+    aRecord = {}
+    if os.path.exists(aRecordPath):
+        with open(aRecordPath, encoding="utf-8") as aFile:
+            aRecord = json.loads(aFile.readline())
+        os.remove(aRecordPath)
+
+    anOutputSize = sum(f.stat().st_size for f in Path(aDestDir).rglob("*") if f.is_file())
+    shutil.rmtree(aDestDir, ignore_errors=True)
+
+    return {"status": aProcess.returncode, "latency": aLatency, "output_size": anOutputSize,
+            "peak_rss": aRecord.get("peak_rss"),
+            "phases": {aName: aPhase["wall"] for aName, aPhase in aRecord.get("phases", {}).items()}}
+
+# Nearest-rank percentile. For p95 of fewer than 20 values it is the maximum,
+# so results keep the number of runs next to it
+def Percentile(theValues: list, thePercent: float) -> float:
+    aSorted = sorted(theValues)
+    return aSorted[max(0, math.ceil(thePercent / 100 * len(aSorted)) - 1)]
+
+def Summarize(theRuns: list) -> dict:
+    if any(aRun["status"] != 0 for aRun in theRuns):
+        return {"status": "failed", "runs": len(theRuns)}
+
+    aLatencies = [aRun["latency"] for aRun in theRuns]
+    aPeakRSS = [aRun["peak_rss"] for aRun in theRuns if aRun["peak_rss"] is not None]
+    aPhases = {}
+    for aRun in theRuns:
+        for aName, aWall in aRun["phases"].items():
+            aPhases.setdefault(aName, []).append(aWall)
+
+    aSummary = {
+        "status": "ok",
+        "runs": len(theRuns),
+        "latency_median": statistics.median(aLatencies),
+        "latency_p95": Percentile(aLatencies, 95),
+        "output_size": theRuns[-1]["output_size"],
+        "peak_rss": max(aPeakRSS) if aPeakRSS else None,
+        "phases_median": {aName: statistics.median(aWalls) for aName, aWalls in aPhases.items()},
+    }
+    return aSummary
+
+def Run(theResultsPath: str, theRepeats: int = 5, theWarmup: int = 1) -> int:
+    aModels = sorted(p for p in Path(aRootDir, "models").iterdir() if p.is_file())
+    aResults = {
+        "environment": {"python": platform.python_version(), "platform": platform.platform(),
+                        "repeats": theRepeats, "warmup": theWarmup, "timestamp": time.time()},
+        "results": {},
+    }
+
+    aWorkDir = tempfile.mkdtemp(prefix="cadex_benchmark_")
+    try:
+        for aPath, (_, _, anIsApplicable, _) in PATHS.items():
+            for aModel in aModels:
+                if not anIsApplicable(aModel):
+                    continue
+                for i in range(theWarmup):
+                    RunOnce(aPath, aModel, aWorkDir)
+                aRuns = [RunOnce(aPath, aModel, aWorkDir) for i in range(theRepeats)]
+
+                aSummary = Summarize(aRuns)
+                aResults["results"][f"{aPath}/{aModel.name}"] = aSummary
+                if aSummary["status"] == "ok":
+                    print(f"{aPath}/{aModel.name}: median {aSummary['latency_median']:.2f} s, "
+                          f"p95 {aSummary['latency_p95']:.2f} s of {aSummary['runs']} runs, "
+                          f"output {aSummary['output_size']} bytes, "
+                          f"peak RSS {aSummary['peak_rss']}")
+                else:
+                    print(f"{aPath}/{aModel.name}: failed")
+    finally:
+        shutil.rmtree(aWorkDir, ignore_errors=True)
+
+    with open(theResultsPath, "w", encoding="utf-8") as aFile:
+        json.dump(aResults, aFile, indent=1)
+
+    print("Completed")
+    return 0
+
+# Flags benchmarks whose median or p95 latency or peak memory grew by more than theThreshold percent,
+# benchmarks that succeeded in the baseline but fail now and benchmarks missing from the current
+# results. Benchmarks missing from the baseline are reported as added
+def Compare(theBaselinePath: str, theCurrentPath: str, theThreshold: float = 10.0) -> int:
+    with open(theBaselinePath, encoding="utf-8") as aFile:
+        aBaseline = json.load(aFile)["results"]
+    with open(theCurrentPath, encoding="utf-8") as aFile:
+        aCurrent = json.load(aFile)["results"]
+
+    aNumberOfRegressions = 0
+    for aName in sorted(set(aBaseline) - set(aCurrent)):
+        print(f"REMOVED {aName}: missing from the current results")
+        aNumberOfRegressions += 1
+    for aName in sorted(set(aCurrent) - set(aBaseline)):
+        print(f"ADDED {aName}: missing from the baseline")
+
+    for aName in sorted(set(aBaseline) & set(aCurrent)):
+        aBefore = aBaseline[aName]
+        anAfter = aCurrent[aName]
+        if aBefore["status"] != "ok":
+            continue
+        if anAfter["status"] != "ok":
+            print(f"REGRESSION {aName}: conversion fails")
+            aNumberOfRegressions += 1
+            continue
+
+        # Results written without some metric (e.g. p95 by older versions) are compared on the rest
+        for aMetric in ("latency_median", "latency_p95", "peak_rss"):
+            if not aBefore.get(aMetric) or anAfter.get(aMetric) is None:
+                continue
+            aChange = (anAfter[aMetric] - aBefore[aMetric]) / aBefore[aMetric] * 100
+            aMark = "REGRESSION" if aChange > theThreshold else "ok"
+            if aMark != "ok":
+                aNumberOfRegressions += 1
+            print(f"{aMark} {aName}: {aMetric} {aBefore[aMetric]:.6g} -> {anAfter[aMetric]:.6g} ({aChange:+.1f}%)")
+
+    print(f"{aNumberOfRegressions} regressions found")
+    return 0 if aNumberOfRegressions == 0 else 1
+
+
+def main(theArgs: list):
+    if len(theArgs) >= 2 and theArgs[0] == "run" and len(theArgs) <= 4:
+        return Run(os.path.abspath(theArgs[1]), *[int(anArg) for anArg in theArgs[2:]])
+    if len(theArgs) >= 3 and theArgs[0] == "compare" and len(theArgs) <= 4:
+        return Compare(os.path.abspath(theArgs[1]), os.path.abspath(theArgs[2]), *[float(anArg) for anArg in theArgs[3:]])
+
+    print("Usage: " + os.path.abspath(Path(__file__).resolve()) + " run <results_file> [<repeats>] [<warmup>]")
+    print("       " + os.path.abspath(Path(__file__).resolve()) + " compare <baseline_file> <results_file> [<threshold>], where:")
+    print("    <results_file>  is a JSON file with benchmark results")
+    print("    <repeats>       is a number of measured runs of every conversion, defaults to 5")
+    print("    <warmup>        is a number of runs made before measuring, defaults to 1")
+    print("    <baseline_file> is a JSON file with results to compare against")
+    print("    <threshold>     is an allowed growth of median and p95 latency and peak memory in percent, defaults to 10")
+    return 1
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
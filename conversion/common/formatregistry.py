@@ -0,0 +1,100 @@
+# $Id$
+
+# Copyright (C) 2008-2014, Roman Lygin. All rights reserved.
+# Copyright (C) 2014-2022, CADEX. All rights reserved.
+
+# This file is part of the CAD Exchanger software.
+
+# You may use this file under the terms of the BSD license as follows:
+
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+# * Redistributions of source code must retain the above copyright notice,
+# this list of conditions and the following disclaimer.
+# * Redistributions in binary form must reproduce the above copyright notice,
+# this list of conditions and the following disclaimer in the documentation
+# and/or other materials provided with the distribution.
+
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+
+
+import importlib
+import os
+
+
+# Maps file extensions to the SDK format modules and their reader/writer classes.
+# A format module is imported on first use only, so that a conversion pays the import
+# cost of the formats it actually uses. None means the format has no such class
+class FormatRegistry:
+    #             extension:  (module,                   reader,        reader parameters,       writer,        writer parameters)
+    myFormats = { ".stp":     ("cadexchanger.CadExSTEP", "STEP_Reader", "STEP_ReaderParameters", "STEP_Writer", "STEP_WriterParameters"),
+                  ".step":    ("cadexchanger.CadExSTEP", "STEP_Reader", "STEP_ReaderParameters", "STEP_Writer", "STEP_WriterParameters"),
+                  ".jt":      ("cadexchanger.CadExJT",   "JT_Reader",   "JT_ReaderParameters",   "JT_Writer",   "JT_WriterParameters"),
+                  ".obj":     ("cadexchanger.CadExOBJ",  "OBJ_Reader",  "OBJ_ReaderParameters",  "OBJ_Writer",  "OBJ_WriterParameters"),
+                  ".sat":     ("cadexchanger.CadExACIS", "ACIS_Reader", "ACIS_ReaderParameters", "ACIS_Writer", "ACIS_WriterParameters"),
+                  ".sab":     ("cadexchanger.CadExACIS", "ACIS_Reader", "ACIS_ReaderParameters", "ACIS_Writer", "ACIS_WriterParameters"),
+                  ".igs":     ("cadexchanger.CadExIGES", "IGES_Reader", "IGES_ReaderParameters", "IGES_Writer", "IGES_WriterParameters"),
+                  ".iges":    ("cadexchanger.CadExIGES", "IGES_Reader", "IGES_ReaderParameters", "IGES_Writer", "IGES_WriterParameters"),
+                  ".stl":     ("cadexchanger.CadExSTL",  "STL_Reader",  "STL_ReaderParameters",  "STL_Writer",  "STL_WriterParameters"),
+                  ".wrl":     ("cadexchanger.CadExVRML", "VRML_Reader", "VRML_ReaderParameters", "VRML_Writer", "VRML_WriterParameters"),
+                }
+    myModules = {}
+
+    # Accepts either an extension (".jt", "jt") or a file name
+    @classmethod
+    def Extension(cls, theName: str) -> str:
+        anExtension = os.path.splitext(theName)[1] or theName
+        anExtension = anExtension.lower()
+        return anExtension if anExtension.startswith(".") else "." + anExtension
+
+    @classmethod
+    def IsSupported(cls, theName: str) -> bool:
+        return cls.Extension(theName) in cls.myFormats
+
+    @classmethod
+    def Module(cls, theName: str):
+        aModuleName = cls.myFormats[cls.Extension(theName)][0]
+        aModule = cls.myModules.get(aModuleName)
+        if aModule is None:
+            aModule = importlib.import_module(aModuleName)
+            cls.myModules[aModuleName] = aModule
+        return aModule
+
+    @classmethod
+    def Class(cls, theName: str, theIndex: int):
+        aClassName = cls.myFormats[cls.Extension(theName)][theIndex]
+        if aClassName is None:
+            return None
+        return getattr(cls.Module(theName), aClassName)
+
+    @classmethod
+    def Reader(cls, theName: str):
+        return cls.Class(theName, 1)()
+
+    @classmethod
+    def ReaderParameters(cls, theName: str):
+        return cls.Class(theName, 2)()
+
+    @classmethod
+    def Writer(cls, theName: str):
+        return cls.Class(theName, 3)()
+
+    @classmethod
+    def WriterParameters(cls, theName: str):
+        return cls.Class(theName, 4)()
+
+    # Names of the format modules imported so far
+    @classmethod
+    def LoadedModules(cls) -> list:
+        return sorted(cls.myModules)
@@ -0,0 +1,180 @@
+# $Id$
+
+# Copyright (C) 2008-2014, Roman Lygin. All rights reserved.
+# Copyright (C) 2014-2022, CADEX. All rights reserved.
+
+# This file is part of the CAD Exchanger software.
+
+# You may use this file under the terms of the BSD license as follows:
+
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+# * Redistributions of source code must retain the above copyright notice,
+# this list of conditions and the following disclaimer.
+# * Redistributions in binary form must reproduce the above copyright notice,
+# this list of conditions and the following disclaimer in the documentation
+# and/or other materials provided with the distribution.
+
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+
+
+import sys
+import os
+import json
+import threading
+import time
+
+try:
+    import resource
+except ImportError:
+    # Not available on Windows, process peak memory is not reported there
+    resource = None
+
+
+# Returns the peak resident set size of the process in bytes over its whole lifetime.
+# A worker converting many files reports the largest of them here, not the current one
+def ProcessPeakRSS():
+    if resource is None:
+        return None
+    aMaxRSS = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS reports bytes
+    return aMaxRSS if sys.platform == "darwin" else aMaxRSS * 1024
+
+# Returns the current resident set size of the process in bytes, None where /proc is not available
+def CurrentRSS():
+    try:
+        with open("/proc/self/statm", encoding="ascii") as aFile:
+            return int(aFile.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+# Samples the current RSS in a background thread and keeps the peak of every open interval,
+# so that the peak of one conversion (or phase) does not include memory used before it started.
+# Spikes shorter than the sampling interval may be missed
+class RSSSampler:
+    def __init__(self, theInterval: float = 0.01):
+        self.myInterval = theInterval
+        self.myPeaks = {}
+        self.myLock = threading.Lock()
+        self.myStopEvent = threading.Event()
+        self.myThread = threading.Thread(target=self.Run, daemon=True)
+
+    @staticmethod
+    def IsAvailable() -> bool:
+        return CurrentRSS() is not None
+
+    def Start(self):
+        self.myThread.start()
+
+    def Stop(self):
+        self.myStopEvent.set()
+        self.myThread.join()
+
+    def Open(self, theName: str):
+        with self.myLock:
+            self.myPeaks[theName] = CurrentRSS()
+
+    # Returns the peak RSS since Open(theName)
+    def Close(self, theName: str) -> int:
+        aRSS = CurrentRSS()
+        with self.myLock:
+            return max(self.myPeaks.pop(theName), aRSS)
+
+    def Run(self):
+        while not self.myStopEvent.wait(self.myInterval):
+            aRSS = CurrentRSS()
+            with self.myLock:
+                for aName, aPeak in self.myPeaks.items():
+                    if aRSS > aPeak:
+                        self.myPeaks[aName] = aRSS
+
+
+class PhaseTimer:
+    def __init__(self, theRecorder, theName: str):
+        self.myRecorder = theRecorder
+        self.myName = theName
+
+    def __enter__(self):
+        if self.myRecorder.mySampler:
+            self.myRecorder.mySampler.Open(self.myName)
+        self.myWallStart = time.perf_counter()
+        self.myCPUStart = time.process_time()
+        return self
+
+    def __exit__(self, theType, theValue, theTraceback):
+        aSampler = self.myRecorder.mySampler
+        self.myRecorder.myPhases[self.myName] = {
+            "wall": time.perf_counter() - self.myWallStart,
+            "cpu": time.process_time() - self.myCPUStart,
+            "peak_rss": aSampler.Close(self.myName) if aSampler else None,
+        }
+        return False
+
+
+# Records wall time, CPU time and peak memory of conversion phases (license activation, read, transfer, write).
+# Instrumentation is opt-in: a JSON line per converted file is appended to the file named by
+# the CADEX_INSTRUMENTATION environment variable, nothing is written when it is not set.
+# peak_rss is sampled while the file is converted (Linux only, None elsewhere);
+# process_peak_rss is the high-water mark of the whole process, which is the same only
+# when the process converts a single file
+class ConversionRecorder:
+    def __init__(self, theEntryPoint: str, theSource: str, theDest: str = None, thePath: str = None):
+        self.myPath = thePath if thePath is not None else os.environ.get("CADEX_INSTRUMENTATION")
+        self.myEntryPoint = theEntryPoint
+        self.mySource = theSource
+        self.myDest = theDest
+        self.myPhases = {}
+        self.mySampler = None
+        if self.IsEnabled() and RSSSampler.IsAvailable():
+            self.mySampler = RSSSampler()
+            self.mySampler.Open("conversion")
+            self.mySampler.Start()
+        self.myWallStart = time.perf_counter()
+        self.myCPUStart = time.process_time()
+
+    def IsEnabled(self) -> bool:
+        return bool(self.myPath)
+
+    def Phase(self, theName: str) -> PhaseTimer:
+        return PhaseTimer(self, theName)
+
+    # Writes the record and returns theStatus so that it can be used as `return aRecorder.Finish(1)`
+    def Finish(self, theStatus: int) -> int:
+        if not self.IsEnabled():
+            return theStatus
+
+        aPeakRSS = None
+        if self.mySampler:
+            aPeakRSS = self.mySampler.Close("conversion")
+            self.mySampler.Stop()
+
+        aRecord = {
+            "timestamp": time.time(),
+            "entry_point": self.myEntryPoint,
+            "source": self.mySource,
+            "source_format": os.path.splitext(self.mySource)[1].lower().lstrip("."),
+            "source_size": os.path.getsize(self.mySource) if os.path.exists(self.mySource) else None,
+            "dest": self.myDest,
+            "dest_format": os.path.splitext(self.myDest)[1].lower().lstrip(".") if self.myDest else None,
+            "status": theStatus,
+            "wall": time.perf_counter() - self.myWallStart,
+            "cpu": time.process_time() - self.myCPUStart,
+            "peak_rss": aPeakRSS,
+            "process_peak_rss": ProcessPeakRSS(),
+            "phases": self.myPhases,
+        }
+        with open(self.myPath, "a", encoding="utf-8") as aFile:
+            aFile.write(json.dumps(aRecord) + "\n")
+        return theStatus
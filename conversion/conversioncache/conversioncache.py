@@ -0,0 +1,231 @@
+# $Id$
+
+# Copyright (C) 2008-2014, Roman Lygin. All rights reserved.
+# Copyright (C) 2014-2022, CADEX. All rights reserved.
+
+# This file is part of the CAD Exchanger software.
+
+# You may use this file under the terms of the BSD license as follows:
+
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+# * Redistributions of source code must retain the above copyright notice,
+# this list of conditions and the following disclaimer.
+# * Redistributions in binary form must reproduce the above copyright notice,
+# this list of conditions and the following disclaimer in the documentation
+# and/or other materials provided with the distribution.
+
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+
+
+import sys
+from pathlib import Path
+import os
+import hashlib
+import json
+import shutil
+import stat
+import tempfile
+import time
+
+sys.path.append(os.path.abspath(os.path.dirname(Path(__file__).resolve()) + "/../transfer"))
+sys.path.append(os.path.abspath(os.path.dirname(Path(__file__).resolve()) + "/../export"))
+sys.path.append(os.path.abspath(os.path.dirname(Path(__file__).resolve()) + "/../common"))
+from fingerprint import FileDigest, ParametersDigest
+from filelock import FileLock
+from exportparams import WRITER_PARAMETERS
+
+
+# Caches conversion outputs by the content of the source file and the conversion parameters.
+# Every entry is a directory with all files the writer produced (e.g. OBJ + MTL).
+# Least recently used entries are evicted when the total size exceeds the limit.
+# Cached files are made read-only when stored. Outputs are delivered as copies; with theUseHardLinks
+# they share the data with the cache entry instead and stay read-only, so that a tool writing
+# into a delivered file fails instead of silently changing what later hits return
+class ConversionCache:
+    def __init__(self, theCacheDir: str, theMaxSize: int, theUseHardLinks: bool = False):
+        self.myCacheDir = theCacheDir
+        self.myMaxSize = theMaxSize
+        self.myUseHardLinks = theUseHardLinks
+        self.myHits = 0
+        self.myMisses = 0
+
+        os.makedirs(self.myCacheDir, exist_ok=True)
+        self.myIndexPath = os.path.join(self.myCacheDir, "index.json")
+        self.myIndex = self.LoadIndex()
+
+    # Output files may reference each other by name (OBJ references its MTL file),
+    # so the destination file name is a part of the key while the source name is not
+    def Key(self, theSource: str, theParameters: dict, theDest: str) -> str:
+        aHash = hashlib.sha256()
+        aHash.update(FileDigest(theSource).encode())
+        aHash.update(ParametersDigest(theParameters).encode())
+        aHash.update(os.path.basename(theDest).encode())
+        return aHash.hexdigest()
+
+    # Runs theConverter(theSource, theDest) on a cache miss, otherwise links or copies the cached output.
+    # Several processes may share the cache: the index is re-read and updated under a file lock,
+    # and entries are materialized under the same lock so that eviction cannot remove them meanwhile.
+    # The conversion itself runs without the lock
+    def Convert(self, theSource: str, theDest: str, theParameters: dict, theConverter) -> int:
+        aKey = self.Key(theSource, theParameters, theDest)
+        anEntryDir = os.path.join(self.myCacheDir, aKey)
+
+        with FileLock(self.myIndexPath):
+            self.myIndex = self.LoadIndex()
+            if aKey in self.myIndex["entries"] and os.path.isdir(anEntryDir):
+                self.myHits += 1
+                self.myIndex["hits"] += 1
+                self.myIndex["entries"][aKey]["last_access"] = time.time()
+                self.SaveIndex()
+                self.Materialize(anEntryDir, os.path.dirname(theDest))
+                return 0
+
+            self.myMisses += 1
+            self.myIndex["misses"] += 1
+            self.SaveIndex()
+
+        # Convert into a staging directory first so that a failed conversion never leaves a partial entry
+        aStagingDir = tempfile.mkdtemp(prefix="staging-", dir=self.myCacheDir)
+        aStatus = theConverter(theSource, os.path.join(aStagingDir, os.path.basename(theDest)))
+        if aStatus != 0:
+            shutil.rmtree(aStagingDir, ignore_errors=True)
+            return aStatus
+
+        aSize = 0
+        for aFile in Path(aStagingDir).rglob("*"):
+            if aFile.is_file():
+                aSize += aFile.stat().st_size
+                aFile.chmod(stat.S_IRUSR | stat.S_IRGRP | stat.S_IROTH)
+
+        with FileLock(self.myIndexPath):
+            self.myIndex = self.LoadIndex()
+            # Another process may have converted the same file meanwhile, its entry is equivalent
+            if os.path.isdir(anEntryDir):
+                self.RemoveEntry(anEntryDir)
+            os.replace(aStagingDir, anEntryDir)
+
+            self.myIndex["entries"][aKey] = {"size": aSize, "last_access": time.time()}
+            self.Evict(aKey)
+            self.SaveIndex()
+
+            self.Materialize(anEntryDir, os.path.dirname(theDest))
+        return 0
+
+    # Copies keep the default permissions of new files, hard links are read-only like the entry itself
+    def Materialize(self, theEntryDir: str, theDestDir: str):
+        for aFile in Path(theEntryDir).rglob("*"):
+            if not aFile.is_file():
+                continue
+            aTarget = Path(theDestDir) / aFile.relative_to(theEntryDir)
+            aTarget.parent.mkdir(parents=True, exist_ok=True)
+            if aTarget.exists():
+                aTarget.unlink()
+            try:
+                if not self.myUseHardLinks:
+                    raise OSError
+                os.link(aFile, aTarget)
+            except OSError:
+                shutil.copyfile(aFile, aTarget)
+
+    def Evict(self, theKeptKey: str):
+        anEntries = self.myIndex["entries"]
+        aTotalSize = sum(anEntry["size"] for anEntry in anEntries.values())
+        for aKey in sorted(anEntries, key=lambda k: anEntries[k]["last_access"]):
+            if aTotalSize <= self.myMaxSize:
+                break
+            if aKey == theKeptKey:
+                continue
+            aTotalSize -= anEntries[aKey]["size"]
+            del anEntries[aKey]
+            self.RemoveEntry(os.path.join(self.myCacheDir, aKey))
+
+    # Read-only files can't be removed on Windows, so they are made writable first
+    @staticmethod
+    def RemoveEntry(theEntryDir: str):
+        for aFile in Path(theEntryDir).rglob("*"):
+            if aFile.is_file():
+                aFile.chmod(stat.S_IRUSR | stat.S_IWUSR)
+        shutil.rmtree(theEntryDir, ignore_errors=True)
+
+    def LoadIndex(self) -> dict:
+        if not os.path.exists(self.myIndexPath):
+            return {"entries": {}, "hits": 0, "misses": 0}
+        with open(self.myIndexPath, encoding="utf-8") as aFile:
+            return json.load(aFile)
+
+    # Must be called under the index lock, the temporary file name is shared by all processes
+    def SaveIndex(self):
+        aTempPath = self.myIndexPath + ".tmp"
+        with open(aTempPath, "w", encoding="utf-8") as aFile:
+            json.dump(self.myIndex, aFile)
+        os.replace(aTempPath, self.myIndexPath)
+
+    def PrintStatistics(self):
+        aTotalSize = sum(anEntry["size"] for anEntry in self.myIndex["entries"].values())
+        print(f"Cache hits: {self.myHits}, misses: {self.myMisses} "
+              f"(all time: {self.myIndex['hits']} hits, {self.myIndex['misses']} misses)")
+        print(f"Cache size: {len(self.myIndex['entries'])} entries, {aTotalSize} of {self.myMaxSize} bytes")
+
+
+# The SDK modules are imported only on a cache miss
+def CachedTransfer(theCache: ConversionCache, theSource: str, theDest: str) -> int:
+    def Convert(theSource: str, theDest: str) -> int:
+        import transfer
+        return transfer.main(theSource, theDest)
+
+    # transfer.main() uses default reader and writer parameters
+    aParameters = {"converter": "transfer"}
+    return theCache.Convert(theSource, theDest, aParameters, Convert)
+
+def CachedExport(theCache: ConversionCache, theSource: str, theDest: str) -> int:
+    def Convert(theSource: str, theDest: str) -> int:
+        import export
+        return export.main(theSource, theDest)
+
+    aParameters = {"converter": "export", **WRITER_PARAMETERS}
+    return theCache.Convert(theSource, theDest, aParameters, Convert)
+
+
+def main(theMode: str, theSource: str, theDest: str, theCacheDir: str, theMaxSize: int = 1024 * 1024 * 1024):
+    aCache = ConversionCache(theCacheDir, theMaxSize)
+
+    if theMode == "transfer":
+        aStatus = CachedTransfer(aCache, theSource, theDest)
+    elif theMode == "export":
+        aStatus = CachedExport(aCache, theSource, theDest)
+    else:
+        print("Unknown conversion mode " + theMode)
+        return 1
+
+    aCache.PrintStatistics()
+    return aStatus
+
+if __name__ == "__main__":
+    if len(sys.argv) != 5 and len(sys.argv) != 6:
+        print("Usage: " + os.path.abspath(Path(__file__).resolve()) +
+              " <mode> <input_file> <output_file> <cache_dir> [<max_size_mb>], where:")
+        print("    <mode>        is either transfer or export")
+        print("    <input_file>  is a name of the file to be read")
+        print("    <output_file> is a name of the file to Save() the model")
+        print("    <cache_dir>   is a directory where converted files are cached")
+        print("    <max_size_mb> is a maximum size of the cache in megabytes, defaults to 1024")
+        sys.exit(1)
+
+    aSource = os.path.abspath(sys.argv[2])
+    aDest = os.path.abspath(sys.argv[3])
+    aCacheDir = os.path.abspath(sys.argv[4])
+    aMaxSize = int(sys.argv[5]) * 1024 * 1024 if len(sys.argv) > 5 else 1024 * 1024 * 1024
+
+    sys.exit(main(sys.argv[1], aSource, aDest, aCacheDir, aMaxSize))
@@ -37,18 +37,22 @@ import cadexchanger.CadExOBJ as obj
 
 sys.path.append(os.path.abspath(os.path.dirname(Path(__file__).resolve()) + "/../../"))
 import cadex_license as license
+sys.path.append(os.path.abspath(os.path.dirname(Path(__file__).resolve()) + "/../common"))
+from instrumentation import ConversionRecorder
+from exportparams import WRITER_PARAMETERS
 
 
-def main(theSource: str, theDest: str):
-    aKey = license.Value()
-
-    if not cadex.LicenseManager.Activate(aKey):
-        print("Failed to activate CAD Exchanger license.")
-        return 1
+def SetWriterParameters(theParams: obj.OBJ_WriterParameters):
+    theParams.SetLengthUnit(getattr(cadex, "Base_LU_" + WRITER_PARAMETERS["LengthUnit"]))
+    theParams.SetToGenerateMtlFile(WRITER_PARAMETERS["GenerateMtlFile"])
 
+# Converts the file, the license must be already activated
+def Convert(theSource: str, theDest: str, theRecorder: ConversionRecorder) -> int:
     aModel = cadex.ModelData_Model()
 
-    if not cadex.ModelData_ModelReader().Read(cadex.Base_UTF16String(theSource), aModel):
+    with theRecorder.Phase("read"):
+        anIsRead = cadex.ModelData_ModelReader().Read(cadex.Base_UTF16String(theSource), aModel)
+    if not anIsRead:
         print("Failed to read the file " + theSource)
         return 1
 
@@ -56,22 +60,38 @@ def main(theSource: str, theDest: str):
     aWriterParams: obj.OBJ_WriterParameters = aWriter.Parameters()
 
     # Set some writer parameteres
-    aWriterParams.SetLengthUnit(cadex.Base_LU_Centimeters)
-    aWriterParams.SetToGenerateMtlFile(True)
+    SetWriterParameters(aWriterParams)
 
     # Converting model data to a new format
-    if not aWriter.Transfer(aModel):
+    with theRecorder.Phase("transfer"):
+        anIsTransferred = aWriter.Transfer(aModel)
+    if not anIsTransferred:
         print("Failed to transfer model data to specified format")
         return 1
 
     # Writing model data to file
-    if not aWriter.WriteFile(cadex.Base_UTF16String(theDest)):
+    with theRecorder.Phase("write"):
+        anIsWritten = aWriter.WriteFile(cadex.Base_UTF16String(theDest))
+    if not anIsWritten:
         print("Failed to write the file")
         return 1
 
     print("Completed")
     return 0
 
+def main(theSource: str, theDest: str):
+    aRecorder = ConversionRecorder("export", theSource, theDest)
+
+    aKey = license.Value()
+
+    with aRecorder.Phase("license"):
+        anIsActivated = cadex.LicenseManager.Activate(aKey)
+    if not anIsActivated:
+        print("Failed to activate CAD Exchanger license.")
+        return aRecorder.Finish(1)
+
+    return aRecorder.Finish(Convert(theSource, theDest, aRecorder))
+
 if __name__ == "__main__":
     if len(sys.argv) != 3:
         print("    <input_file>  is a name of the XML file to be read")
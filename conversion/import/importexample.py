@@ -39,14 +39,20 @@ import cadexchanger.CadExSTEP as step
 
 sys.path.append(os.path.abspath(os.path.dirname(Path(__file__).resolve()) + "/../../"))
 import cadex_license as license
+sys.path.append(os.path.abspath(os.path.dirname(Path(__file__).resolve()) + "/../common"))
+from instrumentation import ConversionRecorder
 
 
 def main(theSource: str, theDest: str):
+    aRecorder = ConversionRecorder("import", theSource, theDest)
+
     aKey = license.Value()
 
-    if not cadex.LicenseManager.Activate(aKey):
+    with aRecorder.Phase("license"):
+        anIsActivated = cadex.LicenseManager.Activate(aKey)
+    if not anIsActivated:
         print("Failed to activate CAD Exchanger license.")
-        return 1
+        return aRecorder.Finish(1)
 
     aReader = step.STEP_Reader()
 
@@ -59,26 +65,32 @@ def main(theSource: str, theDest: str):
     aModel = cadex.ModelData_Model()
 
     # Reading a the file
-    if not aReader.ReadFile(cadex.Base_UTF16String(theSource)):
+    with aRecorder.Phase("read"):
+        anIsRead = aReader.ReadFile(cadex.Base_UTF16String(theSource))
+    if not anIsRead:
         print("Failed to read the file " + theSource)
-        return 1
+        return aRecorder.Finish(1)
 
     # Making a model data
-    if not aReader.Transfer(aModel):
+    with aRecorder.Phase("transfer"):
+        anIsTransferred = aReader.Transfer(aModel)
+    if not anIsTransferred:
         print("Failed to transfer the model into inner format")
-        return 1
+        return aRecorder.Finish(1)
 
     # Now we can get some model data
     print(f"Model name: {aModel.Name()}")
     print(f"Number of roots: {aModel.NumberOfRoots()}")
 
     # Saving the xml file
-    if not cadex.ModelData_ModelWriter().Write(aModel, cadex.Base_UTF16String(theDest)):
+    with aRecorder.Phase("write"):
+        anIsWritten = cadex.ModelData_ModelWriter().Write(aModel, cadex.Base_UTF16String(theDest))
+    if not anIsWritten:
         print("Failed to save the .xml file")
-        return 1
+        return aRecorder.Finish(1)
 
     print("Completed")
-    return 0
+    return aRecorder.Finish(0)
 
 if __name__ == "__main__":
     if len(sys.argv) != 2:
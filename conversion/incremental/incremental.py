@@ -0,0 +1,198 @@
+# $Id$
+
+# Copyright (C) 2008-2014, Roman Lygin. All rights reserved.
+# Copyright (C) 2014-2022, CADEX. All rights reserved.
+
+# This file is part of the CAD Exchanger software.
+
+# You may use this file under the terms of the BSD license as follows:
+
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+# * Redistributions of source code must retain the above copyright notice,
+# this list of conditions and the following disclaimer.
+# * Redistributions in binary form must reproduce the above copyright notice,
+# this list of conditions and the following disclaimer in the documentation
+# and/or other materials provided with the distribution.
+
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+
+
+import sys
+from pathlib import Path
+import os
+import json
+import time
+
+sys.path.append(os.path.abspath(os.path.dirname(Path(__file__).resolve()) + "/../transfer"))
+sys.path.append(os.path.abspath(os.path.dirname(Path(__file__).resolve()) + "/../export"))
+sys.path.append(os.path.abspath(os.path.dirname(Path(__file__).resolve()) + "/../common"))
+from fingerprint import FileDigest, ParametersDigest
+from filelock import FileLock
+from exportparams import WRITER_PARAMETERS
+
+
+# Keeps source fingerprints (size, mtime, content hash), the conversion parameters hash
+# and the output path of every converted file. Size and mtime are checked first so that
+# unchanged sources are not even read; the content hash catches touched but unchanged files.
+# Only entries changed by this run are written back, merged into the file under a lock,
+# so that concurrent runs into the same output directory keep each other's entries
+class ConversionManifest:
+    def __init__(self, thePath: str):
+        self.myPath = thePath
+        self.myEntries = self.Load()
+        self.myUpdated = set()
+        self.myRemoved = set()
+
+    def Load(self) -> dict:
+        if not os.path.exists(self.myPath):
+            return {}
+        with open(self.myPath, encoding="utf-8") as aFile:
+            return json.load(aFile)
+
+    # Returns True if theSource has to be converted again
+    def IsOutdated(self, theSource: str, theParametersHash: str, theDest: str) -> bool:
+        anEntry = self.myEntries.get(theSource)
+        if not anEntry or anEntry["parameters_hash"] != theParametersHash \
+                or anEntry["output"] != theDest or not os.path.exists(theDest):
+            return True
+
+        aStat = os.stat(theSource)
+        if anEntry["size"] == aStat.st_size and anEntry["mtime"] == aStat.st_mtime:
+            return False
+        if anEntry["size"] != aStat.st_size or anEntry["hash"] != FileDigest(theSource):
+            return True
+
+        # Only the modification time has changed
+        anEntry["mtime"] = aStat.st_mtime
+        self.myUpdated.add(theSource)
+        return False
+
+    def Update(self, theSource: str, theParametersHash: str, theDest: str):
+        aStat = os.stat(theSource)
+        self.myEntries[theSource] = {
+            "size": aStat.st_size,
+            "mtime": aStat.st_mtime,
+            "hash": FileDigest(theSource),
+            "parameters_hash": theParametersHash,
+            "output": theDest,
+            "converted": time.time(),
+        }
+        self.myUpdated.add(theSource)
+        self.myRemoved.discard(theSource)
+
+    # Drops entries of sources that no longer exist and returns their number
+    def Prune(self, theSources: set) -> int:
+        aRemoved = [aSource for aSource in self.myEntries if aSource not in theSources]
+        for aSource in aRemoved:
+            del self.myEntries[aSource]
+            self.myUpdated.discard(aSource)
+            self.myRemoved.add(aSource)
+        return len(aRemoved)
+
+    def Save(self):
+        with FileLock(self.myPath):
+            anEntries = self.Load()
+            for aSource in self.myRemoved:
+                anEntries.pop(aSource, None)
+            for aSource in self.myUpdated:
+                anEntries[aSource] = self.myEntries[aSource]
+
+            aTempPath = self.myPath + ".tmp"
+            with open(aTempPath, "w", encoding="utf-8") as aFile:
+                json.dump(anEntries, aFile, indent=1)
+            os.replace(aTempPath, self.myPath)
+
+        self.myEntries = anEntries
+        self.myUpdated.clear()
+        self.myRemoved.clear()
+
+
+# The SDK modules are imported only when there is something to convert
+def Transfer(theSource: str, theDest: str) -> int:
+    import transfer
+    return transfer.main(theSource, theDest)
+
+def Export(theSource: str, theDest: str) -> int:
+    import export
+    return export.main(theSource, theDest)
+
+
+def main(theMode: str, theSourceDir: str, theDestDir: str, theExtension: str = "jt"):
+    if theMode == "transfer":
+        aConverter = Transfer
+        # transfer.main() uses default reader and writer parameters
+        aParameters = {"converter": "transfer"}
+    elif theMode == "export":
+        aConverter = Export
+        theExtension = "obj"
+        aParameters = {"converter": "export", **WRITER_PARAMETERS}
+    else:
+        print("Unknown conversion mode " + theMode)
+        return 1
+
+    aParametersHash = ParametersDigest(aParameters)
+    os.makedirs(theDestDir, exist_ok=True)
+    aManifest = ConversionManifest(os.path.join(theDestDir, "manifest.json"))
+
+    aSources = set()
+    aNumberOfSkipped = 0
+    aNumberOfConverted = 0
+    aNumberOfFailed = 0
+    for aPath in sorted(Path(theSourceDir).rglob("*")):
+        if not aPath.is_file():
+            continue
+        aSource = str(aPath)
+        # The extension is appended as in batchtransfer, so that a.stp and a.step get different outputs
+        aRelative = aPath.relative_to(theSourceDir)
+        aDest = str(Path(theDestDir) / aRelative.parent / (aRelative.name + "." + theExtension))
+        aSources.add(aSource)
+
+        if not aManifest.IsOutdated(aSource, aParametersHash, aDest):
+            aNumberOfSkipped += 1
+            continue
+
+        os.makedirs(os.path.dirname(aDest), exist_ok=True)
+        if aConverter(aSource, aDest) == 0:
+            aManifest.Update(aSource, aParametersHash, aDest)
+            aNumberOfConverted += 1
+        else:
+            aNumberOfFailed += 1
+        # Saving after every file keeps the progress if the run is interrupted
+        aManifest.Save()
+
+    aNumberOfRemoved = aManifest.Prune(aSources)
+    aManifest.Save()
+
+    print(f"Converted: {aNumberOfConverted}, skipped: {aNumberOfSkipped}, failed: {aNumberOfFailed}, "
+          f"removed from manifest: {aNumberOfRemoved}")
+
+    print("Completed")
+    return 0 if aNumberOfFailed == 0 else 1
+
+if __name__ == "__main__":
+    if len(sys.argv) != 4 and len(sys.argv) != 5:
+        print("Usage: " + os.path.abspath(Path(__file__).resolve()) +
+              " <mode> <input_dir> <output_dir> [<extension>], where:")
+        print("    <mode>       is either transfer or export")
+        print("    <input_dir>  is a directory with files to be converted")
+        print("    <output_dir> is a directory where converted files and the manifest are saved")
+        print("    <extension>  is an extension of the target format in transfer mode, defaults to jt")
+        sys.exit(1)
+
+    aSourceDir = os.path.abspath(sys.argv[2])
+    aDestDir = os.path.abspath(sys.argv[3])
+    anExtension = sys.argv[4] if len(sys.argv) > 4 else "jt"
+
+    sys.exit(main(sys.argv[1], aSourceDir, aDestDir, anExtension))
@@ -0,0 +1,93 @@
+# $Id$
+
+# Copyright (C) 2008-2014, Roman Lygin. All rights reserved.
+# Copyright (C) 2014-2022, CADEX. All rights reserved.
+
+# This file is part of the CAD Exchanger software.
+
+# You may use this file under the terms of the BSD license as follows:
+
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+# * Redistributions of source code must retain the above copyright notice,
+# this list of conditions and the following disclaimer.
+# * Redistributions in binary form must reproduce the above copyright notice,
+# this list of conditions and the following disclaimer in the documentation
+# and/or other materials provided with the distribution.
+
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+
+
+import sys
+
+
+import sys
+from pathlib import Path
+import os
+import shutil
+import tempfile
+import unittest
+
+sys.path.append(os.path.abspath(os.path.dirname(Path(__file__).resolve())))
+import incremental
+
+
+# Stands in for the SDK converters: the output is a copy of the source
+def CopyConverter(theSource: str, theDest: str) -> int:
+    shutil.copyfile(theSource, theDest)
+    return 0
+
+
+class IncrementalTest(unittest.TestCase):
+    def setUp(self):
+        self.myDir = tempfile.mkdtemp()
+        self.mySourceDir = os.path.join(self.myDir, "in")
+        self.myDestDir = os.path.join(self.myDir, "out")
+        os.makedirs(os.path.join(self.mySourceDir, "sub"))
+        self.mySources = {"a.stp": "first", "a.step": "second", "sub/a.jt": "third"}
+        for aName, aText in self.mySources.items():
+            with open(os.path.join(self.mySourceDir, aName), "w", encoding="utf-8") as aFile:
+                aFile.write(aText)
+
+        self.myConverter = incremental.Transfer
+        incremental.Transfer = CopyConverter
+
+    def tearDown(self):
+        incremental.Transfer = self.myConverter
+        shutil.rmtree(self.myDir)
+
+    def Output(self, theName: str) -> str:
+        with open(os.path.join(self.myDestDir, theName), encoding="utf-8") as aFile:
+            return aFile.read()
+
+    # Sources with the same stem get their own outputs, a second run skips all of them
+    def test_same_stem_sources(self):
+        self.assertEqual(incremental.main("transfer", self.mySourceDir, self.myDestDir, "jt"), 0)
+        self.assertEqual(self.Output("a.stp.jt"), "first")
+        self.assertEqual(self.Output("a.step.jt"), "second")
+        self.assertEqual(self.Output("sub/a.jt.jt"), "third")
+
+        aManifest = incremental.ConversionManifest(os.path.join(self.myDestDir, "manifest.json"))
+        anOutputs = [anEntry["output"] for anEntry in aManifest.myEntries.values()]
+        self.assertEqual(len(anOutputs), len(self.mySources))
+        self.assertEqual(len(set(anOutputs)), len(self.mySources))
+
+        def Fail(theSource: str, theDest: str) -> int:
+            self.fail("Unchanged source " + theSource + " converted again")
+        incremental.Transfer = Fail
+        self.assertEqual(incremental.main("transfer", self.mySourceDir, self.myDestDir, "jt"), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
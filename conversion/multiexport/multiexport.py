@@ -0,0 +1,170 @@
+# $Id$
+
+# Copyright (C) 2008-2014, Roman Lygin. All rights reserved.
+# Copyright (C) 2014-2022, CADEX. All rights reserved.
+
+# This file is part of the CAD Exchanger software.
+
+# You may use this file under the terms of the BSD license as follows:
+
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+# * Redistributions of source code must retain the above copyright notice,
+# this list of conditions and the following disclaimer.
+# * Redistributions in binary form must reproduce the above copyright notice,
+# this list of conditions and the following disclaimer in the documentation
+# and/or other materials provided with the distribution.
+
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+
+
+import sys
+from pathlib import Path
+import os
+import time
+
+import cadexchanger.CadExCore as cadex
+
+sys.path.append(os.path.abspath(os.path.dirname(Path(__file__).resolve()) + "/../../"))
+import cadex_license as license
+sys.path.append(os.path.abspath(os.path.dirname(Path(__file__).resolve()) + "/../common"))
+from instrumentation import ConversionRecorder
+from formatregistry import FormatRegistry
+
+
+# Every target format has its own writer parameters and destination path relative to the output directory.
+# Format modules are imported only for the requested formats
+def JTParameters():
+    jt = FormatRegistry.Module(".jt")
+    aParams = jt.JT_WriterParameters()
+    aParams.SetFileSplitMode(jt.JT_WriterParameters.PerPart)
+    return aParams
+
+def OBJParameters():
+    aParams = FormatRegistry.WriterParameters(".obj")
+    aParams.SetLengthUnit(cadex.Base_LU_Centimeters)
+    aParams.SetToGenerateMtlFile(True)
+    return aParams
+
+def CDXFBParameters():
+    aParams = cadex.ModelData_WriterParameters()
+    aParams.SetFileFormat(cadex.ModelData_WriterParameters.Cdxfb)
+    aParams.SetWriteBRepRepresentation(True)
+    aParams.SetWritePolyRepresentation(True)
+    aParams.SetPreferredLOD(cadex.ModelData_RM_MediumLOD)
+    aParams.SetWriteTextures(False)
+    aParams.SetWritePMI(False)
+    return aParams
+
+# The OBJ writer meshes the B-Rep with the default mesher parameters, so do the multiexport meshes
+def OBJMesherParameters():
+    return cadex.ModelAlgo_BRepMesherParameters()
+
+# Writer parameters, destination and, for mesh formats, mesher parameters of every target format.
+# The other formats are written before meshing, so that their output is the same as of
+# the single-format examples (e.g. CDXFB gets no Poly representation the source didn't have)
+def Targets(theName: str) -> dict:
+    return {
+        "jt":    (JTParameters,    os.path.join("jt", theName + ".jt"), None),
+        "obj":   (OBJParameters,   os.path.join("obj", theName + ".obj"), OBJMesherParameters),
+        "cdxfb": (CDXFBParameters, os.path.join(theName + ".cdxfb", "scenegraph.cdxfb"), None),
+    }
+
+# Writes the model into one format, returns the status and the time spent
+def WriteFormat(theModel: cadex.ModelData_Model, theParameters, theDest: str, theRecorder: ConversionRecorder,
+                theFormat: str) -> tuple:
+    aStart = time.perf_counter()
+    os.makedirs(os.path.dirname(theDest), exist_ok=True)
+
+    aWriter = cadex.ModelData_ModelWriter()
+    aWriter.SetWriterParameters(theParameters)
+    with theRecorder.Phase("write_" + theFormat):
+        anIsOK = aWriter.Write(theModel, cadex.Base_UTF16String(theDest))
+    return anIsOK, time.perf_counter() - aStart
+
+
+def main(theSource: str, theDestDir: str, theFormats: list):
+    aRecorder = ConversionRecorder("multiexport", theSource)
+
+    aKey = license.Value()
+
+    with aRecorder.Phase("license"):
+        anIsActivated = cadex.LicenseManager.Activate(aKey)
+    if not anIsActivated:
+        print("Failed to activate CAD Exchanger license.")
+        return aRecorder.Finish(1)
+
+    aTargets = Targets(Path(theSource).stem)
+    for aFormat in theFormats:
+        if aFormat not in aTargets:
+            print("Unsupported target format " + aFormat)
+            return aRecorder.Finish(1)
+
+    aModel = cadex.ModelData_Model()
+
+    print("Conversion started...")
+
+    # The model is read only once for all target formats
+    aStart = time.perf_counter()
+    with aRecorder.Phase("read"):
+        anIsRead = cadex.ModelData_ModelReader().Read(cadex.Base_UTF16String(theSource), aModel)
+    if not anIsRead:
+        print("Failed to open and convert the file " + theSource)
+        return aRecorder.Finish(1)
+    print(f"Read: {time.perf_counter() - aStart:.2f} s")
+
+    # Writers run one after another: the SDK model is not safe to share between threads,
+    # and sequential writes keep the CPU time recorded for every format meaningful
+    aStart = time.perf_counter()
+    aStatus = 0
+    aMeshFormats = [aFormat for aFormat in theFormats if aTargets[aFormat][2] is not None]
+    aFormats = [aFormat for aFormat in theFormats if aTargets[aFormat][2] is None] + aMeshFormats
+    for aFormat in aFormats:
+        aMakeParameters, aDest, aMakeMesherParameters = aTargets[aFormat]
+
+        # Meshing once before the first mesh format lets the others reuse the same meshes.
+        # Parts which already have a Poly representation in the source keep it
+        if aMeshFormats and aFormat == aMeshFormats[0]:
+            aMeshStart = time.perf_counter()
+            with aRecorder.Phase("mesh"):
+                cadex.ModelAlgo_BRepMesher(aMakeMesherParameters()).Compute(aModel, False)
+            print(f"Meshing for {', '.join(aMeshFormats)}: {time.perf_counter() - aMeshStart:.2f} s")
+
+        anIsOK, anElapsed = WriteFormat(aModel, aMakeParameters(), os.path.join(theDestDir, aDest),
+                                        aRecorder, aFormat)
+        if anIsOK:
+            print(f"Write {aFormat}: {anElapsed:.2f} s")
+        else:
+            print(f"Failed to convert and write the file to {aFormat} format")
+            aStatus = 1
+    print(f"Meshing and writing all formats sequentially: {time.perf_counter() - aStart:.2f} s")
+
+    print("Completed")
+    return aRecorder.Finish(aStatus)
+
+if __name__ == "__main__":
+    if len(sys.argv) < 3:
+        print("Usage: " + os.path.abspath(Path(__file__).resolve()) +
+              " <input_file> <output_dir> [<format> ...], where:")
+        print("    <input_file> is a name of the file to be read")
+        print("    <output_dir> is a directory where converted files are saved")
+        print("    <format>     is a target format: jt, obj or cdxfb; all of them by default")
+        print("The model is read once and the formats are written one after another")
+        sys.exit(1)
+
+    aSource = os.path.abspath(sys.argv[1])
+    aDestDir = os.path.abspath(sys.argv[2])
+    aFormats = sys.argv[3:] if len(sys.argv) > 3 else ["jt", "obj", "cdxfb"]
+
+    sys.exit(main(aSource, aDestDir, aFormats))
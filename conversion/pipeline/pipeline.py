@@ -0,0 +1,267 @@
+# $Id$
+
+# Copyright (C) 2008-2014, Roman Lygin. All rights reserved.
+# Copyright (C) 2014-2022, CADEX. All rights reserved.
+
+# This file is part of the CAD Exchanger software.
+
+# You may use this file under the terms of the BSD license as follows:
+
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+# * Redistributions of source code must retain the above copyright notice,
+# this list of conditions and the following disclaimer.
+# * Redistributions in binary form must reproduce the above copyright notice,
+# this list of conditions and the following disclaimer in the documentation
+# and/or other materials provided with the distribution.
+
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+
+
+import sys
+from pathlib import Path
+import os
+import queue
+import threading
+import time
+
+import cadexchanger.CadExCore as cadex
+import cadexchanger.CadExSTEP as step
+import cadexchanger.CadExOBJ as obj
+
+sys.path.append(os.path.abspath(os.path.dirname(Path(__file__).resolve()) + "/../../"))
+import cadex_license as license
+sys.path.append(os.path.abspath(os.path.dirname(Path(__file__).resolve()) + "/../batchtransfer"))
+from batchtransfer import DestinationName
+
+
+# A pipeline stage: a number of worker threads taking items from the input queue,
+# processing them with theFunction and putting results into the output queue.
+# theFunction returns None when it fails to process an item, such item is dropped
+class Stage:
+    myEndOfStream = object()
+
+    def __init__(self, theName: str, theFunction, theNumberOfWorkers: int, theInput: queue.Queue, theOutput: queue.Queue):
+        self.myName = theName
+        self.myFunction = theFunction
+        self.myNumberOfWorkers = theNumberOfWorkers
+        self.myInput = theInput
+        self.myOutput = theOutput
+        self.myNextStage = None
+        self.myLock = threading.Lock()
+        self.myActiveWorkers = theNumberOfWorkers
+        self.myProcessed = 0
+        self.myFailed = 0
+        self.myBusyTime = 0.0
+        self.myThreads = []
+
+    def Start(self, theNextStage):
+        self.myNextStage = theNextStage
+        for i in range(self.myNumberOfWorkers):
+            aThread = threading.Thread(target=self.Run, name=f"{self.myName}-{i}", daemon=True)
+            aThread.start()
+            self.myThreads.append(aThread)
+
+    def Join(self):
+        for aThread in self.myThreads:
+            aThread.join()
+
+    def Run(self):
+        try:
+            while True:
+                anItem = self.myInput.get()
+                if anItem is Stage.myEndOfStream:
+                    break
+
+                aStart = time.perf_counter()
+                try:
+                    aResult = self.myFunction(anItem)
+                except Exception as anError:
+                    print(f"Stage {self.myName} failed to process an item: {type(anError).__name__}: {anError}")
+                    aResult = None
+                anElapsed = time.perf_counter() - aStart
+
+                with self.myLock:
+                    self.myBusyTime += anElapsed
+                    if aResult is None:
+                        self.myFailed += 1
+                    else:
+                        self.myProcessed += 1
+
+                if aResult is not None and self.myOutput is not None:
+                    self.myOutput.put(aResult)
+        finally:
+            # The last finished worker tells every worker of the next stage that the stream has ended.
+            # This is done even if the worker dies, otherwise the next stage would wait forever
+            with self.myLock:
+                self.myActiveWorkers -= 1
+                anIsLast = self.myActiveWorkers == 0
+            if anIsLast and self.myNextStage:
+                for i in range(self.myNextStage.myNumberOfWorkers):
+                    self.myOutput.put(Stage.myEndOfStream)
+
+    def PrintStatistics(self):
+        print(f"Stage {self.myName}: {self.myNumberOfWorkers} workers, {self.myProcessed} processed, "
+              f"{self.myFailed} failed, busy {self.myBusyTime:.2f} s")
+
+
+# Periodically samples sizes of the queues between stages
+class QueueDepthMonitor:
+    def __init__(self, theQueues: dict, theInterval: float = 0.01):
+        self.myQueues = theQueues
+        self.myInterval = theInterval
+        self.myMaxDepth = {aName: 0 for aName in theQueues}
+        self.myDepthSum = {aName: 0 for aName in theQueues}
+        self.myNumberOfSamples = 0
+        self.myStopEvent = threading.Event()
+        self.myThread = threading.Thread(target=self.Run, daemon=True)
+
+    def Start(self):
+        self.myThread.start()
+
+    def Stop(self):
+        self.myStopEvent.set()
+        self.myThread.join()
+
+    def Run(self):
+        while not self.myStopEvent.wait(self.myInterval):
+            self.myNumberOfSamples += 1
+            for aName, aQueue in self.myQueues.items():
+                aDepth = aQueue.qsize()
+                self.myMaxDepth[aName] = max(self.myMaxDepth[aName], aDepth)
+                self.myDepthSum[aName] += aDepth
+
+    def PrintStatistics(self):
+        for aName in self.myQueues:
+            aMean = self.myDepthSum[aName] / self.myNumberOfSamples if self.myNumberOfSamples else 0.0
+            print(f"Queue {aName}: max depth {self.myMaxDepth[aName]}, mean depth {aMean:.2f}")
+
+
+# Stage functions. Items are (source, destination) pairs extended with the SDK objects of the previous stage
+def ReadFile(theItem: tuple):
+    aSource, aDest = theItem
+    aReader = step.STEP_Reader()
+    aReaderParams = aReader.Parameters()
+    aReaderParams.SetPreferredBRepRepresentationType(step.STEP_ReaderParameters.AdvancedBRep)
+    aReader.SetParameters(aReaderParams)
+
+    if not aReader.ReadFile(cadex.Base_UTF16String(aSource)):
+        print("Failed to read the file " + aSource)
+        return None
+    return aSource, aDest, aReader
+
+def Transfer(theItem: tuple):
+    aSource, aDest, aReader = theItem
+    aModel = cadex.ModelData_Model()
+    if not aReader.Transfer(aModel):
+        print("Failed to transfer the model into inner format " + aSource)
+        return None
+    return aSource, aDest, aModel
+
+def WriteFile(theItem: tuple):
+    aSource, aDest, aModel = theItem
+    aWriter = obj.OBJ_Writer()
+    aWriterParams: obj.OBJ_WriterParameters = aWriter.Parameters()
+    aWriterParams.SetLengthUnit(cadex.Base_LU_Centimeters)
+    aWriterParams.SetToGenerateMtlFile(True)
+
+    if not aWriter.Transfer(aModel):
+        print("Failed to transfer model data to specified format " + aSource)
+        return None
+    if not aWriter.WriteFile(cadex.Base_UTF16String(aDest)):
+        print("Failed to write the file " + aDest)
+        return None
+    return aDest
+
+
+def main(theSourceDir: str, theDestDir: str, theReaders: int = 2, theTransferrers: int = 2,
+         theWriters: int = 2, theQueueDepth: int = 4):
+    aKey = license.Value()
+
+    if not cadex.LicenseManager.Activate(aKey):
+        print("Failed to activate CAD Exchanger license.")
+        return 1
+
+    aSources = sorted(p for p in Path(theSourceDir).iterdir() if p.suffix.lower() in (".stp", ".step"))
+    if not aSources:
+        print("No STEP files found in " + theSourceDir)
+        return 1
+    os.makedirs(theDestDir, exist_ok=True)
+
+    # Bounded queues limit the number of models kept in memory between stages
+    aSourceQueue = queue.Queue()
+    aReadQueue = queue.Queue(theQueueDepth)
+    aTransferQueue = queue.Queue(theQueueDepth)
+
+    aReadStage = Stage("read", ReadFile, theReaders, aSourceQueue, aReadQueue)
+    aTransferStage = Stage("transfer", Transfer, theTransferrers, aReadQueue, aTransferQueue)
+    aWriteStage = Stage("write", WriteFile, theWriters, aTransferQueue, None)
+
+    aMonitor = QueueDepthMonitor({"read->transfer": aReadQueue, "transfer->write": aTransferQueue})
+
+    print(f"Conversion of {len(aSources)} files started...")
+    aStart = time.perf_counter()
+    aCPUStart = time.process_time()
+    aMonitor.Start()
+    aReadStage.Start(aTransferStage)
+    aTransferStage.Start(aWriteStage)
+    aWriteStage.Start(None)
+
+    # part.stp and part.step get different outputs, otherwise two writers would race on part.obj
+    for aSource in aSources:
+        aSourceQueue.put((str(aSource), os.path.join(theDestDir, DestinationName(aSource, ".obj"))))
+    for i in range(theReaders):
+        aSourceQueue.put(Stage.myEndOfStream)
+
+    aReadStage.Join()
+    aTransferStage.Join()
+    aWriteStage.Join()
+    aMonitor.Stop()
+
+    anElapsed = time.perf_counter() - aStart
+    aCPUTime = time.process_time() - aCPUStart
+    print(f"Elapsed: {anElapsed:.2f} s")
+    for aStage in (aReadStage, aTransferStage, aWriteStage):
+        aStage.PrintStatistics()
+    aMonitor.PrintStatistics()
+
+    # Stages are threads of one process, so they only overlap while the SDK calls release the GIL.
+    # Busy time of all workers shows how much work was in flight, process CPU time shows how much
+    # of it really ran in parallel. If the cores used stay close to 1 whatever the number of workers,
+    # the stages are serialized and a process pool (see batchtransfer) is the way to scale
+    aBusyTime = sum(aStage.myBusyTime for aStage in (aReadStage, aTransferStage, aWriteStage))
+    aCores = aCPUTime / anElapsed if anElapsed > 0 else 0.0
+    print(f"Busy time of all workers: {aBusyTime:.2f} s, process CPU time: {aCPUTime:.2f} s, "
+          f"cores used on average: {aCores:.2f}")
+
+    print("Completed")
+    return 0 if aWriteStage.myProcessed == len(aSources) else 1
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3 and len(sys.argv) != 7:
+        print("Usage: " + os.path.abspath(Path(__file__).resolve()) +
+              " <input_dir> <output_dir> [<readers> <transferrers> <writers> <queue_depth>], where:")
+        print("    <input_dir>    is a directory with STEP files to be read")
+        print("    <output_dir>   is a directory where OBJ files are saved")
+        print("    <readers>      is a number of threads reading files, defaults to 2")
+        print("    <transferrers> is a number of threads transferring files into models, defaults to 2")
+        print("    <writers>      is a number of threads writing OBJ files, defaults to 2")
+        print("    <queue_depth>  is a maximum number of items waiting between stages, defaults to 4")
+        sys.exit(1)
+
+    aSourceDir = os.path.abspath(sys.argv[1])
+    aDestDir = os.path.abspath(sys.argv[2])
+    aSettings = [int(aValue) for aValue in sys.argv[3:]]
+
+    sys.exit(main(aSourceDir, aDestDir, *aSettings))
@@ -35,34 +35,48 @@ import cadexchanger.CadExCore as cadex
 
 sys.path.append(os.path.abspath(os.path.dirname(Path(__file__).resolve()) + "/../../"))
 import cadex_license as license
+sys.path.append(os.path.abspath(os.path.dirname(Path(__file__).resolve()) + "/../common"))
+from instrumentation import ConversionRecorder
 
 
-def main(theSource: str, theDest: str):
-    aKey = license.Value()
-
-    if not cadex.LicenseManager.Activate(aKey):
-        print("Failed to activate CAD Exchanger license.")
-        return 1
-
+# Converts the file, the license must be already activated
+def Convert(theSource: str, theDest: str, theRecorder: ConversionRecorder) -> int:
     aModel = cadex.ModelData_Model()
 
     print("Conversion started...")
 
     aReader = cadex.ModelData_ModelReader()
     # Opening and converting the file
-    if not aReader.Read(cadex.Base_UTF16String(theSource), aModel):
+    with theRecorder.Phase("read"):
+        anIsRead = aReader.Read(cadex.Base_UTF16String(theSource), aModel)
+    if not anIsRead:
         print("Failed to open and convert the file " + theSource)
         return 1
 
     aWriter = cadex.ModelData_ModelWriter()
     # Converting and writing the model to file
-    if not aWriter.Write(aModel, cadex.Base_UTF16String(theDest)):
+    with theRecorder.Phase("write"):
+        anIsWritten = aWriter.Write(aModel, cadex.Base_UTF16String(theDest))
+    if not anIsWritten:
         print("Failed to convert and write the file to specified format " + theDest)
         return 1
 
     print("Completed")
     return 0
 
+def main(theSource: str, theDest: str):
+    aRecorder = ConversionRecorder("transfer", theSource, theDest)
+
+    aKey = license.Value()
+
+    with aRecorder.Phase("license"):
+        anIsActivated = cadex.LicenseManager.Activate(aKey)
+    if not anIsActivated:
+        print("Failed to activate CAD Exchanger license.")
+        return aRecorder.Finish(1)
+
+    return aRecorder.Finish(Convert(theSource, theDest, aRecorder))
+
 if __name__ == "__main__":
     if len(sys.argv) != 3:
         print("    <input_file>  is a name of the STEP file to be read")
@@ -39,17 +39,21 @@ import cadexchanger.CadExCore as cadex
 
 sys.path.append(os.path.abspath(os.path.dirname(Path(__file__).resolve()) + "/../../"))
 import cadex_license as license
-import cadexchanger.CadExSTEP as step
-import cadexchanger.CadExJT as jt
-import cadexchanger.CadExOBJ as obj
+sys.path.append(os.path.abspath(os.path.dirname(Path(__file__).resolve()) + "/../common"))
+from instrumentation import ConversionRecorder
+from formatregistry import FormatRegistry
 
 
 def main(theSource: str, theDest: str):
+    aRecorder = ConversionRecorder("transferparams", theSource, theDest)
+
     aKey = license.Value()
 
-    if not cadex.LicenseManager.Activate(aKey):
+    with aRecorder.Phase("license"):
+        anIsActivated = cadex.LicenseManager.Activate(aKey)
+    if not anIsActivated:
         print("Failed to activate CAD Exchanger license.")
-        return 1
+        return aRecorder.Finish(1)
 
     aModel = cadex.ModelData_Model()
 
@@ -57,40 +61,51 @@ def main(theSource: str, theDest: str):
 
     aReader = cadex.ModelData_ModelReader()
 
-    # Let's set new parameters
-    aSTEPReaderParams = step.STEP_ReaderParameters()
-    aSTEPReaderParams.SetPreferredBRepRepresentationType(step.STEP_ReaderParameters.AdvancedBRep)
-    aReader.SetReaderParameters(aSTEPReaderParams)
-
-    aJTReaderParams = jt.JT_ReaderParameters()
-    aJTReaderParams.SetLayerConversionMode(jt.JT_ReaderParameters.LayerFilter)
-    aReader.SetReaderParameters(aJTReaderParams)
+    # Let's set new parameters. Format modules are imported only for the formats of the source and destination
+    aSourceFormat = FormatRegistry.Extension(theSource)
+    if aSourceFormat in (".stp", ".step"):
+        step = FormatRegistry.Module(aSourceFormat)
+        aSTEPReaderParams = step.STEP_ReaderParameters()
+        aSTEPReaderParams.SetPreferredBRepRepresentationType(step.STEP_ReaderParameters.AdvancedBRep)
+        aReader.SetReaderParameters(aSTEPReaderParams)
+    elif aSourceFormat == ".jt":
+        jt = FormatRegistry.Module(aSourceFormat)
+        aJTReaderParams = jt.JT_ReaderParameters()
+        aJTReaderParams.SetLayerConversionMode(jt.JT_ReaderParameters.LayerFilter)
+        aReader.SetReaderParameters(aJTReaderParams)
 
     # Opening and converting the file
-    if not aReader.Read(cadex.Base_UTF16String(theSource), aModel):
+    with aRecorder.Phase("read"):
+        anIsRead = aReader.Read(cadex.Base_UTF16String(theSource), aModel)
+    if not anIsRead:
         print("Failed to open and convert the file " + theSource)
-        return 1
+        return aRecorder.Finish(1)
 
     aWriter = cadex.ModelData_ModelWriter()
 
-    anOBJParams = obj.OBJ_WriterParameters()
-    # Set some writer parameters
-    anOBJParams.SetLengthUnit(cadex.Base_LU_Centimeters)
-    anOBJParams.SetToGenerateMtlFile(True)
-    aWriter.SetWriterParameters(anOBJParams)
-
-    aJTParams = jt.JT_WriterParameters()
-    aJTParams.SetFileSplitMode(jt.JT_WriterParameters.PerPart)
-    aWriter.SetWriterParameters(aJTParams)
+    aDestFormat = FormatRegistry.Extension(theDest)
+    if aDestFormat == ".obj":
+        anOBJParams = FormatRegistry.WriterParameters(aDestFormat)
+        # Set some writer parameters
+        anOBJParams.SetLengthUnit(cadex.Base_LU_Centimeters)
+        anOBJParams.SetToGenerateMtlFile(True)
+        aWriter.SetWriterParameters(anOBJParams)
+    elif aDestFormat == ".jt":
+        jt = FormatRegistry.Module(aDestFormat)
+        aJTParams = jt.JT_WriterParameters()
+        aJTParams.SetFileSplitMode(jt.JT_WriterParameters.PerPart)
+        aWriter.SetWriterParameters(aJTParams)
 
     # Converting and writing the model to file
-    if not aWriter.Write(aModel, cadex.Base_UTF16String(theDest)):
+    with aRecorder.Phase("write"):
+        anIsWritten = aWriter.Write(aModel, cadex.Base_UTF16String(theDest))
+    if not anIsWritten:
         print("Failed to convert and write the file to specified format " + theDest)
-        return 1
+        return aRecorder.Finish(1)
 
 
     print("Completed")
-    return 0
+    return aRecorder.Finish(0)
 
 if __name__ == "__main__":
     if len(sys.argv) != 3:
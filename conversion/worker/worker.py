@@ -0,0 +1,188 @@
+# $Id$
+
+# Copyright (C) 2008-2014, Roman Lygin. All rights reserved.
+# Copyright (C) 2014-2022, CADEX. All rights reserved.
+
+# This file is part of the CAD Exchanger software.
+
+# You may use this file under the terms of the BSD license as follows:
+
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+# * Redistributions of source code must retain the above copyright notice,
+# this list of conditions and the following disclaimer.
+# * Redistributions in binary form must reproduce the above copyright notice,
+# this list of conditions and the following disclaimer in the documentation
+# and/or other materials provided with the distribution.
+
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+
+
+import sys
+from pathlib import Path
+import os
+import io
+import json
+import socket
+import stat
+import traceback
+from contextlib import redirect_stdout
+
+import cadexchanger.CadExCore as cadex
+
+sys.path.append(os.path.abspath(os.path.dirname(Path(__file__).resolve()) + "/../../"))
+import cadex_license as license
+sys.path.append(os.path.abspath(os.path.dirname(Path(__file__).resolve()) + "/../transfer"))
+sys.path.append(os.path.abspath(os.path.dirname(Path(__file__).resolve()) + "/../export"))
+sys.path.append(os.path.abspath(os.path.dirname(Path(__file__).resolve()) + "/../cdxfbconverter"))
+sys.path.append(os.path.abspath(os.path.dirname(Path(__file__).resolve()) + "/../common"))
+from instrumentation import ConversionRecorder
+import transfer
+import export
+import cdxfbconverter
+from workerclient import DefaultSocketPath
+
+
+# Seconds a client may take to send its request or to read the reply. Without it a client that
+# connects and stays silent would block the worker, which serves one connection at a time
+CONNECTION_TIMEOUT = 30.0
+
+# Commands a client may send, they take the same arguments as the corresponding example scripts
+CONVERTERS = {
+    "transfer": transfer.Convert,
+    "export": export.Convert,
+    "cdxfbconverter": cdxfbconverter.Convert,
+}
+
+# A request is a JSON line {"command": ..., "args": [...]}, the reply is a JSON line
+# {"status": ..., "output": ...} where output is what the converter has printed
+def HandleRequest(theRequest: dict) -> dict:
+    aCommand = theRequest.get("command")
+    if aCommand == "ping":
+        return {"status": 0, "output": ""}
+
+    aConverter = CONVERTERS.get(aCommand)
+    if aConverter is None:
+        return {"status": 1, "output": f"Unknown command {aCommand}\n"}
+
+    anArgs = theRequest.get("args", [])
+    if not isinstance(anArgs, list) or len(anArgs) != 2 or not all(isinstance(anArg, str) for anArg in anArgs):
+        return {"status": 1, "output": f"Command {aCommand} expects <input_file> and <output_file>\n"}
+
+    anOutput = io.StringIO()
+    with redirect_stdout(anOutput):
+        aRecorder = ConversionRecorder(aCommand, anArgs[0], anArgs[1])
+        try:
+            aStatus = aRecorder.Finish(aConverter(anArgs[0], anArgs[1], aRecorder))
+        except Exception:
+            traceback.print_exc(file=anOutput)
+            aStatus = 1
+    return {"status": aStatus, "output": anOutput.getvalue()}
+
+# Returns True if a process accepts connections on the socket, False if the socket file is stale
+def IsListening(theSocketPath: str) -> bool:
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as aSocket:
+        try:
+            aSocket.connect(theSocketPath)
+        except (ConnectionRefusedError, FileNotFoundError):
+            return False
+    return True
+
+# Jobs are processed one at a time: start several workers on different sockets to convert in parallel
+def Serve(theSocketPath: str) -> int:
+    if os.path.lexists(theSocketPath):
+        # Only the socket of a worker that is no longer running is removed, never other files
+        if not stat.S_ISSOCK(os.lstat(theSocketPath).st_mode):
+            print(f"{theSocketPath} exists and is not a socket")
+            return 1
+        if IsListening(theSocketPath):
+            print(f"Another worker is already listening on {theSocketPath}")
+            return 1
+        os.remove(theSocketPath)
+
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as aServer:
+        # Only the owner may connect; the umask closes the window between bind() and chmod()
+        anOldUmask = os.umask(0o177)
+        try:
+            aServer.bind(theSocketPath)
+        finally:
+            os.umask(anOldUmask)
+        os.chmod(theSocketPath, 0o600)
+        aServer.listen()
+        print(f"Worker is listening on {theSocketPath}")
+
+        try:
+            while True:
+                aConnection, _ = aServer.accept()
+                aConnection.settimeout(CONNECTION_TIMEOUT)
+                aCommand = None
+                try:
+                    with aConnection, aConnection.makefile("rwb") as aStream:
+                        aLine = aStream.readline()
+                        if not aLine:
+                            continue
+                        try:
+                            aRequest = json.loads(aLine)
+                        except ValueError:
+                            aRequest = None
+
+                        if not isinstance(aRequest, dict):
+                            aReply = {"status": 1, "output": "Malformed request, expected a JSON object\n"}
+                        elif aRequest.get("command") == "shutdown":
+                            aCommand = "shutdown"
+                            aReply = {"status": 0, "output": "Worker stopped\n"}
+                        else:
+                            aReply = HandleRequest(aRequest)
+
+                        aStream.write((json.dumps(aReply) + "\n").encode())
+                        aStream.flush()
+                except OSError as anError:
+                    # The client timed out or went away, the worker goes on with the next one
+                    print(f"Connection dropped: {anError}")
+
+                if aCommand == "shutdown":
+                    break
+        finally:
+            os.remove(theSocketPath)
+    return 0
+
+
+def main(theSocketPath: str):
+    aKey = license.Value()
+
+    # The license is activated once for all jobs the worker will process
+    if not cadex.LicenseManager.Activate(aKey):
+        print("Failed to activate CAD Exchanger license.")
+        return 1
+
+    aStatus = Serve(theSocketPath)
+
+    print("Completed")
+    return aStatus
+
+if __name__ == "__main__":
+    if len(sys.argv) > 2:
+        print("Usage: " + os.path.abspath(Path(__file__).resolve()) + " [<socket>], where:")
+        print("    <socket> is a path of the Unix domain socket to listen on,")
+        print("             defaults to $CADEX_WORKER_SOCKET or cadex_worker.sock in $XDG_RUNTIME_DIR")
+        print("             or in a private directory of the current user in the temporary directory")
+        sys.exit(1)
+
+    try:
+        aSocketPath = os.path.abspath(sys.argv[1]) if len(sys.argv) > 1 else DefaultSocketPath()
+    except OSError as anError:
+        print(f"Failed to prepare the worker socket directory: {anError}")
+        sys.exit(1)
+
+    sys.exit(main(aSocketPath))
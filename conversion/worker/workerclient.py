@@ -0,0 +1,94 @@
+# $Id$
+
+# Copyright (C) 2008-2014, Roman Lygin. All rights reserved.
+# Copyright (C) 2014-2022, CADEX. All rights reserved.
+
+# This file is part of the CAD Exchanger software.
+
+# You may use this file under the terms of the BSD license as follows:
+
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+# * Redistributions of source code must retain the above copyright notice,
+# this list of conditions and the following disclaimer.
+# * Redistributions in binary form must reproduce the above copyright notice,
+# this list of conditions and the following disclaimer in the documentation
+# and/or other materials provided with the distribution.
+
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+
+
+import sys
+from pathlib import Path
+import os
+import json
+import socket
+import stat
+import tempfile
+
+
+# The client does not import the SDK, so its start-up is cheap.
+# The socket is kept in $XDG_RUNTIME_DIR, which only the user can access, or else in a per-user
+# 0700 directory in the temporary directory: anyone who can connect may make the worker convert
+# (and so read and write) files on behalf of the user
+def DefaultSocketPath() -> str:
+    if "CADEX_WORKER_SOCKET" in os.environ:
+        return os.environ["CADEX_WORKER_SOCKET"]
+
+    aDir = os.environ.get("XDG_RUNTIME_DIR")
+    if not aDir:
+        aDir = os.path.join(tempfile.gettempdir(), f"cadex-{os.getuid()}")
+        os.makedirs(aDir, mode=0o700, exist_ok=True)
+        # The directory may have been created in advance by someone else
+        aStat = os.lstat(aDir)
+        if not stat.S_ISDIR(aStat.st_mode) or aStat.st_uid != os.getuid() or aStat.st_mode & 0o077:
+            raise PermissionError(f"{aDir} is not a private directory of the current user")
+    return os.path.join(aDir, "cadex_worker.sock")
+
+def Request(theSocketPath: str, theCommand: str, theArgs: list) -> dict:
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as aSocket:
+        aSocket.connect(theSocketPath)
+        with aSocket.makefile("rwb") as aStream:
+            aStream.write((json.dumps({"command": theCommand, "args": theArgs}) + "\n").encode())
+            aStream.flush()
+            return json.loads(aStream.readline())
+
+def main(theCommand: str, theArgs: list, theSocketPath: str = None):
+    try:
+        if theSocketPath is None:
+            theSocketPath = DefaultSocketPath()
+        aReply = Request(theSocketPath, theCommand, theArgs)
+    except OSError as anError:
+        print(f"Failed to connect to the worker at {theSocketPath}: {anError}")
+        return 1
+
+    print(aReply["output"], end="")
+    return aReply["status"]
+
+if __name__ == "__main__":
+    if len(sys.argv) != 4 and (len(sys.argv) != 2 or sys.argv[1] not in ("ping", "shutdown")):
+        print("Usage: " + os.path.abspath(Path(__file__).resolve()) +
+              " <command> <input_file> <output_file>, where:")
+        print("    <command>     is transfer, export or cdxfbconverter")
+        print("    <input_file>  is a name of the file to be read")
+        print("    <output_file> is a name of the file to Save() the model")
+        print("Use 'ping' or 'shutdown' commands without arguments to check or stop the worker.")
+        print("The worker socket is taken from $CADEX_WORKER_SOCKET or is cadex_worker.sock in $XDG_RUNTIME_DIR")
+        print("or in a private directory of the current user in the temporary directory.")
+        sys.exit(1)
+
+    # The worker may run in another directory, so paths are sent as absolute ones
+    anArgs = [os.path.abspath(anArg) for anArg in sys.argv[2:]]
+
+    sys.exit(main(sys.argv[1], anArgs))
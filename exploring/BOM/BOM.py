@@ -33,26 +33,73 @@
 import sys
 from pathlib import Path
 import os
+import io
+import csv
+import json
+from collections import namedtuple
 
 import cadexchanger.CadExCore as cadex
 
 sys.path.append(os.path.abspath(os.path.dirname(Path(__file__).resolve()) + "/../../"))
 import cadex_license as license
 
+
+def SGEType(theSGE: cadex.ModelData_SceneGraphElement) -> str:
+    if theSGE.TypeId() == cadex.ModelData_Part.GetTypeId():
+        return "Part"
+    elif theSGE.TypeId() == cadex.ModelData_Assembly.GetTypeId():
+        return "Assembly"
+    elif theSGE.TypeId() == cadex.ModelData_Instance.GetTypeId():
+        return "Instance"
+    return "Undefined"
+
+def PrintBOMTable(theSGEMap: dict, theMargin: int):
+    print("Total:")
+    print("\t" + "name".ljust(theMargin) + " | " + "type".ljust(theMargin) + " | count")
+
+    for i in theSGEMap:
+        aName = str(i.Name())
+        aType = SGEType(i)
+        print("\t" + aName.ljust(theMargin) + " | " +
+              aType.ljust(theMargin) + " | " + str(theSGEMap[i]))
+
+BOMEntry = namedtuple("BOMEntry", ["name", "type", "count"])
+
+# Returns the BOM as a list of entries instead of printing it
+def CollectBOM(theSGEMap: dict) -> list:
+    return [BOMEntry(str(aSGE.Name()), SGEType(aSGE), aCount) for aSGE, aCount in theSGEMap.items()]
+
+# Serializes the whole BOM in memory and writes it to theStream with a single call.
+# theFormat is either "csv" or "jsonl"
+def WriteBOM(theEntries: list, theStream, theFormat: str):
+    aBuffer = io.StringIO()
+    if theFormat == "csv":
+        aWriter = csv.writer(aBuffer, lineterminator="\n")
+        aWriter.writerow(BOMEntry._fields)
+        aWriter.writerows(theEntries)
+    elif theFormat == "jsonl":
+        aBuffer.writelines(json.dumps(anEntry._asdict()) + "\n" for anEntry in theEntries)
+    else:
+        raise ValueError("Unsupported BOM format " + theFormat)
+    theStream.write(aBuffer.getvalue())
+
 class SceneGraphVisitor(cadex.ModelData_Model_ElementVisitor):
-    def __init__(self):
+    # A quiet visitor only counts elements and doesn't print the scene graph tree
+    def __init__(self, theQuiet: bool = False):
         super().__init__()
         self.myNestingLevel = 0
         self.margin = 0; # This variable is used for formatting of output table
         self.mySGEMap = {}
+        self.myQuiet = theQuiet
 
     def PrintName(self, theSGEElement: cadex.ModelData_SceneGraphElement, theName: str):
-        print("--- " * self.myNestingLevel, end="")
+        if not self.myQuiet:
+            print("--- " * self.myNestingLevel, end="")
 
-        if theName:
-            print(f"{theSGEElement}: {theName}")
-        else:
-            print(f"{theSGEElement}: noname")
+            if theName:
+                print(f"{theSGEElement}: {theName}")
+            else:
+                print(f"{theSGEElement}: noname")
 
         # Calculating spacing for output table columns
         self.margin = max(self.margin, theName.Length())
@@ -64,23 +111,13 @@ class SceneGraphVisitor(cadex.ModelData_Model_ElementVisitor):
             self.mySGEMap[theSGE] +=  1
 
     def PrintSGEType(self, theSGE: cadex.ModelData_SceneGraphElement) -> str:
-        if theSGE.TypeId() == cadex.ModelData_Part.GetTypeId():
-            return "Part"
-        elif theSGE.TypeId() == cadex.ModelData_Assembly.GetTypeId():
-            return "Assembly"
-        elif theSGE.TypeId() == cadex.ModelData_Instance.GetTypeId():
-            return "Instance"
-        return "Undefined"
+        return SGEType(theSGE)
 
     def PrintCounts(self):
-        print("Total:")
-        print("\t" + "name".ljust(self.margin) + " | " + "type".ljust(self.margin) + " | count")
+        PrintBOMTable(self.mySGEMap, self.margin)
 
-        for i in self.mySGEMap:
-            aName = str(i.Name())
-            aType = self.PrintSGEType(i)
-            print("\t" + aName.ljust(self.margin) + " | " +
-                  aType.ljust(self.margin) + " | " + str(self.mySGEMap[i]))
+    def Entries(self) -> list:
+        return CollectBOM(self.mySGEMap)
 
 
     def VisitPart(self, thePart: cadex.ModelData_Part):
@@ -105,7 +142,78 @@ class SceneGraphVisitor(cadex.ModelData_Model_ElementVisitor):
         self.myNestingLevel -= 1
 
 
-def main(theSource: str):
+# Computes the same totals as SceneGraphVisitor without expanding every instance path.
+# Each unique scene graph element is explored once and the number of its occurrences
+# is the sum of occurrences of its parents, so the cost is O(unique elements + edges)
+# even if a subassembly is instanced thousands of times
+class DAGBOMCounter:
+    def __init__(self):
+        self.myChildren = {}
+        self.mySGEMap = {}
+        self.margin = 0
+
+    # Children of an assembly are its instances, the child of an instance is the element it references
+    def Children(self, theSGE: cadex.ModelData_SceneGraphElement) -> list:
+        aChildren = self.myChildren.get(theSGE)
+        if aChildren is None:
+            aChildren = []
+            if theSGE.TypeId() == cadex.ModelData_Assembly.GetTypeId():
+                for aSGE in cadex.ModelData_Model_ElementIterator(cadex.ModelData_Assembly.Cast(theSGE)):
+                    aChildren.append(cadex.ModelData_Instance.Cast(aSGE))
+            elif theSGE.TypeId() == cadex.ModelData_Instance.GetTypeId():
+                aReference = cadex.ModelData_Instance.Cast(theSGE).Reference()
+                if aReference:
+                    aChildren.append(aReference)
+            self.myChildren[theSGE] = aChildren
+        return aChildren
+
+    def Compute(self, theModel: cadex.ModelData_Model):
+        aRoots = list(cadex.ModelData_Model_ElementIterator(theModel))
+
+        # Iterative depth-first search: elements in order of discovery and in post-order
+        aDiscovered = {}
+        aPostOrder = []
+        for aRoot in aRoots:
+            if aRoot in aDiscovered:
+                continue
+            aDiscovered[aRoot] = True
+            aStack = [(aRoot, iter(self.Children(aRoot)))]
+            while aStack:
+                aSGE, anIt = aStack[-1]
+                aChild = next(anIt, None)
+                if aChild is None:
+                    aStack.pop()
+                    aPostOrder.append(aSGE)
+                elif aChild not in aDiscovered:
+                    aDiscovered[aChild] = True
+                    aStack.append((aChild, iter(self.Children(aChild))))
+
+        # Reversed post-order lists parents before their children
+        aCounts = dict.fromkeys(aPostOrder, 0)
+        for aRoot in aRoots:
+            aCounts[aRoot] += 1
+        for aSGE in reversed(aPostOrder):
+            for aChild in self.myChildren[aSGE]:
+                aCounts[aChild] += aCounts[aSGE]
+
+        # Like SceneGraphVisitor, count parts and assemblies only
+        aPartType = cadex.ModelData_Part.GetTypeId()
+        anAssemblyType = cadex.ModelData_Assembly.GetTypeId()
+        for aSGE in aDiscovered:
+            if aSGE.TypeId() == aPartType or aSGE.TypeId() == anAssemblyType:
+                self.mySGEMap[aSGE] = aCounts[aSGE]
+                self.margin = max(self.margin, aSGE.Name().Length())
+
+    def PrintCounts(self):
+        PrintBOMTable(self.mySGEMap, self.margin)
+
+    def Entries(self) -> list:
+        return CollectBOM(self.mySGEMap)
+
+
+# With theFormat set the BOM is collected quietly and written as CSV or JSON Lines
+# to theOutput (or to standard output) instead of the printed tree and table
+def main(theSource: str, theUseDAG: bool = False, theFormat: str = None, theOutput: str = None):
     aKey = license.Value()
 
     if not cadex.LicenseManager.Activate(aKey):
@@ -118,20 +226,43 @@ def main(theSource: str):
         print("Failed to read the file " + theSource)
         return 1
 
-    aCounter = SceneGraphVisitor()
-
-    aModel.AcceptElementVisitor(aCounter)
-    aCounter.PrintCounts()
+    if theUseDAG:
+        aCounter = DAGBOMCounter()
+        aCounter.Compute(aModel)
+    else:
+        aCounter = SceneGraphVisitor(theFormat is not None)
+        aModel.AcceptElementVisitor(aCounter)
+
+    if theFormat is None:
+        aCounter.PrintCounts()
+    elif theOutput:
+        with open(theOutput, "w", encoding="utf-8", newline="") as aStream:
+            WriteBOM(aCounter.Entries(), aStream, theFormat)
+    else:
+        # Keep standard output machine-readable
+        WriteBOM(aCounter.Entries(), sys.stdout, theFormat)
+        return 0
 
     print("Completed")
     return 0
 
 if __name__ == "__main__":
-    if len(sys.argv) != 2:
-        print("Usage: " + os.path.abspath(Path(__file__).resolve()) + " <input_file>, where:")
+    anOptions = sys.argv[2:]
+    aUseDAG = "--dag" in anOptions
+    if aUseDAG:
+        anOptions.remove("--dag")
+
+    if len(sys.argv) < 2 or len(anOptions) > 2 or (anOptions and anOptions[0] not in ("--csv", "--jsonl")):
+        print("Usage: " + os.path.abspath(Path(__file__).resolve()) + " <input_file> [--dag] [--csv|--jsonl [<output_file>]], where:")
         print("    <input_file>  is a name of the XML file to be read")
+        print("    --dag         counts elements once per unique element instead of once per instance path")
+        print("    --csv         writes the BOM as CSV instead of printing the tree and table")
+        print("    --jsonl       writes the BOM as JSON Lines instead of printing the tree and table")
+        print("    <output_file> is a name of the file to write the BOM to, standard output by default")
         sys.exit()
 
     aSource = os.path.abspath(sys.argv[1])
+    aFormat = anOptions[0][2:] if anOptions else None
+    anOutput = os.path.abspath(anOptions[1]) if len(anOptions) > 1 else None
 
-    sys.exit(main(aSource))
+    sys.exit(main(aSource, aUseDAG, aFormat, anOutput))
@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+
+# $Id$
+
+# Copyright (C) 2008-2014, Roman Lygin. All rights reserved.
+# Copyright (C) 2014-2022, CADEX. All rights reserved.
+
+# This file is part of the CAD Exchanger software.
+
+# You may use this file under the terms of the BSD license as follows:
+
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+# * Redistributions of source code must retain the above copyright notice,
+# this list of conditions and the following disclaimer.
+# * Redistributions in binary form must reproduce the above copyright notice,
+# this list of conditions and the following disclaimer in the documentation
+# and/or other materials provided with the distribution.
+
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+
+
+import sys
+from pathlib import Path
+import os
+import tempfile
+import time
+
+import numpy as np
+
+import cadexchanger.CadExCore as cadex
+
+sys.path.append(os.path.abspath(os.path.dirname(Path(__file__).resolve()) + "/../../"))
+import cadex_license as license
+sys.path.append(os.path.abspath(os.path.dirname(Path(__file__).resolve()) + "/../occurrenceindex"))
+from occurrenceindex import OccurrenceIndex
+sys.path.append(os.path.abspath(os.path.dirname(Path(__file__).resolve()) + "/../common"))
+from partpool import PartCollector
+from matrices import TransformBoxes
+sys.path.append(os.path.abspath(os.path.dirname(Path(__file__).resolve()) + "/../massproperties"))
+from massproperties import PropertiesCache, ComputeProperties
+
+
+# Per-part properties packed into arrays indexed by part. Parts without B-Rep get zero
+# area and volume and an empty (inverted) bounding box
+def PropertiesArrays(theProperties: list):
+    aNumberOfParts = len(theProperties)
+    anAreas, aVolumes = np.zeros(aNumberOfParts), np.zeros(aNumberOfParts)
+    aCentroids = np.zeros((aNumberOfParts, 3))
+    aMins, aMaxs = np.full((aNumberOfParts, 3), np.inf), np.full((aNumberOfParts, 3), -np.inf)
+    for i, aPartProperties in enumerate(theProperties):
+        if aPartProperties is not None:
+            anAreas[i] = aPartProperties["area"]
+            aVolumes[i] = aPartProperties["volume"]
+            aCentroids[i] = aPartProperties["centroid"]
+            aMins[i], aMaxs[i] = aPartProperties["bbox"]
+    return anAreas, aVolumes, aCentroids, aMins, aMaxs
+
+# Rolls per-part properties up to the assembly. thePartIds give the part of each occurrence (-1 if unknown),
+# theMatrices its (N, 4, 4) world transformation. Transformations are applied to all occurrences
+# at once: volumes scale by |det|, areas by |det|^(2/3), bounding boxes are transformed as
+# center and half-extent (the new half-extent is |R| times the old one)
+def RollUp(thePartIds: np.ndarray, theMatrices: np.ndarray, theProperties: list) -> dict:
+    anAreas, aVolumes, aCentroids, aMins, aMaxs = PropertiesArrays(theProperties)
+    aHasBRep = np.append(np.isfinite(aMins).all(axis=1), False)
+    aValid = aHasBRep[thePartIds]
+    aPartIds, aMatrices = thePartIds[aValid], theMatrices[aValid]
+
+    aRotations = aMatrices[:, :3, :3]
+    aTranslations = aMatrices[:, :3, 3]
+    aScales = np.abs(np.linalg.det(aRotations))
+
+    aVolumes = aVolumes[aPartIds] * aScales
+    anAreas = anAreas[aPartIds] * np.cbrt(aScales) ** 2
+    aCentroids = np.einsum("nij,nj->ni", aRotations, aCentroids[aPartIds]) + aTranslations
+
+    aBoxMins, aBoxMaxs = TransformBoxes(aMins[aPartIds], aMaxs[aPartIds], aMatrices)
+
+    aTotalVolume = aVolumes.sum()
+    aTotalArea = anAreas.sum()
+    if aTotalVolume > 0.0:
+        aCentroid = (aCentroids * aVolumes[:, np.newaxis]).sum(axis=0) / aTotalVolume
+    elif aTotalArea > 0.0:
+        aCentroid = (aCentroids * anAreas[:, np.newaxis]).sum(axis=0) / aTotalArea
+    else:
+        aCentroid = np.zeros(3)
+
+    return {"occurrences": int(len(aPartIds)),
+            "area":        float(aTotalArea),
+            "volume":      float(aTotalVolume),
+            "centroid":    aCentroid,
+            "bbox":        (aBoxMins.min(axis=0, initial=np.inf), aBoxMaxs.max(axis=0, initial=-np.inf))}
+
+
+def main(theSource: str, theCachePath: str = None, theNumberOfWorkers: int = os.cpu_count()):
+    aKey = license.Value()
+
+    if not cadex.LicenseManager.Activate(aKey):
+        print("Failed to activate CAD Exchanger license.")
+        return 1
+
+    aModel = cadex.ModelData_Model()
+
+    aStart = time.perf_counter()
+    if not cadex.ModelData_ModelReader().Read(cadex.Base_UTF16String(theSource), aModel):
+        print("Failed to read the file " + theSource)
+        return 1
+    aReadTime = time.perf_counter() - aStart
+
+    aStart = time.perf_counter()
+
+    # Properties are computed once per unique part, in the order the massproperties workers use
+    aCollector = PartCollector()
+    aModel.AcceptElementVisitor(aCollector)
+    if not theCachePath:
+        theCachePath = os.path.join(tempfile.gettempdir(), "cadex_massproperties.json")
+    aCache = PropertiesCache(theCachePath)
+    aProperties = ComputeProperties(theSource, aCollector.myParts, aCache, theNumberOfWorkers, aReadTime)
+    aCache.Save()
+
+    anIndex = OccurrenceIndex()
+    anIndex.Build(aModel)
+    aRows, aMatrices = anIndex.PartOccurrences()
+    aPartIndices = {aPart: i for i, aPart in enumerate(aCollector.myParts)}
+    aSGEPartIds = np.array([aPartIndices.get(aSGE, -1) for aSGE in anIndex.mySGEs], dtype=np.int64)
+    aPartIds = aSGEPartIds[anIndex.mySGEIds[aRows]]
+
+    aTotals = RollUp(aPartIds, aMatrices, aProperties)
+    print(f"Assembly properties computed in {time.perf_counter() - aStart:.2f} s")
+
+    aMin, aMax = aTotals["bbox"]
+    print(f"Unique parts: {len(aCollector.myParts)}, part occurrences: {aTotals['occurrences']}")
+    print(f"Surface area: {aTotals['area']}")
+    print(f"Volume:       {aTotals['volume']}")
+    print(f"Centroid:     ({', '.join(str(v) for v in aTotals['centroid'])})")
+    print(f"Bounding Box: ({', '.join(str(v) for v in aMin)}) - ({', '.join(str(v) for v in aMax)})")
+
+    print("Completed")
+    return 0
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2 or len(sys.argv) > 4:
+        print("Usage: " + os.path.abspath(Path(__file__).resolve()) +
+              " <input_file> [<cache_file> [<number_of_workers>]], where:")
+        print("    <input_file>        is a name of the XML file to be read")
+        print("    <cache_file>        is a name of the JSON file to cache part properties in")
+        print("    <number_of_workers> is a number of worker processes, CPU count by default")
+        sys.exit(1)
+
+    aSource = os.path.abspath(sys.argv[1])
+    aCachePath = os.path.abspath(sys.argv[2]) if len(sys.argv) > 2 else None
+    aNumberOfWorkers = int(sys.argv[3]) if len(sys.argv) > 3 else os.cpu_count()
+    sys.exit(main(aSource, aCachePath, aNumberOfWorkers))
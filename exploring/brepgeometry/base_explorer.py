@@ -30,9 +30,25 @@
 # POSSIBILITY OF SUCH DAMAGE.
 
 
+import sys
+from pathlib import Path
+import os
+
+import numpy as np
+
 import cadexchanger.CadExCore as cadex
 
+sys.path.append(os.path.abspath(os.path.dirname(Path(__file__).resolve()) + "/../common"))
+from outputbackend import OutputBackend, TextOutput
+
 class BaseExplorer:
+    # All explorers emit their output through this backend, see SetOutput()
+    myOutput = TextOutput()
+
+    @classmethod
+    def SetOutput(cls, theOutput: OutputBackend):
+        BaseExplorer.myOutput = theOutput
+
     def __init__(self):
         super().__init__()
         self.myNestingLevel = 0
@@ -63,7 +79,7 @@ class BaseExplorer:
 
     @classmethod
     def PrintRange(cls, aName: str, aFirstParameter: float, aLastParameter: float):
-        print(f"{aName} = [{aFirstParameter}, {aLastParameter}]; ", end="")
+        cls.myOutput.Field(aName, [aFirstParameter, aLastParameter])
 
     @classmethod
     def PrintCurveDomain(cls, theCurve):
@@ -81,49 +97,45 @@ class BaseExplorer:
         elif isinstance(theValue, cadex.ModelData_Surface):
             cls.PrintSurfaceDomain(theValue)
 
+    # Converts points and directions into coordinate tuples, numbers are kept as is
     @classmethod
-    def Print3dParameter(cls, thePoint):
-        print(f"({thePoint.X()}, {thePoint.Y()}, {thePoint.Z()}); ", end="")
+    def ParameterValue(cls, theValue):
+        if isinstance(theValue, cadex.ModelData_Point) or isinstance(theValue, cadex.ModelData_Direction):
+            return (theValue.X(), theValue.Y(), theValue.Z())
+        if isinstance(theValue, cadex.ModelData_Point2d) or isinstance(theValue, cadex.ModelData_Direction2d):
+            return (theValue.X(), theValue.Y())
+        return theValue
 
     @classmethod
-    def Print2dParameter(cls, thePoint):
-        print(f"({thePoint.X()}, {thePoint.Y()}); ", end="")
+    def PrintParameter(cls, theValue):
+        cls.myOutput.Value(cls.ParameterValue(theValue))
 
     @classmethod
-    def Print1dParameter(cls, theValue):
-        print(f"{theValue}; ", end="")
+    def PrintNamedParameter(cls, theName, TheValue):
+        cls.myOutput.Field(theName, cls.ParameterValue(TheValue))
 
     @classmethod
-    def PrintParameter(cls, theValue):
-        if isinstance(theValue, cadex.ModelData_Point) or isinstance(theValue, cadex.ModelData_Direction):
-            cls.Print3dParameter(theValue)
-        elif isinstance(theValue, cadex.ModelData_Point2d) or isinstance(theValue, cadex.ModelData_Direction2d):
-            cls.Print2dParameter(theValue)
-        elif isinstance(theValue, float):
-            cls.Print1dParameter(theValue)
+    def PrintName(cls, theName: str):
+        cls.myOutput.Name(theName)
 
     @classmethod
-    def PrintNamedParameter(cls, theName, TheValue):
-        print(f"{theName} = ", end="")
-        cls.PrintParameter(TheValue)
+    def PrintText(cls, theText: str):
+        cls.myOutput.Write(theText)
 
     @classmethod
-    def PrintName(cls, theName: str):
-        print(f"{theName}: ", end="")
+    def PrintNewLine(cls):
+        cls.myOutput.NewLine()
 
     @classmethod
     def Print2dCollection(cls, theName: str, theFinalIndex: int, thePrintElement):
-        if theName:
-            print(f"{theName} = ", end="")
-
-        print("[", end="")
+        cls.myOutput.BeginCollection(theName)
         for i in range(1, theFinalIndex + 1):
             if(i > 3):
-                print("...", end="")
+                cls.myOutput.Write("...")
                 break
             thePrintElement(i)
 
-        print("]; ", end="")
+        cls.myOutput.EndCollection()
 
 
     @classmethod
@@ -132,16 +144,52 @@ class BaseExplorer:
             cls.Print2dCollection(None, theFinalIndex2, lambda j: thePrintElement(i, j))
         cls.Print2dCollection(theName, theFinalIndex1, PrintString)
 
+    # Coordinates of a 2d or 3d point as a tuple
+    @classmethod
+    def Coordinates(cls, thePoint) -> tuple:
+        if isinstance(thePoint, cadex.ModelData_Point2d):
+            return (thePoint.X(), thePoint.Y())
+        return (thePoint.X(), thePoint.Y(), thePoint.Z())
+
+    # Collects theElement(i) for the 1-based indices 1..theFinalIndex into an array.
+    # Point elements (returned as coordinate tuples) add a trailing dimension
+    @classmethod
+    def Array1d(cls, theFinalIndex: int, theElement, theType=np.float64) -> np.ndarray:
+        return np.array([theElement(i) for i in range(1, theFinalIndex + 1)], dtype=theType)
+
+    # Same as Array1d() for theElement(i, j) accessors of surface control nets
+    @classmethod
+    def Array2d(cls, theFinalIndex1: int, theFinalIndex2: int, theElement, theType=np.float64) -> np.ndarray:
+        return np.array([[theElement(i, j) for j in range(1, theFinalIndex2 + 1)]
+                         for i in range(1, theFinalIndex1 + 1)], dtype=theType)
+
+    # Bezier curve (3d or 2d) data as NumPy arrays: poles are (n, 3) or (n, 2)
+    @classmethod
+    def BezierCurveArrays(cls, theBezier) -> dict:
+        aNumberOfPoles = theBezier.NumberOfPoles()
+        return {"degree":  theBezier.Degree(),
+                "poles":   cls.Array1d(aNumberOfPoles, lambda i: cls.Coordinates(theBezier.Pole(i))),
+                "weights": cls.Array1d(aNumberOfPoles, theBezier.Weight)}
+
+    # B-Spline curve (3d or 2d) data as NumPy arrays: poles are (n, 3) or (n, 2)
+    @classmethod
+    def BSplineCurveArrays(cls, theBSpline) -> dict:
+        aNumberOfKnots = theBSpline.NumberOfKnots()
+        aNumberOfPoles = theBSpline.NumberOfPoles()
+        return {"degree":         theBSpline.Degree(),
+                "knots":          cls.Array1d(aNumberOfKnots, theBSpline.Knot),
+                "multiplicities": cls.Array1d(aNumberOfKnots, theBSpline.Multiplicity, np.int32),
+                "poles":          cls.Array1d(aNumberOfPoles, lambda i: cls.Coordinates(theBSpline.Pole(i))),
+                "weights":        cls.Array1d(aNumberOfPoles, theBSpline.Weight)}
+
     @classmethod
     def PrintOrientation(cls, theOrientation):
-        print("Orientation = ", end="")
         if theOrientation == cadex.ModelData_SO_Forward:
-            print("Forward", end="")
+            cls.myOutput.Field("Orientation", "Forward")
         elif theOrientation == cadex.ModelData_SO_Reversed:
-            print("Reversed", end="")
+            cls.myOutput.Field("Orientation", "Reversed")
         else:
-            print("Undefined")
-        print("; ", end="")
+            cls.myOutput.Field("Orientation", "Undefined")
 
     def PrintTabulation(self):
-        print("--- " * self.myNestingLevel, end="")
+        self.myOutput.Indent(self.myNestingLevel, "--- " * self.myNestingLevel)
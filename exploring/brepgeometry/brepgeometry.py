@@ -39,8 +39,12 @@ import cadexchanger.CadExCore as cadex
 sys.path.append(os.path.abspath(os.path.dirname(Path(__file__).resolve()) + "/../../"))
 import cadex_license as license
 from shape_explorer import ShapeExplorer
+from nurbs_collector import NURBSCollector
+from outputbackend import OUTPUT_FORMATS, CreateOutput
 
-def main(theSource: str):
+# theFormat selects the output backend of the explorers: "text", "jsonl" or "null",
+# theOutput is a file to write to instead of the standard output
+def main(theSource: str, theCollectNURBS: bool = False, theFormat: str = "text", theOutput: str = None):
     aKey = license.Value()
 
     if not cadex.LicenseManager.Activate(aKey):
@@ -53,19 +57,43 @@ def main(theSource: str):
         print("Failed to read the file " + theSource)
         return 1
 
-    # Explore B-Rep representation of model parts
-    aVisitor = ShapeExplorer()
-    aModel.AcceptElementVisitor(aVisitor)
-
-    print("Completed")
+    if theCollectNURBS:
+        # Collect NURBS data of model parts into NumPy arrays
+        aCollector = NURBSCollector()
+        aModel.AcceptElementVisitor(aCollector)
+        aCollector.PrintSummary()
+    else:
+        aStream = open(theOutput, "w", encoding="utf-8") if theOutput else None
+        anOutput = CreateOutput(theFormat, aStream)
+        ShapeExplorer.SetOutput(anOutput)
+
+        # Explore B-Rep representation of model parts
+        aVisitor = ShapeExplorer()
+        aModel.AcceptElementVisitor(aVisitor)
+
+        anOutput.Flush()
+        if aStream:
+            aStream.close()
+
+    # JSON Lines on the standard output must stay parseable, so the status goes to stderr there
+    print("Completed", file=sys.stderr if theFormat == "jsonl" and not theOutput else sys.stdout)
     return 0
 
 if __name__ == "__main__":
-    if len(sys.argv) != 2:
-        print("Usage: " + os.path.abspath(Path(__file__).resolve()) + " <input_file>, where:")
+    anOptions = sys.argv[2:]
+    aCollectNURBS = anOptions == ["--nurbs"]
+    anIsOutput = 2 <= len(anOptions) <= 3 and anOptions[0] == "--format" and anOptions[1] in OUTPUT_FORMATS
+    if len(sys.argv) < 2 or (anOptions and not aCollectNURBS and not anIsOutput):
+        print("Usage: " + os.path.abspath(Path(__file__).resolve()) +
+              " <input_file> [--nurbs | --format text|jsonl|null [<output_file>]], where:")
         print("    <input_file>  is a name of the XML file to be read")
+        print("    --nurbs       collects Bezier and B-Spline data into NumPy arrays instead of printing geometry")
+        print("    --format      writes geometry as text (default), as JSON Lines records or discards it")
+        print("    <output_file> is a name of the file to write geometry to, standard output by default")
         sys.exit(1)
 
     aSource = os.path.abspath(sys.argv[1])
+    aFormat = anOptions[1] if anIsOutput else "text"
+    anOutput = os.path.abspath(anOptions[2]) if anIsOutput and len(anOptions) == 3 else None
 
-    sys.exit(main(aSource))
+    sys.exit(main(aSource, aCollectNURBS, aFormat, anOutput))
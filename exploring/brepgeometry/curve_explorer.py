@@ -56,6 +56,16 @@ class CurveExplorer(BaseExplorer):
         elif theCurve.Type() == cadex.ModelData_CT_Trimmed:
             cls.PrintTrimmedCurve(cadex.ModelData_TrimmedCurve.Cast(theCurve))
 
+    # Returns NURBS data of Bezier and B-Spline curves as NumPy arrays (see BaseExplorer.BSplineCurveArrays()),
+    # None for other curve types
+    @classmethod
+    def CurveArrays(cls, theCurve: cadex.ModelData_Curve):
+        if theCurve.Type() == cadex.ModelData_CT_Bezier:
+            return cls.BezierCurveArrays(cadex.ModelData_BezierCurve.Cast(theCurve))
+        if theCurve.Type() == cadex.ModelData_CT_BSpline:
+            return cls.BSplineCurveArrays(cadex.ModelData_BSplineCurve.Cast(theCurve))
+        return None
+
     @classmethod
     def PrintLine(cls, theLine: cadex.ModelData_Line):
         cls.PrintName("Line")
@@ -161,12 +171,12 @@ class CurveExplorer(BaseExplorer):
         cls.PrintDomain(theOffset)
         cls.PrintNamedParameter("Direction", aDir)
         cls.PrintNamedParameter("Offset",    anOffset)
-        print("Basis Curve = ", end="")
+        cls.PrintText("Basis Curve = ")
         cls.PrintCurveInfo(theOffset.BasisCurve())
 
     @classmethod
     def PrintTrimmedCurve(cls, theTrimmed: cadex.ModelData_TrimmedCurve):
         cls.PrintName("Trimmed Curve")
         cls.PrintDomain(theTrimmed)
-        print("Basis Curve = ", end="")
+        cls.PrintText("Basis Curve = ")
         cls.PrintCurveInfo(theTrimmed.BasisCurve())
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+
+# $Id$
+
+# Copyright (C) 2008-2014, Roman Lygin. All rights reserved.
+# Copyright (C) 2014-2022, CADEX. All rights reserved.
+
+# This file is part of the CAD Exchanger software.
+
+# You may use this file under the terms of the BSD license as follows:
+
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+# * Redistributions of source code must retain the above copyright notice,
+# this list of conditions and the following disclaimer.
+# * Redistributions in binary form must reproduce the above copyright notice,
+# this list of conditions and the following disclaimer in the documentation
+# and/or other materials provided with the distribution.
+
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+
+
+import cadexchanger.CadExCore as cadex
+from surface_explorer import SurfaceExplorer
+from curve_explorer import CurveExplorer
+from pcurve_explorer import PCurveExplorer
+
+# Collects NURBS data of all Bezier and B-Spline surfaces, curves and pcurves of the model
+# as NumPy arrays without printing them. Shapes shared by several parents are visited once.
+class NURBSCollector(cadex.ModelData_Model_VoidElementVisitor):
+    def __init__(self):
+        super().__init__()
+        self.mySurfaces = []
+        self.myCurves = []
+        self.myPCurves = []
+        self.myShapeSet = set()
+
+    def VisitPart(self, thePart: cadex.ModelData_Part):
+        aBRep = thePart.BRepRepresentation()
+        if aBRep:
+            for aBody in aBRep.Get():
+                self.CollectBody(aBody)
+
+    def CollectBody(self, theBody: cadex.ModelData_Body):
+        for aFaceShape in cadex.ModelData_Shape_Iterator(theBody, cadex.ModelData_ST_Face):
+            if aFaceShape in self.myShapeSet:
+                continue
+            self.myShapeSet.add(aFaceShape)
+            aFace = cadex.ModelData_Face.Cast(aFaceShape)
+            self.Append(self.mySurfaces, SurfaceExplorer.SurfaceArrays(aFace.Surface()))
+
+            for anEdgeShape in cadex.ModelData_Shape_Iterator(aFaceShape, cadex.ModelData_ST_Edge):
+                anEdge = cadex.ModelData_Edge.Cast(anEdgeShape)
+                aPCurve, _, _ = anEdge.PCurve(aFace)
+                self.Append(self.myPCurves, PCurveExplorer.PCurveArrays(aPCurve))
+
+        for anEdgeShape in cadex.ModelData_Shape_Iterator(theBody, cadex.ModelData_ST_Edge):
+            if anEdgeShape in self.myShapeSet:
+                continue
+            self.myShapeSet.add(anEdgeShape)
+            anEdge = cadex.ModelData_Edge.Cast(anEdgeShape)
+            if not anEdge.IsDegenerated():
+                aCurve, _, _ = anEdge.Curve()
+                self.Append(self.myCurves, CurveExplorer.CurveArrays(aCurve))
+
+    @staticmethod
+    def Append(theList: list, theArrays):
+        if theArrays is not None:
+            theList.append(theArrays)
+
+    def PrintSummary(self):
+        self.PrintStatistics("Surfaces", self.mySurfaces,
+                             [max(anArrays["u_degree"], anArrays["v_degree"]) for anArrays in self.mySurfaces])
+        self.PrintStatistics("Curves",   self.myCurves,  [anArrays["degree"] for anArrays in self.myCurves])
+        self.PrintStatistics("PCurves",  self.myPCurves, [anArrays["degree"] for anArrays in self.myPCurves])
+
+    @staticmethod
+    def PrintStatistics(theName: str, theList: list, theDegrees: list):
+        aNumberOfPoles = sum(anArrays["weights"].size for anArrays in theList)
+        print(f"{theName}: {len(theList)} Bezier/B-Spline, {aNumberOfPoles} poles, "
+              f"max degree {max(theDegrees, default=0)}")
@@ -58,6 +58,16 @@ class PCurveExplorer(BaseExplorer):
             cls.PrintTrimmedCurve(cadex.ModelData_TrimmedCurve2d.Cast(theCurve))
 
 
+    # Returns NURBS data of Bezier and B-Spline 2d curves as NumPy arrays (see BaseExplorer.BSplineCurveArrays()),
+    # None for other curve types
+    @classmethod
+    def PCurveArrays(cls, theCurve):
+        if theCurve.Type() == cadex.ModelData_CT_Bezier:
+            return cls.BezierCurveArrays(cadex.ModelData_BezierCurve2d.Cast(theCurve))
+        if theCurve.Type() == cadex.ModelData_CT_BSpline:
+            return cls.BSplineCurveArrays(cadex.ModelData_BSplineCurve2d.Cast(theCurve))
+        return None
+
     @classmethod
     def PrintLine(cls, theLine: cadex.ModelData_Line2d):
         cls.PrintName("Line 2d")
@@ -110,13 +120,13 @@ class PCurveExplorer(BaseExplorer):
 
         def PrintPole(i):
             aPole = theBezier.Pole(i)
-            cls.PrintNamedParameter(aPole)
+            cls.PrintParameter(aPole)
 
         cls.Print2dCollection("Poles", aNumberOfPoles, PrintPole)
 
         def PrintWeight(i):
             aWeight = theBezier.Weight(i)
-            cls.PrintNamedParameter(aWeight)
+            cls.PrintParameter(aWeight)
 
         cls.Print2dCollection("Weights", aNumberOfPoles, PrintWeight)
 
@@ -161,13 +171,13 @@ class PCurveExplorer(BaseExplorer):
         cls.PrintName("Offset Curve 2d")
         anOffset = theOffset.Offset()
         cls.PrintDomain(theOffset)
-        cls.PrintParameter("Offset", anOffset)
-        print("Basis Curve = ", end="")
+        cls.PrintNamedParameter("Offset", anOffset)
+        cls.PrintText("Basis Curve = ")
         cls.PrintPCurveInfo(theOffset.BasisCurve())
 
     @classmethod
     def PrintTrimmedCurve(cls, theTrimmed: cadex.ModelData_TrimmedCurve2d):
         cls.PrintName("Trimmed Curve 2d")
         cls.PrintDomain(theTrimmed)
-        print("Basis Curve = ", end="")
+        cls.PrintText("Basis Curve = ")
         cls.PrintPCurveInfo(theTrimmed.BasisCurve())
@@ -44,7 +44,8 @@ class ShapeExplorer(cadex.ModelData_Model_VoidElementVisitor, BaseExplorer):
     def VisitPart(self, thePart: cadex.ModelData_Part):
         aBRep = thePart.BRepRepresentation()
         if aBRep:
-            print(f"Part = \"{thePart.Name()}\"")
+            self.PrintText(f"Part = \"{thePart.Name()}\"")
+            self.PrintNewLine()
             self.ExploreBRep(aBRep)
 
     def ExploreBRep(self, theBRep: cadex.ModelData_BRepRepresentation):
@@ -54,7 +55,8 @@ class ShapeExplorer(cadex.ModelData_Model_VoidElementVisitor, BaseExplorer):
 
         # Iterate over bodies
         for i, aBody in enumerate(aBodyList):
-            print(f"Body {i}: {self.BodyType(aBody)}")
+            self.PrintText(f"Body {i}: {self.BodyType(aBody)}")
+            self.PrintNewLine()
             self.ExploreShape(aBody)
 
 
@@ -89,7 +91,7 @@ class ShapeExplorer(cadex.ModelData_Model_VoidElementVisitor, BaseExplorer):
         self.PrintTabulation()
 
         if theShape.Type() == cadex.ModelData_ST_Solid:
-            print("Solid", end="")
+            self.PrintText("Solid")
         elif theShape.Type() == cadex.ModelData_ST_Shell:
             self.PrintShell(cadex.ModelData_Shell.Cast(theShape))
         elif theShape.Type() == cadex.ModelData_ST_Wire:
@@ -101,9 +103,9 @@ class ShapeExplorer(cadex.ModelData_Model_VoidElementVisitor, BaseExplorer):
         elif theShape.Type() == cadex.ModelData_ST_Vertex:
             self.PrintVertex(cadex.ModelData_Vertex.Cast(theShape))
         else:
-            print("Undefined", end="")
+            self.PrintText("Undefined")
 
-        print()
+        self.PrintNewLine()
 
     def PrintShell(self, theShell: cadex.ModelData_Shell):
         self.PrintName("Shell")
@@ -121,10 +123,11 @@ class ShapeExplorer(cadex.ModelData_Model_VoidElementVisitor, BaseExplorer):
         self.PrintName("Face")
         self.myNestingLevel += 1
         self.PrintOrientation(theFace.Orientation())
-        print()
+        self.PrintNewLine()
         aSurface = theFace.Surface()
         self.PrintTabulation()
-        print("Surface: ")
+        self.PrintName("Surface")
+        self.PrintNewLine()
         SurfaceExplorer.PrintSurface(aSurface)
         self.myNestingLevel -= 1
 
@@ -132,13 +135,13 @@ class ShapeExplorer(cadex.ModelData_Model_VoidElementVisitor, BaseExplorer):
         self.PrintName("Edge")
         self.myNestingLevel += 1
         if theEdge.IsDegenerated():
-            print("Degenerated: ", end="")
+            self.PrintText("Degenerated: ")
         self.PrintOrientation(theEdge.Orientation())
         self.PrintNamedParameter("Tolerance", theEdge.Tolerance())
 
         if not theEdge.IsDegenerated():
             aCurve, first, second = theEdge.Curve()
-            print()
+            self.PrintNewLine()
             self.PrintTabulation()
             self.PrintName("Curve")
             self.PrintRange("Edge Range", first, second)
@@ -146,7 +149,7 @@ class ShapeExplorer(cadex.ModelData_Model_VoidElementVisitor, BaseExplorer):
 
         if self.myCurrentFace:
             aPCurve, first, second = theEdge.PCurve(self.myCurrentFace)
-            print()
+            self.PrintNewLine()
             self.PrintTabulation()
             self.PrintName("PCurve")
             self.PrintRange("Edge Range", first, second)
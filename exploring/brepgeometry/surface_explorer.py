@@ -30,6 +30,8 @@
 # POSSIBILITY OF SUCH DAMAGE.
 
 
+import numpy as np
+
 import cadexchanger.CadExCore as cadex
 from base_explorer import BaseExplorer
 from curve_explorer import CurveExplorer
@@ -64,6 +66,43 @@ class SurfaceExplorer(BaseExplorer):
             cls.PrintTrimmedSurface(cadex.ModelData_RectangularTrimmedSurface.Cast(theSurface))
 
 
+    # Returns NURBS data of Bezier and B-Spline surfaces as NumPy arrays, None for other surface types
+    @classmethod
+    def SurfaceArrays(cls, theSurface: cadex.ModelData_Surface):
+        if theSurface.Type() == cadex.ModelData_ST_Bezier:
+            return cls.BezierSurfaceArrays(cadex.ModelData_BezierSurface.Cast(theSurface))
+        if theSurface.Type() == cadex.ModelData_ST_BSpline:
+            return cls.BSplineSurfaceArrays(cadex.ModelData_BSplineSurface.Cast(theSurface))
+        return None
+
+    # Bezier surface data as NumPy arrays: poles are (nu, nv, 3), weights are (nu, nv)
+    @classmethod
+    def BezierSurfaceArrays(cls, theBezier: cadex.ModelData_BezierSurface) -> dict:
+        aNumberOfUPoles = theBezier.NumberOfUPoles()
+        aNumberOfVPoles = theBezier.NumberOfVPoles()
+        return {"u_degree": theBezier.UDegree(),
+                "v_degree": theBezier.VDegree(),
+                "poles":    cls.Array2d(aNumberOfUPoles, aNumberOfVPoles,
+                                        lambda i, j: cls.Coordinates(theBezier.Pole(i, j))),
+                "weights":  cls.Array2d(aNumberOfUPoles, aNumberOfVPoles, theBezier.Weight)}
+
+    # B-Spline surface data as NumPy arrays: poles are (nu, nv, 3), weights are (nu, nv)
+    @classmethod
+    def BSplineSurfaceArrays(cls, theBSpline: cadex.ModelData_BSplineSurface) -> dict:
+        aNumberOfUKnots = theBSpline.NumberOfUKnots()
+        aNumberOfVKnots = theBSpline.NumberOfVKnots()
+        aNumberOfUPoles = theBSpline.NumberOfUPoles()
+        aNumberOfVPoles = theBSpline.NumberOfVPoles()
+        return {"u_degree":         theBSpline.UDegree(),
+                "v_degree":         theBSpline.VDegree(),
+                "u_knots":          cls.Array1d(aNumberOfUKnots, theBSpline.UKnot),
+                "v_knots":          cls.Array1d(aNumberOfVKnots, theBSpline.VKnot),
+                "u_multiplicities": cls.Array1d(aNumberOfUKnots, theBSpline.UMultiplicity, np.int32),
+                "v_multiplicities": cls.Array1d(aNumberOfVKnots, theBSpline.VMultiplicity, np.int32),
+                "poles":            cls.Array2d(aNumberOfUPoles, aNumberOfVPoles,
+                                                lambda i, j: cls.Coordinates(theBSpline.Pole(i, j))),
+                "weights":          cls.Array2d(aNumberOfUPoles, aNumberOfVPoles, theBSpline.Weight)}
+
     @classmethod
     def PrintPlane(cls, thePlane: cadex.ModelData_Plane):
         cls.PrintName("Plane")
@@ -107,7 +146,7 @@ class SurfaceExplorer(BaseExplorer):
         aDir = theLinearExtrusion.Direction()
         cls.PrintDomain(theLinearExtrusion)
         cls.PrintNamedParameter("Direction", aDir)
-        print("Basis Curve = ", end="")
+        cls.PrintText("Basis Curve = ")
         CurveExplorer.PrintCurveInfo(theLinearExtrusion.BasisCurve())
 
     @classmethod
@@ -115,10 +154,10 @@ class SurfaceExplorer(BaseExplorer):
         cls.PrintName("Revolution Surface")
         aDir = theRevolution.Direction()
         aLoc = theRevolution.Location()
-        print(cls.PrintDomain(theRevolution), end="")
+        cls.PrintDomain(theRevolution)
         cls.PrintNamedParameter("Location", aLoc)
         cls.PrintNamedParameter("Direction", aDir)
-        print("Basis Curve = ", end="")
+        cls.PrintText("Basis Curve = ")
         CurveExplorer.PrintCurveInfo(theRevolution.BasisCurve())
 
     @classmethod
@@ -138,13 +177,13 @@ class SurfaceExplorer(BaseExplorer):
             aPole = theBezier.Pole(i, j)
             cls.PrintParameter(aPole)
 
-        cls.PrintCollection("Poles", aNumberOfUPoles, aNumberOfVPoles, PrintPole)
+        cls.Print3dCollection("Poles", aNumberOfUPoles, aNumberOfVPoles, PrintPole)
 
         def PrintWeight(i,j):
             aWeight = theBezier.Weight(i, j)
             cls.PrintParameter(aWeight)
 
-        cls.PrintCollection("Weights", aNumberOfUPoles, aNumberOfVPoles, PrintWeight)
+        cls.Print3dCollection("Weights", aNumberOfUPoles, aNumberOfVPoles, PrintWeight)
 
     @classmethod
     def PrintBSplineSurface(cls, theBSpline: cadex.ModelData_BSplineSurface):
@@ -206,12 +245,12 @@ class SurfaceExplorer(BaseExplorer):
         anOffset = theOffset.Offset()
         cls.PrintDomain(theOffset)
         cls.PrintNamedParameter("Offset", anOffset)
-        print("Basis Surface = ", end="")
+        cls.PrintText("Basis Surface = ")
         cls.PrintSurface(theOffset.BasisSurface())
 
     @classmethod
     def PrintTrimmedSurface(cls, theTrimmed: cadex.ModelData_RectangularTrimmedSurface):
         cls.PrintName("Trimmed Surface")
         cls.PrintDomain(theTrimmed)
-        print("Basis Surface = ", end="")
+        cls.PrintText("Basis Surface = ")
         cls.PrintSurface(theTrimmed.BasisSurface())
@@ -40,16 +40,42 @@ sys.path.append(os.path.abspath(os.path.dirname(Path(__file__).resolve()) + "/..
 import cadex_license as license
 
 
+SHAPE_TYPE_NAMES = {
+    cadex.ModelData_ST_Body:   "Body",
+    cadex.ModelData_ST_Solid:  "Solid",
+    cadex.ModelData_ST_Shell:  "Shell",
+    cadex.ModelData_ST_Wire:   "Wire",
+    cadex.ModelData_ST_Face:   "Face",
+    cadex.ModelData_ST_Edge:   "Edge",
+    cadex.ModelData_ST_Vertex: "Vertex",
+}
+
 class PartBRepVisitor(cadex.ModelData_Model_VoidElementVisitor):
-    def __init__(self):
+    # With theUnique set, shapes shared by several parents (e.g. edges and vertices of adjacent faces)
+    # are printed and explored once, and myShapeCounts keeps how many times each shape is referenced
+    # by its unique parents (e.g. a vertex shared by two edges has count 2)
+    def __init__(self, theUnique: bool = False):
         super().__init__()
         self.myNestingLevel = 0
         self.myShapeSet = set()
+        self.myUnique = theUnique
+        self.myShapeCounts = {}
 
     def PrintUniqueShapesCount(self):
         print()
         print(f"Total unique shapes count: {len(self.myShapeSet)}")
 
+    def PrintOccurrenceCounts(self):
+        aUnique, anOccurrences = {}, {}
+        for aShape, aCount in self.myShapeCounts.items():
+            aName = SHAPE_TYPE_NAMES.get(aShape.Type(), "Undefined")
+            aUnique[aName] = aUnique.get(aName, 0) + 1
+            anOccurrences[aName] = anOccurrences.get(aName, 0) + aCount
+        print()
+        print("Shape type | unique | occurrences")
+        for aName in aUnique:
+            print(f"{aName.ljust(10)} | {str(aUnique[aName]).ljust(6)} | {anOccurrences[aName]}")
+
     def VisitPart(self, thePart: cadex.ModelData_Part):
         aBRep = thePart.BRepRepresentation()
         if aBRep:
@@ -62,7 +88,10 @@ class PartBRepVisitor(cadex.ModelData_Model_VoidElementVisitor):
 
         for i, aBody in enumerate(aBodyList):
             print("Body ", i, ": -type ", self.PrintBodyType(aBody))
-            self.ExploreShape(aBody)
+            if self.myUnique:
+                self.ExploreUniqueShapes(aBody)
+            else:
+                self.ExploreShape(aBody)
 
 
     # Recursive iterating over the Shape until reaching vertices
@@ -75,6 +104,33 @@ class PartBRepVisitor(cadex.ModelData_Model_VoidElementVisitor):
 
         self.myNestingLevel -= 1
 
+    # Iterative depth-first exploration which descends into each unique subshape only once.
+    # Repeated occurrences are counted but neither printed nor explored again, so the work is
+    # proportional to the number of unique shapes and deep B-Reps don't hit the recursion limit
+    def ExploreUniqueShapes(self, theShape: cadex.ModelData_Shape):
+        self.myShapeCounts[theShape] = self.myShapeCounts.get(theShape, 0) + 1
+        if theShape in self.myShapeSet:
+            return
+        self.myShapeSet.add(theShape)
+
+        aStack = [(theShape, 0)]
+        while aStack:
+            aParent, aLevel = aStack.pop()
+            if aLevel > 0:
+                self.myNestingLevel = aLevel
+                self.PrintShapeInfo(aParent)
+
+            aChildren = []
+            for aShape in aParent.GetIterator():
+                self.myShapeCounts[aShape] = self.myShapeCounts.get(aShape, 0) + 1
+                if aShape not in self.myShapeSet:
+                    self.myShapeSet.add(aShape)
+                    aChildren.append((aShape, aLevel + 1))
+
+            # Reversed to print children in the same order as ExploreShape() does
+            aStack.extend(reversed(aChildren))
+        self.myNestingLevel = 0
+
     # Returns body type name
     def PrintBodyType(self, theBody: cadex.ModelData_Body) -> str:
         aType = theBody.BodyType()
@@ -210,7 +266,7 @@ class PartBRepVisitor(cadex.ModelData_Model_VoidElementVisitor):
         print("- " * self.myNestingLevel, end="")
 
 
-def main(theSource:str):
+def main(theSource:str, theUnique: bool = False):
     aKey = license.Value()
 
     if not cadex.LicenseManager.Activate(aKey):
@@ -224,19 +280,22 @@ def main(theSource:str):
         return 1
 
     # Explore B-Rep representation of model parts
-    aVisitor = PartBRepVisitor()
+    aVisitor = PartBRepVisitor(theUnique)
     aModel.AcceptElementVisitor(aVisitor)
 
     aVisitor.PrintUniqueShapesCount()
+    if theUnique:
+        aVisitor.PrintOccurrenceCounts()
 
     print("Completed")
     return 0
 
 if __name__ == "__main__":
-    if len(sys.argv) != 2:
-        print("Usage: " + os.path.abspath(Path(__file__).resolve()) + " <input_file>, where:")
+    if len(sys.argv) != 2 and (len(sys.argv) != 3 or sys.argv[2] != "--unique"):
+        print("Usage: " + os.path.abspath(Path(__file__).resolve()) + " <input_file> [--unique], where:")
         print("    <input_file>  is a name of the XML file to be read")
+        print("    --unique      explores shared subshapes once and reports their occurrence counts")
         sys.exit(1)
 
     aSource = os.path.abspath(sys.argv[1])
-    sys.exit(main(aSource))
\ No newline at end of file
+    sys.exit(main(aSource, len(sys.argv) == 3))
\ No newline at end of file
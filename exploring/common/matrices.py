@@ -0,0 +1,52 @@
+# $Id$
+
+# Copyright (C) 2008-2014, Roman Lygin. All rights reserved.
+# Copyright (C) 2014-2022, CADEX. All rights reserved.
+
+# This file is part of the CAD Exchanger software.
+
+# You may use this file under the terms of the BSD license as follows:
+
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+# * Redistributions of source code must retain the above copyright notice,
+# this list of conditions and the following disclaimer.
+# * Redistributions in binary form must reproduce the above copyright notice,
+# this list of conditions and the following disclaimer in the documentation
+# and/or other materials provided with the distribution.
+
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+
+
+import numpy as np
+
+import cadexchanger.CadExCore as cadex
+
+
+# Converts a transformation into a 4x4 homogeneous matrix. The rotation part of
+# ModelData_Transformation does not include the uniform scale factor, so it is applied here
+def TransformationMatrix(theTrsf: cadex.ModelData_Transformation) -> np.ndarray:
+    aMatrix = np.identity(4)
+    aMatrix[:3, :3] = np.reshape(theTrsf.RotationPart(), (3, 3)) * theTrsf.ScaleFactor()
+    aTranslation = theTrsf.TranslationPart()
+    aMatrix[:3, 3] = (aTranslation.X(), aTranslation.Y(), aTranslation.Z())
+    return aMatrix
+
+# Transforms boxes given by (N, 3) corners with (N, 4, 4) matrices into world axis-aligned boxes:
+# the center is transformed as a point, the half-extent by the absolute values of the rotation part
+def TransformBoxes(theMins: np.ndarray, theMaxs: np.ndarray, theMatrices: np.ndarray):
+    aRotations = theMatrices[:, :3, :3]
+    aCenters = np.einsum("nij,nj->ni", aRotations, (theMins + theMaxs) / 2) + theMatrices[:, :3, 3]
+    anExtents = np.einsum("nij,nj->ni", np.abs(aRotations), (theMaxs - theMins) / 2)
+    return aCenters - anExtents, aCenters + anExtents
@@ -0,0 +1,243 @@
+# $Id$
+
+# Copyright (C) 2008-2014, Roman Lygin. All rights reserved.
+# Copyright (C) 2014-2022, CADEX. All rights reserved.
+
+# This file is part of the CAD Exchanger software.
+
+# You may use this file under the terms of the BSD license as follows:
+
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+# * Redistributions of source code must retain the above copyright notice,
+# this list of conditions and the following disclaimer.
+# * Redistributions in binary form must reproduce the above copyright notice,
+# this list of conditions and the following disclaimer in the documentation
+# and/or other materials provided with the distribution.
+
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+
+
+import sys
+import io
+import json
+import atexit
+
+
+# Destination of the exploring examples output. Explorers emit data items instead of calling print():
+#   Indent(level, prefix)            - starts a line at the given nesting level
+#   Name(name)                       - names the element the following fields belong to
+#   Field(name, value)               - named value
+#   BeginCollection(name), Value(v), EndCollection() - (nested) list of values
+#   Write(text)                      - free text
+#   NewLine()                        - ends the current line (record)
+# Values are numbers, strings, tuples (points and directions) and lists (ranges).
+# The base class discards everything and serves as a null backend
+class OutputBackend:
+    def Indent(self, theLevel: int, thePrefix: str):
+        pass
+
+    def Name(self, theName: str):
+        pass
+
+    def Field(self, theName: str, theValue):
+        pass
+
+    def BeginCollection(self, theName: str = None):
+        pass
+
+    def Value(self, theValue):
+        pass
+
+    def EndCollection(self):
+        pass
+
+    def Write(self, theText: str):
+        pass
+
+    def NewLine(self):
+        pass
+
+    def Flush(self):
+        pass
+
+
+class NullOutput(OutputBackend):
+    pass
+
+
+# Formats the output as human readable text, accumulating it in memory and writing
+# to theStream in large blocks instead of a print() call per value.
+# Without theStream the output goes to sys.stdout as it is at the time of writing.
+# Whatever is left in the buffer is written at exit, even if Flush() is never called
+class TextOutput(OutputBackend):
+    def __init__(self, theStream=None, theBufferSize: int = 1 << 20):
+        self.myStream = theStream
+        self.myBuffer = io.StringIO()
+        self.myBufferSize = theBufferSize
+        atexit.register(self.Flush)
+
+    @staticmethod
+    def Format(theValue) -> str:
+        if isinstance(theValue, tuple):
+            return "(" + ", ".join(str(v) for v in theValue) + ")"
+        return str(theValue)
+
+    def Indent(self, theLevel: int, thePrefix: str):
+        self.myBuffer.write(thePrefix)
+
+    def Name(self, theName: str):
+        self.myBuffer.write(f"{theName}: ")
+
+    def Field(self, theName: str, theValue):
+        self.myBuffer.write(f"{theName} = {self.Format(theValue)}; ")
+
+    def BeginCollection(self, theName: str = None):
+        if theName:
+            self.myBuffer.write(f"{theName} = ")
+        self.myBuffer.write("[")
+
+    def Value(self, theValue):
+        self.myBuffer.write(f"{self.Format(theValue)}; ")
+
+    def EndCollection(self):
+        self.myBuffer.write("]; ")
+
+    def Write(self, theText: str):
+        self.myBuffer.write(theText)
+
+    def NewLine(self):
+        self.myBuffer.write("\n")
+        if self.myBuffer.tell() >= self.myBufferSize:
+            self.Flush()
+
+    def Flush(self):
+        if self.myBuffer.tell():
+            aStream = self.myStream or sys.stdout
+            aStream.write(self.myBuffer.getvalue())
+            aStream.flush()
+            self.myBuffer = io.StringIO()
+
+
+# Builds a dict per output line. Fields following Name() are grouped under that name,
+# e.g. {"level": 2, "Edge": {"Orientation": "Forward", "Tolerance": 1e-07}}.
+# Completed records are kept in myRecords
+class RecordOutput(OutputBackend):
+    def __init__(self):
+        self.myRecords = []
+        self.myRecord = {}
+        self.myTarget = self.myRecord
+        self.myCollections = []
+
+    def Indent(self, theLevel: int, thePrefix: str):
+        self.myRecord["level"] = theLevel
+
+    def Name(self, theName: str):
+        aKey, i = theName, 1
+        while aKey in self.myRecord:
+            i += 1
+            aKey = f"{theName} {i}"
+        self.myTarget = self.myRecord[aKey] = {}
+
+    def Field(self, theName: str, theValue):
+        self.myTarget[theName] = theValue
+
+    def BeginCollection(self, theName: str = None):
+        self.myCollections.append((theName, []))
+
+    def Value(self, theValue):
+        if self.myCollections:
+            self.myCollections[-1][1].append(theValue)
+        else:
+            self.myTarget.setdefault("values", []).append(theValue)
+
+    def EndCollection(self):
+        aName, aValues = self.myCollections.pop()
+        if self.myCollections:
+            self.myCollections[-1][1].append(aValues)
+        else:
+            self.myTarget[aName] = aValues
+
+    def Write(self, theText: str):
+        # Inside collections the text only marks truncation ("..."), the values are already recorded
+        if not self.myCollections:
+            self.myRecord["text"] = self.myRecord.get("text", "") + theText
+
+    def NewLine(self):
+        if "text" in self.myRecord:
+            self.myRecord["text"] = self.myRecord["text"].strip(" =:;")
+        if self.myRecord:
+            self.Emit(self.myRecord)
+        self.myRecord = {}
+        self.myTarget = self.myRecord
+
+    def Emit(self, theRecord: dict):
+        self.myRecords.append(theRecord)
+
+    def Flush(self):
+        if self.myRecord:
+            self.NewLine()
+
+
+# Serializes records as JSON Lines into a memory buffer written to theStream in large blocks.
+# The standard output and the flush at exit are handled as in TextOutput
+class JSONLinesOutput(RecordOutput):
+    def __init__(self, theStream=None, theBufferSize: int = 1 << 20):
+        super().__init__()
+        self.myStream = theStream
+        self.myBuffer = io.StringIO()
+        self.myBufferSize = theBufferSize
+        atexit.register(self.Flush)
+
+    def Emit(self, theRecord: dict):
+        self.myBuffer.write(json.dumps(theRecord))
+        self.myBuffer.write("\n")
+        if self.myBuffer.tell() >= self.myBufferSize:
+            self.WriteBuffer()
+
+    def WriteBuffer(self):
+        if self.myBuffer.tell():
+            aStream = self.myStream or sys.stdout
+            aStream.write(self.myBuffer.getvalue())
+            aStream.flush()
+            self.myBuffer = io.StringIO()
+
+    def Flush(self):
+        super().Flush()
+        self.WriteBuffer()
+
+
+# Feeds records serialized as by JSONLinesOutput into theHash (e.g. hashlib.sha256()) instead of a stream,
+# so that everything the explorers emit about a shape can serve as its content key
+class DigestOutput(RecordOutput):
+    def __init__(self, theHash):
+        super().__init__()
+        self.myHash = theHash
+
+    def Emit(self, theRecord: dict):
+        self.myHash.update(json.dumps(theRecord).encode("utf-8"))
+        self.myHash.update(b"\n")
+
+
+OUTPUT_FORMATS = ("text", "jsonl", "null")
+
+# Creates an output of theFormat writing to theStream, the standard output by default
+def CreateOutput(theFormat: str = "text", theStream=None) -> OutputBackend:
+    if theFormat == "text":
+        return TextOutput(theStream)
+    if theFormat == "jsonl":
+        return JSONLinesOutput(theStream)
+    if theFormat == "null":
+        return NullOutput()
+    raise ValueError("Unsupported output format " + theFormat)
@@ -0,0 +1,117 @@
+# $Id$
+
+# Copyright (C) 2008-2014, Roman Lygin. All rights reserved.
+# Copyright (C) 2014-2022, CADEX. All rights reserved.
+
+# This file is part of the CAD Exchanger software.
+
+# You may use this file under the terms of the BSD license as follows:
+
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+# * Redistributions of source code must retain the above copyright notice,
+# this list of conditions and the following disclaimer.
+# * Redistributions in binary form must reproduce the above copyright notice,
+# this list of conditions and the following disclaimer in the documentation
+# and/or other materials provided with the distribution.
+
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+
+
+import sys
+from pathlib import Path
+import os
+import multiprocessing
+import time
+
+import cadexchanger.CadExCore as cadex
+
+sys.path.append(os.path.abspath(os.path.dirname(Path(__file__).resolve()) + "/../../"))
+import cadex_license as license
+
+
+# Unique parts of the model in the order of the visit, so every process gets the same indices
+class PartCollector(cadex.ModelData_Model_VoidElementVisitor):
+    def __init__(self):
+        super().__init__()
+        self.myParts = []
+        self.myPartSet = set()
+
+    def VisitPart(self, thePart: cadex.ModelData_Part):
+        if thePart not in self.myPartSet:
+            self.myPartSet.add(thePart)
+            self.myParts.append(thePart)
+
+
+def ReadParts(theSource: str):
+    aModel = cadex.ModelData_Model()
+    if not cadex.ModelData_ModelReader().Read(cadex.Base_UTF16String(theSource), aModel):
+        return None
+    aCollector = PartCollector()
+    aModel.AcceptElementVisitor(aCollector)
+    return aCollector.myParts
+
+
+# Set once per worker process by InitWorker()
+gParts = None
+
+# SDK objects can't be passed between processes, so every worker reads the model once
+# and then takes part indices
+def InitWorker(theSource: str):
+    global gParts
+    if cadex.LicenseManager.Activate(license.Value()):
+        gParts = ReadParts(theSource)
+
+def ApplyToPart(theTask: tuple) -> tuple:
+    aFunction, anIndex = theTask
+    if gParts is None:
+        raise RuntimeError("Worker failed to activate the license or to read the model")
+    return anIndex, aFunction(gParts[anIndex])
+
+
+# Yields (index, theFunction(part)) for the parts with theIndices, in no particular order.
+# Every worker has to read the model again, which takes about theReadTime (workers read in parallel),
+# so the pool pays off only when the parts take longer than that. Parts are processed serially
+# first, and the remaining ones are handed to theNumberOfWorkers processes only once their
+# projected serial time exceeds the break-even point theReadTime * N / (N - 1).
+# theFunction must be a module-level function so that it can be sent to the workers
+def MapParts(theFunction, theParts: list, theIndices: list, theSource: str, theReadTime: float,
+             theNumberOfWorkers: int):
+    aBreakEven = theReadTime * theNumberOfWorkers / (theNumberOfWorkers - 1) if theNumberOfWorkers > 1 else None
+
+    aSerialTime = 0.0
+    aNext = 0
+    while aNext < len(theIndices):
+        aRemaining = len(theIndices) - aNext
+        if aBreakEven is not None and aNext > 0 and aRemaining > 1 \
+                and aSerialTime / aNext * aRemaining > aBreakEven:
+            break
+        anIndex = theIndices[aNext]
+        aStart = time.perf_counter()
+        aResult = theFunction(theParts[anIndex])
+        aSerialTime += time.perf_counter() - aStart
+        aNext += 1
+        yield anIndex, aResult
+
+    if aNext == len(theIndices):
+        print(f"{aNext} parts processed serially in {aSerialTime:.2f} s (reading the model takes {theReadTime:.2f} s)")
+        return
+
+    print(f"{aNext} parts processed serially in {aSerialTime:.2f} s, the remaining {len(theIndices) - aNext} "
+          f"are sent to {theNumberOfWorkers} workers (reading the model takes {theReadTime:.2f} s)")
+    aTasks = [(theFunction, anIndex) for anIndex in theIndices[aNext:]]
+    # A few chunks per worker to even out parts of different size
+    aChunkSize = max(1, len(aTasks) // (theNumberOfWorkers * 4))
+    with multiprocessing.Pool(theNumberOfWorkers, initializer=InitWorker, initargs=(theSource,)) as aPool:
+        yield from aPool.imap_unordered(ApplyToPart, aTasks, chunksize=aChunkSize)
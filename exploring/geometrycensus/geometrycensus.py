@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+
+# $Id$
+
+# Copyright (C) 2008-2014, Roman Lygin. All rights reserved.
+# Copyright (C) 2014-2022, CADEX. All rights reserved.
+
+# This file is part of the CAD Exchanger software.
+
+# You may use this file under the terms of the BSD license as follows:
+
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+# * Redistributions of source code must retain the above copyright notice,
+# this list of conditions and the following disclaimer.
+# * Redistributions in binary form must reproduce the above copyright notice,
+# this list of conditions and the following disclaimer in the documentation
+# and/or other materials provided with the distribution.
+
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+
+
+import sys
+from pathlib import Path
+import os
+import time
+
+import numpy as np
+
+import cadexchanger.CadExCore as cadex
+
+sys.path.append(os.path.abspath(os.path.dirname(Path(__file__).resolve()) + "/../../"))
+import cadex_license as license
+sys.path.append(os.path.abspath(os.path.dirname(Path(__file__).resolve()) + "/../common"))
+from partpool import ReadParts, MapParts
+
+
+SURFACE_TYPES = (
+    (cadex.ModelData_ST_Plane,           "Plane"),
+    (cadex.ModelData_ST_Cylinder,        "Cylinder"),
+    (cadex.ModelData_ST_Cone,            "Cone"),
+    (cadex.ModelData_ST_Sphere,          "Sphere"),
+    (cadex.ModelData_ST_Torus,           "Torus"),
+    (cadex.ModelData_ST_LinearExtrusion, "LinearExtrusion"),
+    (cadex.ModelData_ST_Revolution,      "Revolution"),
+    (cadex.ModelData_ST_Bezier,          "Bezier"),
+    (cadex.ModelData_ST_BSpline,         "BSpline"),
+    (cadex.ModelData_ST_Offset,          "Offset"),
+    (cadex.ModelData_ST_Trimmed,         "Trimmed"),
+)
+
+CURVE_TYPES = (
+    (cadex.ModelData_CT_Line,      "Line"),
+    (cadex.ModelData_CT_Circle,    "Circle"),
+    (cadex.ModelData_CT_Ellipse,   "Ellipse"),
+    (cadex.ModelData_CT_Hyperbola, "Hyperbola"),
+    (cadex.ModelData_CT_Parabola,  "Parabola"),
+    (cadex.ModelData_CT_Bezier,    "Bezier"),
+    (cadex.ModelData_CT_BSpline,   "BSpline"),
+    (cadex.ModelData_CT_Offset,    "Offset"),
+    (cadex.ModelData_CT_Trimmed,   "Trimmed"),
+)
+
+# Type -> histogram slot, unknown types go to the last ("Undefined") slot
+SURFACE_SLOTS = {aType: i for i, (aType, _) in enumerate(SURFACE_TYPES)}
+CURVE_SLOTS = {aType: i for i, (aType, _) in enumerate(CURVE_TYPES)}
+SURFACE_NAMES = [aName for _, aName in SURFACE_TYPES] + ["Undefined"]
+CURVE_NAMES = [aName for _, aName in CURVE_TYPES] + ["Undefined"]
+
+# Degrees above this one are counted in the last slot
+MAX_DEGREE = 25
+
+TOLERANCE_PERCENTILES = (50, 90, 99, 100)
+
+
+# Per-type counts, B-Spline degree and pole count distributions and tolerances of B-Rep parts.
+# Counts accumulate in arrays, so censuses of disjoint part sets are merged by addition
+class GeometryCensus:
+    def __init__(self):
+        self.myNumberOfParts = 0
+        self.mySurfaceCounts = np.zeros(len(SURFACE_NAMES), dtype=np.int64)
+        self.myCurveCounts = np.zeros(len(CURVE_NAMES), dtype=np.int64)
+        self.mySurfaceDegrees = np.zeros(MAX_DEGREE + 1, dtype=np.int64)
+        self.myCurveDegrees = np.zeros(MAX_DEGREE + 1, dtype=np.int64)
+        self.mySurfacePoles = []
+        self.myCurvePoles = []
+        self.myEdgeTolerances = []
+        self.myVertexTolerances = []
+
+    def AddPart(self, thePart: cadex.ModelData_Part):
+        aBRep = thePart.BRepRepresentation()
+        if not aBRep:
+            return
+        self.myNumberOfParts += 1
+
+        # Shared edges and vertices are counted once per part
+        aShapeSet = set()
+        for aBody in aBRep.Get():
+            for aFaceShape in cadex.ModelData_Shape_Iterator(aBody, cadex.ModelData_ST_Face):
+                if aFaceShape not in aShapeSet:
+                    aShapeSet.add(aFaceShape)
+                    self.AddSurface(cadex.ModelData_Face.Cast(aFaceShape).Surface())
+
+            for anEdgeShape in cadex.ModelData_Shape_Iterator(aBody, cadex.ModelData_ST_Edge):
+                if anEdgeShape not in aShapeSet:
+                    aShapeSet.add(anEdgeShape)
+                    anEdge = cadex.ModelData_Edge.Cast(anEdgeShape)
+                    self.myEdgeTolerances.append(anEdge.Tolerance())
+                    if not anEdge.IsDegenerated():
+                        aCurve, _, _ = anEdge.Curve()
+                        self.AddCurve(aCurve)
+
+            for aVertexShape in cadex.ModelData_Shape_Iterator(aBody, cadex.ModelData_ST_Vertex):
+                if aVertexShape not in aShapeSet:
+                    aShapeSet.add(aVertexShape)
+                    self.myVertexTolerances.append(cadex.ModelData_Vertex.Cast(aVertexShape).Tolerance())
+
+    def AddSurface(self, theSurface: cadex.ModelData_Surface):
+        aType = theSurface.Type()
+        self.mySurfaceCounts[SURFACE_SLOTS.get(aType, -1)] += 1
+        if aType == cadex.ModelData_ST_BSpline:
+            aBSpline = cadex.ModelData_BSplineSurface.Cast(theSurface)
+            self.mySurfaceDegrees[min(max(aBSpline.UDegree(), aBSpline.VDegree()), MAX_DEGREE)] += 1
+            self.mySurfacePoles.append(aBSpline.NumberOfUPoles() * aBSpline.NumberOfVPoles())
+
+    def AddCurve(self, theCurve: cadex.ModelData_Curve):
+        aType = theCurve.Type()
+        self.myCurveCounts[CURVE_SLOTS.get(aType, -1)] += 1
+        if aType == cadex.ModelData_CT_BSpline:
+            aBSpline = cadex.ModelData_BSplineCurve.Cast(theCurve)
+            self.myCurveDegrees[min(aBSpline.Degree(), MAX_DEGREE)] += 1
+            self.myCurvePoles.append(aBSpline.NumberOfPoles())
+
+    def Merge(self, theOther):
+        self.myNumberOfParts += theOther.myNumberOfParts
+        self.mySurfaceCounts += theOther.mySurfaceCounts
+        self.myCurveCounts += theOther.myCurveCounts
+        self.mySurfaceDegrees += theOther.mySurfaceDegrees
+        self.myCurveDegrees += theOther.myCurveDegrees
+        self.mySurfacePoles.extend(theOther.mySurfacePoles)
+        self.myCurvePoles.extend(theOther.myCurvePoles)
+        self.myEdgeTolerances.extend(theOther.myEdgeTolerances)
+        self.myVertexTolerances.extend(theOther.myVertexTolerances)
+
+    # Pole count histogram with power-of-two bins: [1, 2), [2, 4), [4, 8), ...
+    # Returns no bins if there are no poles
+    @staticmethod
+    def PoleHistogram(thePoles: list):
+        if not thePoles:
+            return np.zeros(0, dtype=np.int64), np.ones(1, dtype=np.int64)
+        aPoles = np.asarray(thePoles, dtype=np.int64)
+        aBins = 2 ** np.arange(int(np.log2(aPoles.max())) + 2)
+        return np.histogram(aPoles, bins=aBins)
+
+    @staticmethod
+    def TolerancePercentiles(theTolerances: list) -> np.ndarray:
+        if not theTolerances:
+            return np.zeros(len(TOLERANCE_PERCENTILES))
+        return np.percentile(np.asarray(theTolerances), TOLERANCE_PERCENTILES)
+
+    @staticmethod
+    def PrintCounts(theTitle: str, theNames: list, theCounts: np.ndarray):
+        print(theTitle)
+        for i in np.flatnonzero(theCounts):
+            print(f"    {str(theNames[i]).ljust(16)} {theCounts[i]}")
+
+    def PrintHistograms(self):
+        print(f"Parts with B-Rep: {self.myNumberOfParts}")
+        self.PrintCounts("Faces per surface type:", SURFACE_NAMES, self.mySurfaceCounts)
+        self.PrintCounts("Edges per curve type:", CURVE_NAMES, self.myCurveCounts)
+        self.PrintCounts("B-Spline surface degrees:", range(MAX_DEGREE + 1), self.mySurfaceDegrees)
+        self.PrintCounts("B-Spline curve degrees:", range(MAX_DEGREE + 1), self.myCurveDegrees)
+
+        for aTitle, aPoles in (("B-Spline surface poles:", self.mySurfacePoles),
+                               ("B-Spline curve poles:", self.myCurvePoles)):
+            aCounts, aBins = self.PoleHistogram(aPoles)
+            self.PrintCounts(aTitle, [f"{aBins[i]}-{aBins[i + 1] - 1}" for i in range(len(aCounts))], aCounts)
+
+        for aTitle, aTolerances in (("Edge tolerances:", self.myEdgeTolerances),
+                                    ("Vertex tolerances:", self.myVertexTolerances)):
+            aValues = self.TolerancePercentiles(aTolerances)
+            print(aTitle + " " + ", ".join(f"p{aPercentile} = {aValue:.3g}"
+                                           for aPercentile, aValue in zip(TOLERANCE_PERCENTILES, aValues)))
+
+
+# Census of a single part, runs in the worker processes too
+def PartCensus(thePart: cadex.ModelData_Part) -> GeometryCensus:
+    aCensus = GeometryCensus()
+    aCensus.AddPart(thePart)
+    return aCensus
+
+
+def main(theSource: str, theNumberOfWorkers: int = os.cpu_count()):
+    aKey = license.Value()
+
+    if not cadex.LicenseManager.Activate(aKey):
+        print("Failed to activate CAD Exchanger license.")
+        return 1
+
+    aStart = time.perf_counter()
+    aParts = ReadParts(theSource)
+    if aParts is None:
+        print("Failed to read the file " + theSource)
+        return 1
+    aReadTime = time.perf_counter() - aStart
+
+    # Workers are started only if the parts take longer than the workers need to read the model again
+    aCensus = GeometryCensus()
+    for _, aPartCensus in MapParts(PartCensus, aParts, list(range(len(aParts))), theSource, aReadTime,
+                                   theNumberOfWorkers):
+        aCensus.Merge(aPartCensus)
+
+    aCensus.PrintHistograms()
+    print(f"Census of {len(aParts)} parts took {time.perf_counter() - aStart:.2f} s")
+
+    print("Completed")
+    return 0
+
+if __name__ == "__main__":
+    if len(sys.argv) != 2 and len(sys.argv) != 3:
+        print("Usage: " + os.path.abspath(Path(__file__).resolve()) + " <input_file> [<number_of_workers>], where:")
+        print("    <input_file>        is a name of the XML file to be read")
+        print("    <number_of_workers> is a number of worker processes, CPU count by default")
+        sys.exit(1)
+
+    aSource = os.path.abspath(sys.argv[1])
+    aNumberOfWorkers = int(sys.argv[2]) if len(sys.argv) == 3 else os.cpu_count()
+    sys.exit(main(aSource, aNumberOfWorkers))
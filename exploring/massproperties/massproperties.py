@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+
+# $Id$
+
+# Copyright (C) 2008-2014, Roman Lygin. All rights reserved.
+# Copyright (C) 2014-2022, CADEX. All rights reserved.
+
+# This file is part of the CAD Exchanger software.
+
+# You may use this file under the terms of the BSD license as follows:
+
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+# * Redistributions of source code must retain the above copyright notice,
+# this list of conditions and the following disclaimer.
+# * Redistributions in binary form must reproduce the above copyright notice,
+# this list of conditions and the following disclaimer in the documentation
+# and/or other materials provided with the distribution.
+
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+
+
+import sys
+from pathlib import Path
+import os
+import hashlib
+import json
+import tempfile
+import time
+
+import numpy as np
+
+import cadexchanger.CadExCore as cadex
+
+sys.path.append(os.path.abspath(os.path.dirname(Path(__file__).resolve()) + "/../../"))
+import cadex_license as license
+sys.path.append(os.path.abspath(os.path.dirname(Path(__file__).resolve()) + "/../common"))
+from partpool import ReadParts, MapParts
+from outputbackend import DigestOutput
+sys.path.append(os.path.abspath(os.path.dirname(Path(__file__).resolve()) + "/../brepgeometry"))
+from base_explorer import BaseExplorer
+from surface_explorer import SurfaceExplorer
+from curve_explorer import CurveExplorer
+sys.path.append(os.path.abspath(os.path.dirname(Path(__file__).resolve()) + "/../topologygraph"))
+from topologygraph import TopologyGraph
+
+
+# Area, volume, centroid and bounding box of the B-Rep of thePart, None if it has no B-Rep.
+# Properties of all bodies are summed up, the centroid is weighted by body volumes
+# (by areas if the part has no volume, e.g. consists of sheet bodies)
+def PartProperties(thePart: cadex.ModelData_Part):
+    aBRep = thePart.BRepRepresentation()
+    if not aBRep:
+        return None
+
+    anArea, aVolume = 0.0, 0.0
+    aVolumeMoment, anAreaMoment = [0.0, 0.0, 0.0], [0.0, 0.0, 0.0]
+    for aBody in aBRep.Get():
+        aBodyArea = cadex.ModelAlgo_ValidationProperty.ComputeSurfaceArea(aBody)
+        aBodyVolume = cadex.ModelAlgo_ValidationProperty.ComputeVolume(aBody)
+        aCentroid = cadex.ModelData_Point()
+        cadex.ModelAlgo_ValidationProperty.ComputeCentroid(aBody, aCentroid)
+
+        anArea += aBodyArea
+        aVolume += aBodyVolume
+        for i, aCoordinate in enumerate((aCentroid.X(), aCentroid.Y(), aCentroid.Z())):
+            aVolumeMoment[i] += aCoordinate * aBodyVolume
+            anAreaMoment[i] += aCoordinate * aBodyArea
+
+    if aVolume > 0.0:
+        aCentroid = [aMoment / aVolume for aMoment in aVolumeMoment]
+    elif anArea > 0.0:
+        aCentroid = [aMoment / anArea for aMoment in anAreaMoment]
+    else:
+        aCentroid = [0.0, 0.0, 0.0]
+
+    aBox = cadex.ModelData_Box()
+    cadex.ModelAlgo_BoundingBox.Compute(aBRep, aBox)
+    aMin, aMax = aBox.MinCorner(), aBox.MaxCorner()
+
+    return {"area":     anArea,
+            "volume":   aVolume,
+            "centroid": aCentroid,
+            "bbox":     [[aMin.X(), aMin.Y(), aMin.Z()], [aMax.X(), aMax.Y(), aMax.Z()]]}
+
+# SHA-256 of the part B-Rep, so that parts which didn't change between revisions of an assembly
+# get the same hash. It covers the face-edge-vertex structure (see TopologyGraph), face and edge
+# orientations, edge ranges and tolerances, vertex points and tolerances and every parameter
+# the brepgeometry explorers print for surfaces and curves: domains, axis placements, radii, angles,
+# control nets and basis geometry. None for parts without B-Rep
+def PartHash(thePart: cadex.ModelData_Part) -> str:
+    aBRep = thePart.BRepRepresentation()
+    if not aBRep:
+        return None
+
+    aHash = hashlib.sha256()
+
+    # The shape goes into the hash too, so that arrays of different layouts never collide
+    def Update(theValues, theType=np.float64):
+        anArray = np.ascontiguousarray(theValues, dtype=theType)
+        aHash.update(np.asarray(anArray.shape, dtype=np.int64).tobytes())
+        aHash.update(anArray.tobytes())
+
+    aGraph = TopologyGraph()
+    aGraph.Build(aBRep)
+    Update(aGraph.myFaceEdgeOffsets, np.int64)
+    Update(aGraph.myFaceEdges, np.int32)
+    Update(aGraph.myEdgeVertexOffsets, np.int64)
+    Update(aGraph.myEdgeVertices, np.int32)
+
+    aFaces = [cadex.ModelData_Face.Cast(aShape) for aShape in aGraph.myFaces]
+    anEdges = [cadex.ModelData_Edge.Cast(aShape) for aShape in aGraph.myEdges]
+    aVertices = [cadex.ModelData_Vertex.Cast(aShape) for aShape in aGraph.myVertices]
+
+    # Edge uses in the order of myFaceEdges
+    Update([aFace.Orientation() for aFace in aFaces], np.int32)
+    Update([cadex.ModelData_Edge.Cast(anEdge).Orientation() for aFace in aGraph.myFaces
+            for anEdge in cadex.ModelData_Shape_Iterator(aFace, cadex.ModelData_ST_Edge)], np.int32)
+    Update([anEdge.Tolerance() for anEdge in anEdges])
+    Update([(aPoint.X(), aPoint.Y(), aPoint.Z(), aVertex.Tolerance())
+            for aVertex, aPoint in ((aVertex, aVertex.Point()) for aVertex in aVertices)])
+
+    # Geometry is written through the explorers into the hash, a record per surface or curve
+    aPreviousOutput = BaseExplorer.myOutput
+    anOutput = DigestOutput(aHash)
+    BaseExplorer.SetOutput(anOutput)
+    try:
+        for aFace in aFaces:
+            SurfaceExplorer.PrintSurface(aFace.Surface())
+            anOutput.NewLine()
+        for anEdge in anEdges:
+            if anEdge.IsDegenerated():
+                anOutput.Write("Degenerated")
+            else:
+                aCurve, aFirst, aLast = anEdge.Curve()
+                anOutput.Field("Range", [aFirst, aLast])
+                CurveExplorer.PrintCurveInfo(aCurve)
+            anOutput.NewLine()
+    finally:
+        BaseExplorer.SetOutput(aPreviousOutput)
+    return aHash.hexdigest()
+
+
+# Properties of parts stored by part content hash in a JSON file
+class PropertiesCache:
+    def __init__(self, thePath: str):
+        self.myPath = thePath
+        self.myEntries = {}
+        if os.path.exists(thePath):
+            with open(thePath, encoding="utf-8") as aFile:
+                self.myEntries = json.load(aFile)
+
+    def Get(self, theHash: str):
+        return self.myEntries.get(theHash) if theHash else None
+
+    def Put(self, theHash: str, theProperties: dict):
+        if theHash:
+            self.myEntries[theHash] = theProperties
+
+    def Save(self):
+        aTempPath = self.myPath + ".tmp"
+        with open(aTempPath, "w", encoding="utf-8") as aFile:
+            json.dump(self.myEntries, aFile)
+        os.replace(aTempPath, self.myPath)
+
+
+def PrintProperties(theName: str, theProperties: dict):
+    if theProperties is None:
+        print(f"{theName}: no B-Rep")
+        return
+    aMin, aMax = theProperties["bbox"]
+    print(f"{theName}:")
+    print(f"    Surface area: {theProperties['area']}")
+    print(f"    Volume:       {theProperties['volume']}")
+    print(f"    Centroid:     ({', '.join(str(v) for v in theProperties['centroid'])})")
+    print(f"    Bounding Box: ({', '.join(str(v) for v in aMin)}) - ({', '.join(str(v) for v in aMax)})")
+
+
+# theReadTime is how long reading theSource takes, the workers have to read it again (see MapParts())
+def ComputeProperties(theSource: str, theParts: list, theCache: PropertiesCache, theNumberOfWorkers: int,
+                      theReadTime: float) -> list:
+    aHashes = [PartHash(aPart) for aPart in theParts]
+    aProperties = [theCache.Get(aHash) for aHash in aHashes]
+
+    # Parts without B-Rep are cached as None too, so check for the key rather than the value
+    aMisses = [i for i, aHash in enumerate(aHashes) if not aHash or aHash not in theCache.myEntries]
+    print(f"{len(theParts) - len(aMisses)} of {len(theParts)} parts found in the cache")
+
+    # Only the parts missing in the cache are computed
+    for i, aPartProperties in MapParts(PartProperties, theParts, aMisses, theSource, theReadTime, theNumberOfWorkers):
+        aProperties[i] = aPartProperties
+        theCache.Put(aHashes[i], aPartProperties)
+    return aProperties
+
+
+def main(theSource: str, theCachePath: str = None, theNumberOfWorkers: int = os.cpu_count()):
+    aKey = license.Value()
+
+    if not cadex.LicenseManager.Activate(aKey):
+        print("Failed to activate CAD Exchanger license.")
+        return 1
+
+    aStart = time.perf_counter()
+    aParts = ReadParts(theSource)
+    if aParts is None:
+        print("Failed to read the file " + theSource)
+        return 1
+    aReadTime = time.perf_counter() - aStart
+
+    if not theCachePath:
+        theCachePath = os.path.join(tempfile.gettempdir(), "cadex_massproperties.json")
+    aCache = PropertiesCache(theCachePath)
+
+    aStart = time.perf_counter()
+    aProperties = ComputeProperties(theSource, aParts, aCache, theNumberOfWorkers, aReadTime)
+    aCache.Save()
+    print(f"Properties of {len(aParts)} parts computed in {time.perf_counter() - aStart:.2f} s")
+
+    for aPart, aPartProperties in zip(aParts, aProperties):
+        PrintProperties(str(aPart.Name()) or "noName", aPartProperties)
+
+    print("Completed")
+    return 0
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2 or len(sys.argv) > 4:
+        print("Usage: " + os.path.abspath(Path(__file__).resolve()) +
+              " <input_file> [<cache_file> [<number_of_workers>]], where:")
+        print("    <input_file>        is a name of the XML file to be read")
+        print("    <cache_file>        is a name of the JSON file to cache part properties in")
+        print("    <number_of_workers> is a number of worker processes, CPU count by default")
+        sys.exit(1)
+
+    aSource = os.path.abspath(sys.argv[1])
+    aCachePath = os.path.abspath(sys.argv[2]) if len(sys.argv) > 2 else None
+    aNumberOfWorkers = int(sys.argv[3]) if len(sys.argv) > 3 else os.cpu_count()
+    sys.exit(main(aSource, aCachePath, aNumberOfWorkers))
@@ -0,0 +1,376 @@
+#!/usr/bin/env python3
+
+# $Id$
+
+# Copyright (C) 2008-2014, Roman Lygin. All rights reserved.
+# Copyright (C) 2014-2022, CADEX. All rights reserved.
+
+# This file is part of the CAD Exchanger software.
+
+# You may use this file under the terms of the BSD license as follows:
+
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+# * Redistributions of source code must retain the above copyright notice,
+# this list of conditions and the following disclaimer.
+# * Redistributions in binary form must reproduce the above copyright notice,
+# this list of conditions and the following disclaimer in the documentation
+# and/or other materials provided with the distribution.
+
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+
+
+import sys
+from pathlib import Path
+import os
+import heapq
+import time
+
+import numpy as np
+
+import cadexchanger.CadExCore as cadex
+
+sys.path.append(os.path.abspath(os.path.dirname(Path(__file__).resolve()) + "/../../"))
+import cadex_license as license
+sys.path.append(os.path.abspath(os.path.dirname(Path(__file__).resolve()) + "/../occurrenceindex"))
+from occurrenceindex import OccurrenceIndex, PART, INSTANCE
+sys.path.append(os.path.abspath(os.path.dirname(Path(__file__).resolve()) + "/../common"))
+from matrices import TransformBoxes
+
+
+# Entry parameters of a ray into boxes, inf where the ray misses them. Works for a single box and for arrays
+def RayBoxes(theOrigin: np.ndarray, theInverseDirection: np.ndarray, theMins, theMaxs, theMaxDistance: float):
+    with np.errstate(invalid="ignore"):
+        aT1 = (theMins - theOrigin) * theInverseDirection
+        aT2 = (theMaxs - theOrigin) * theInverseDirection
+        # NaN appears for a ray parallel to a slab and starting on its plane, it doesn't constrain the ray
+        aNear = np.nanmax(np.minimum(aT1, aT2), axis=-1)
+        aFar = np.nanmin(np.maximum(aT1, aT2), axis=-1)
+    aNear = np.maximum(aNear, 0.0)
+    return np.where((aNear <= aFar) & (aNear <= theMaxDistance), aNear, np.inf)
+
+# Distances from a point to boxes, 0 for boxes containing it
+def PointBoxes(thePoint: np.ndarray, theMins, theMaxs):
+    aDelta = np.maximum(np.maximum(theMins - thePoint, thePoint - theMaxs), 0.0)
+    return np.sqrt((aDelta * aDelta).sum(axis=-1))
+
+
+# Bounding volume hierarchy over axis-aligned boxes (items) stored in flat arrays.
+# Nodes are split at the median of item centers along the longest axis and are numbered
+# in pre-order, so a parent always has a smaller index than its children:
+#   myNodeMins, myNodeMaxs - node boxes
+#   myLeft, myRight        - child nodes, -1 for leaves
+#   myParents              - parent nodes, -1 for the root
+#   myStarts, myCounts     - items of leaves as ranges of myItems
+#   myItemLeaves           - leaf of each item, used by Refit()
+class OccurrenceBVH:
+    def __init__(self, theLeafSize: int = 4):
+        self.myLeafSize = theLeafSize
+        self.Build(np.empty((0, 3)), np.empty((0, 3)))
+
+    def Build(self, theMins: np.ndarray, theMaxs: np.ndarray):
+        self.myItemMins = np.array(theMins, dtype=np.float64).reshape(-1, 3)
+        self.myItemMaxs = np.array(theMaxs, dtype=np.float64).reshape(-1, 3)
+        aNumberOfItems = len(self.myItemMins)
+        self.myItems = np.arange(aNumberOfItems)
+        self.myItemLeaves = np.zeros(aNumberOfItems, dtype=np.int64)
+        aCenters = (self.myItemMins + self.myItemMaxs) / 2
+
+        aMins, aMaxs, aLeft, aRight, aParents, aStarts, aCounts = [], [], [], [], [], [], []
+        aStack = [(0, aNumberOfItems, -1)] if aNumberOfItems else []
+        while aStack:
+            aStart, anEnd, aParent = aStack.pop()
+            aNode = len(aMins)
+            if aParent >= 0:
+                if aLeft[aParent] < 0:
+                    aLeft[aParent] = aNode
+                else:
+                    aRight[aParent] = aNode
+
+            anItems = self.myItems[aStart:anEnd]
+            aMins.append(self.myItemMins[anItems].min(axis=0))
+            aMaxs.append(self.myItemMaxs[anItems].max(axis=0))
+            aParents.append(aParent)
+            aLeft.append(-1)
+            aRight.append(-1)
+
+            if anEnd - aStart <= self.myLeafSize:
+                aStarts.append(aStart)
+                aCounts.append(anEnd - aStart)
+                self.myItemLeaves[anItems] = aNode
+                continue
+            aStarts.append(0)
+            aCounts.append(0)
+
+            aCenterRange = aCenters[anItems]
+            anAxis = np.argmax(aCenterRange.max(axis=0) - aCenterRange.min(axis=0))
+            aMiddle = (aStart + anEnd) // 2
+            anOrder = np.argpartition(aCenterRange[:, anAxis], aMiddle - aStart)
+            self.myItems[aStart:anEnd] = anItems[anOrder]
+
+            # The left child is popped first and gets the next index
+            aStack.append((aMiddle, anEnd, aNode))
+            aStack.append((aStart, aMiddle, aNode))
+
+        self.myNodeMins = np.array(aMins).reshape(-1, 3)
+        self.myNodeMaxs = np.array(aMaxs).reshape(-1, 3)
+        self.myLeft = np.array(aLeft, dtype=np.int64)
+        self.myRight = np.array(aRight, dtype=np.int64)
+        self.myParents = np.array(aParents, dtype=np.int64)
+        self.myStarts = np.array(aStarts, dtype=np.int64)
+        self.myCounts = np.array(aCounts, dtype=np.int64)
+
+    def LeafItems(self, theNode: int) -> np.ndarray:
+        return self.myItems[self.myStarts[theNode]:self.myStarts[theNode] + self.myCounts[theNode]]
+
+    # Items whose boxes overlap the box [theMin, theMax]
+    def Overlap(self, theMin, theMax) -> np.ndarray:
+        theMin, theMax = np.asarray(theMin, dtype=np.float64), np.asarray(theMax, dtype=np.float64)
+        aResult = []
+        aStack = [0] if len(self.myNodeMins) else []
+        while aStack:
+            aNode = aStack.pop()
+            if (self.myNodeMins[aNode] > theMax).any() or (self.myNodeMaxs[aNode] < theMin).any():
+                continue
+            if self.myLeft[aNode] < 0:
+                anItems = self.LeafItems(aNode)
+                aHits = ((self.myItemMins[anItems] <= theMax) & (self.myItemMaxs[anItems] >= theMin)).all(axis=1)
+                aResult.extend(anItems[aHits])
+            else:
+                aStack.append(self.myRight[aNode])
+                aStack.append(self.myLeft[aNode])
+        return np.array(aResult, dtype=np.int64)
+
+    # Items whose boxes are hit by the ray as (entry parameter, item) sorted by the parameter
+    def Ray(self, theOrigin, theDirection, theMaxDistance: float = np.inf) -> list:
+        anOrigin = np.asarray(theOrigin, dtype=np.float64)
+        with np.errstate(divide="ignore"):
+            anInverseDirection = 1.0 / np.asarray(theDirection, dtype=np.float64)
+
+        aResult = []
+        aStack = [0] if len(self.myNodeMins) else []
+        while aStack:
+            aNode = aStack.pop()
+            if RayBoxes(anOrigin, anInverseDirection, self.myNodeMins[aNode], self.myNodeMaxs[aNode],
+                        theMaxDistance) == np.inf:
+                continue
+            if self.myLeft[aNode] < 0:
+                anItems = self.LeafItems(aNode)
+                aParameters = RayBoxes(anOrigin, anInverseDirection, self.myItemMins[anItems],
+                                       self.myItemMaxs[anItems], theMaxDistance)
+                aResult.extend((float(t), int(i)) for t, i in zip(aParameters, anItems) if t < np.inf)
+            else:
+                aStack.append(self.myRight[aNode])
+                aStack.append(self.myLeft[aNode])
+        return sorted(aResult)
+
+    # Item with the box nearest to thePoint and the distance to it, (-1, inf) if there are no items.
+    # Nodes are visited best-first, so the search stops as soon as no node can be closer
+    def Nearest(self, thePoint):
+        aPoint = np.asarray(thePoint, dtype=np.float64)
+        aBestItem, aBestDistance = -1, np.inf
+        aHeap = [(0.0, 0)] if len(self.myNodeMins) else []
+        while aHeap:
+            aDistance, aNode = heapq.heappop(aHeap)
+            if aDistance >= aBestDistance:
+                break
+            if self.myLeft[aNode] < 0:
+                anItems = self.LeafItems(aNode)
+                aDistances = PointBoxes(aPoint, self.myItemMins[anItems], self.myItemMaxs[anItems])
+                i = np.argmin(aDistances)
+                if aDistances[i] < aBestDistance:
+                    aBestItem, aBestDistance = int(anItems[i]), float(aDistances[i])
+            else:
+                for aChild in (self.myLeft[aNode], self.myRight[aNode]):
+                    heapq.heappush(aHeap, (float(PointBoxes(aPoint, self.myNodeMins[aChild], self.myNodeMaxs[aChild])),
+                                           int(aChild)))
+        return aBestItem, aBestDistance
+
+    # Updates boxes of theItems and refits only the nodes above them, keeping the tree structure.
+    # Nodes are refitted in decreasing index order, i.e. children before their parents
+    def Refit(self, theItems, theMins, theMaxs):
+        theItems = np.asarray(theItems, dtype=np.int64)
+        self.myItemMins[theItems] = theMins
+        self.myItemMaxs[theItems] = theMaxs
+
+        aDirty = set(self.myItemLeaves[theItems].tolist())
+        aHeap = [-aNode for aNode in aDirty]
+        heapq.heapify(aHeap)
+        while aHeap:
+            aNode = -heapq.heappop(aHeap)
+            if self.myLeft[aNode] < 0:
+                anItems = self.LeafItems(aNode)
+                self.myNodeMins[aNode] = self.myItemMins[anItems].min(axis=0)
+                self.myNodeMaxs[aNode] = self.myItemMaxs[anItems].max(axis=0)
+            else:
+                aChildren = [self.myLeft[aNode], self.myRight[aNode]]
+                self.myNodeMins[aNode] = self.myNodeMins[aChildren].min(axis=0)
+                self.myNodeMaxs[aNode] = self.myNodeMaxs[aChildren].max(axis=0)
+
+            aParent = self.myParents[aNode]
+            if aParent >= 0 and aParent not in aDirty:
+                aDirty.add(aParent)
+                heapq.heappush(aHeap, -aParent)
+
+
+# Local bounding boxes of parts indexed by SGE id of theIndex, inf for elements without B-Rep
+def PartBoxes(theIndex: OccurrenceIndex):
+    aMins = np.full((len(theIndex.mySGEs), 3), np.inf)
+    aMaxs = np.full((len(theIndex.mySGEs), 3), -np.inf)
+    for anId in np.unique(theIndex.mySGEIds[theIndex.myTypes == PART]):
+        aBRep = cadex.ModelData_Part.Cast(theIndex.mySGEs[anId]).BRepRepresentation()
+        if aBRep:
+            aBox = cadex.ModelData_Box()
+            cadex.ModelAlgo_BoundingBox.Compute(aBRep, aBox)
+            aMin, aMax = aBox.MinCorner(), aBox.MaxCorner()
+            aMins[anId] = (aMin.X(), aMin.Y(), aMin.Z())
+            aMaxs[anId] = (aMax.X(), aMax.Y(), aMax.Z())
+    return aMins, aMaxs
+
+# BVH over world boxes of part occurrences of an OccurrenceIndex. Queries return occurrence rows.
+# Part boxes are computed once per unique part and moved by occurrence world transformations
+class AssemblyBVH:
+    def __init__(self, theIndex: OccurrenceIndex, theSGEMins: np.ndarray, theSGEMaxs: np.ndarray,
+                 theLeafSize: int = 4):
+        self.myIndex = theIndex
+        self.myLocals = theIndex.LocalMatrices()
+        self.myWorlds = theIndex.WorldMatrices()
+
+        # Rows stay sorted, so the part occurrences of a subtree are a contiguous range of items
+        aRows = np.flatnonzero(theIndex.myTypes == PART)
+        self.myRows = aRows[np.isfinite(theSGEMins[theIndex.mySGEIds[aRows]]).all(axis=1)]
+        self.myLocalMins = theSGEMins[theIndex.mySGEIds[self.myRows]]
+        self.myLocalMaxs = theSGEMaxs[theIndex.mySGEIds[self.myRows]]
+
+        self.myBVH = OccurrenceBVH(theLeafSize)
+        self.myBVH.Build(*TransformBoxes(self.myLocalMins, self.myLocalMaxs, self.myWorlds[self.myRows]))
+
+    # Replaces the transformation of occurrence theRow (relative to its parent) and refits
+    # the boxes of part occurrences below it. Returns the number of moved part occurrences
+    def SetTransformation(self, theRow: int, theMatrix: np.ndarray) -> int:
+        return self.SetRowTransformations([theRow], theMatrix)
+
+    # Replaces the transformation of the scene graph element theSGEId (an instance) in all its
+    # occurrences, as changing the instance in the model would. Returns the number of moved part occurrences
+    def SetSGETransformation(self, theSGEId: int, theMatrix: np.ndarray) -> int:
+        return self.SetRowTransformations(np.flatnonzero(self.myIndex.mySGEIds == theSGEId), theMatrix)
+
+    # Sets theMatrix as the local transformation of theRows, recomputes world transformations
+    # of their subtrees level by level and refits the boxes of part occurrences in them
+    def SetRowTransformations(self, theRows, theMatrix: np.ndarray) -> int:
+        theRows = np.asarray(theRows, dtype=np.int64)
+        if not len(theRows):
+            return 0
+        self.myLocals[theRows] = theMatrix
+
+        anEnds = self.myIndex.mySubtreeEnds[theRows]
+        aSubtrees = np.unique(np.concatenate([np.arange(r, e) for r, e in zip(theRows, anEnds)]))
+        aDepths = self.myIndex.myDepths[aSubtrees]
+        for aDepth in np.unique(aDepths):
+            aRows = aSubtrees[aDepths == aDepth]
+            aParents = self.myIndex.myParents[aRows]
+            aWorlds = self.myLocals[aRows]
+            aHasParent = aParents >= 0
+            aWorlds[aHasParent] = np.matmul(self.myWorlds[aParents[aHasParent]], aWorlds[aHasParent])
+            self.myWorlds[aRows] = aWorlds
+
+        # Part occurrences of each subtree are a contiguous range of items
+        aFirsts = np.searchsorted(self.myRows, theRows)
+        aLasts = np.searchsorted(self.myRows, anEnds)
+        anItems = np.unique(np.concatenate([np.arange(f, l) for f, l in zip(aFirsts, aLasts)]))
+        if len(anItems):
+            self.myBVH.Refit(anItems, *TransformBoxes(self.myLocalMins[anItems], self.myLocalMaxs[anItems],
+                                                      self.myWorlds[self.myRows[anItems]]))
+        return len(anItems)
+
+    def Overlap(self, theMin, theMax) -> np.ndarray:
+        return self.myRows[self.myBVH.Overlap(theMin, theMax)]
+
+    def Ray(self, theOrigin, theDirection, theMaxDistance: float = np.inf) -> list:
+        return [(t, int(self.myRows[i])) for t, i in self.myBVH.Ray(theOrigin, theDirection, theMaxDistance)]
+
+    def Nearest(self, thePoint):
+        anItem, aDistance = self.myBVH.Nearest(thePoint)
+        return (int(self.myRows[anItem]) if anItem >= 0 else -1), aDistance
+
+    def Bounds(self):
+        if not len(self.myBVH.myNodeMins):
+            return np.zeros(3), np.zeros(3)
+        return self.myBVH.myNodeMins[0], self.myBVH.myNodeMaxs[0]
+
+
+def main(theSource: str):
+    aKey = license.Value()
+
+    if not cadex.LicenseManager.Activate(aKey):
+        print("Failed to activate CAD Exchanger license.")
+        return 1
+
+    aModel = cadex.ModelData_Model()
+
+    if not cadex.ModelData_ModelReader().Read(cadex.Base_UTF16String(theSource), aModel):
+        print("Failed to read the file " + theSource)
+        return 1
+
+    anIndex = OccurrenceIndex()
+    anIndex.Build(aModel)
+
+    aStart = time.perf_counter()
+    aBVH = AssemblyBVH(anIndex, *PartBoxes(anIndex))
+    print(f"BVH of {len(aBVH.myRows)} part occurrences ({len(aBVH.myBVH.myNodeMins)} nodes) "
+          f"built in {time.perf_counter() - aStart:.4f} s")
+
+    def Name(theRow: int) -> str:
+        return anIndex.myNames[anIndex.myNameIds[theRow]] or "noName"
+
+    aMin, aMax = aBVH.Bounds()
+    aCenter, anExtent = (aMin + aMax) / 2, (aMax - aMin) / 2
+    print(f"Assembly box: {aMin} - {aMax}")
+
+    # Box around the center, half the size of the assembly box
+    aRows = aBVH.Overlap(aCenter - anExtent / 2, aCenter + anExtent / 2)
+    print(f"Part occurrences overlapping the central box: {', '.join(Name(r) for r in aRows)}")
+
+    # Ray along the box diagonal
+    aHits = aBVH.Ray(aMin - anExtent, aMax - aMin)
+    print(f"Part occurrences hit by the diagonal ray: {', '.join(f'{Name(r)} (t = {t:.3f})' for t, r in aHits)}")
+
+    aRow, aDistance = aBVH.Nearest(aMax + anExtent)
+    if aRow >= 0:
+        print(f"Part occurrence nearest to {aMax + anExtent}: {Name(aRow)} at {aDistance}")
+
+    # Move the first instance having parts in its subtree away, in all its occurrences, and refit the BVH
+    for anInstanceRow in np.flatnonzero(anIndex.myTypes == INSTANCE):
+        aMatrix = aBVH.myLocals[anInstanceRow].copy()
+        aMatrix[:3, 3] += 4 * anExtent
+        aStart = time.perf_counter()
+        aNumberOfMoved = aBVH.SetSGETransformation(anIndex.mySGEIds[anInstanceRow], aMatrix)
+        if aNumberOfMoved:
+            print(f"Moved {aNumberOfMoved} part occurrences of instance {Name(anInstanceRow)}, "
+                  f"refit in {time.perf_counter() - aStart:.4f} s")
+            aMin, aMax = aBVH.Bounds()
+            print(f"Assembly box after the move: {aMin} - {aMax}")
+            break
+
+    print("Completed")
+    return 0
+
+if __name__ == "__main__":
+    if len(sys.argv) != 2:
+        print("Usage: " + os.path.abspath(Path(__file__).resolve()) + " <input_file>, where:")
+        print("    <input_file>  is a name of the XML file to be read")
+        sys.exit(1)
+
+    aSource = os.path.abspath(sys.argv[1])
+    sys.exit(main(aSource))
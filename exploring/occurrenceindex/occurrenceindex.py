@@ -0,0 +1,273 @@
+#!/usr/bin/env python3
+
+# $Id$
+
+# Copyright (C) 2008-2014, Roman Lygin. All rights reserved.
+# Copyright (C) 2014-2022, CADEX. All rights reserved.
+
+# This file is part of the CAD Exchanger software.
+
+# You may use this file under the terms of the BSD license as follows:
+
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+# * Redistributions of source code must retain the above copyright notice,
+# this list of conditions and the following disclaimer.
+# * Redistributions in binary form must reproduce the above copyright notice,
+# this list of conditions and the following disclaimer in the documentation
+# and/or other materials provided with the distribution.
+
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+
+
+import sys
+from pathlib import Path
+import os
+import time
+
+import numpy as np
+
+import cadexchanger.CadExCore as cadex
+
+sys.path.append(os.path.abspath(os.path.dirname(Path(__file__).resolve()) + "/../../"))
+import cadex_license as license
+sys.path.append(os.path.abspath(os.path.dirname(Path(__file__).resolve()) + "/../common"))
+from matrices import TransformationMatrix
+
+
+PART, ASSEMBLY, INSTANCE = 0, 1, 2
+
+TYPE_NAMES = ("Part", "Assembly", "Instance")
+
+
+# Expanded scene graph stored as a structure of arrays, one row per occurrence.
+# Rows are in depth-first pre-order, so parents precede their children and the subtree of
+# row i occupies rows [i, mySubtreeEnds[i]). Columns:
+#   myParents       - row of the parent occurrence, -1 for roots
+#   mySGEIds        - index into mySGEs (unique scene graph elements)
+#   myDepths        - nesting level, 0 for roots
+#   myNameIds       - index into myNames (interned element names)
+#   myTransformIds  - index into myTransforms for instances with a transformation, -1 otherwise
+#   myTypes         - PART, ASSEMBLY or INSTANCE
+#   mySubtreeEnds   - row following the last row of the subtree
+# The index is built with a single traversal; queries run on the arrays without the SDK.
+class OccurrenceIndex:
+    def __init__(self):
+        self.mySGEs = []
+        self.myNames = []
+        self.myTransforms = np.empty((0, 4, 4))
+        self.myParents = np.empty(0, dtype=np.int32)
+        self.mySGEIds = np.empty(0, dtype=np.int32)
+        self.myDepths = np.empty(0, dtype=np.int16)
+        self.myNameIds = np.empty(0, dtype=np.int32)
+        self.myTransformIds = np.empty(0, dtype=np.int32)
+        self.myTypes = np.empty(0, dtype=np.int8)
+        self.mySubtreeEnds = np.empty(0, dtype=np.int32)
+
+    def __len__(self):
+        return len(self.myParents)
+
+    def Build(self, theModel: cadex.ModelData_Model):
+        aTypes = {cadex.ModelData_Part.GetTypeId(): PART,
+                  cadex.ModelData_Assembly.GetTypeId(): ASSEMBLY,
+                  cadex.ModelData_Instance.GetTypeId(): INSTANCE}
+        aSGEIds, aNameIds, anAttributes = {}, {}, {}
+        aTransforms = []
+        aChildren = {}
+
+        aParents, aSGERows, aDepths, aNames, aTrsfRows, aTypeRows, anEnds = [], [], [], [], [], [], []
+
+        # Explicit stack of (element, parent row, depth); None marks the end of a subtree
+        aStack = [(aRoot, -1, 0) for aRoot in reversed(list(cadex.ModelData_Model_ElementIterator(theModel)))]
+        anOpen = []
+        while aStack:
+            anItem = aStack.pop()
+            if anItem is None:
+                anEnds[anOpen.pop()] = len(aParents)
+                continue
+            aSGE, aParent, aDepth = anItem
+
+            anId = aSGEIds.get(aSGE)
+            if anId is None:
+                anId = len(self.mySGEs)
+                aSGEIds[aSGE] = anId
+                self.mySGEs.append(aSGE)
+
+                aType = aTypes.get(aSGE.TypeId(), -1)
+                aName = str(aSGE.Name())
+                aNameId = aNameIds.setdefault(aName, len(aNameIds))
+                if aNameId == len(self.myNames):
+                    self.myNames.append(aName)
+
+                aTrsfId = -1
+                if aType == INSTANCE:
+                    anInstance = cadex.ModelData_Instance.Cast(aSGE)
+                    if anInstance.HasTransformation():
+                        aTrsfId = len(aTransforms)
+                        aTransforms.append(TransformationMatrix(anInstance.Transformation()))
+                    aReference = anInstance.Reference()
+                    aChildren[anId] = [aReference] if aReference else []
+                elif aType == ASSEMBLY:
+                    aChildren[anId] = list(cadex.ModelData_Model_ElementIterator(cadex.ModelData_Assembly.Cast(aSGE)))
+                else:
+                    aChildren[anId] = []
+                anAttributes[anId] = (aType, aNameId, aTrsfId)
+
+            aType, aNameId, aTrsfId = anAttributes[anId]
+            aRow = len(aParents)
+            aParents.append(aParent)
+            aSGERows.append(anId)
+            aDepths.append(aDepth)
+            aNames.append(aNameId)
+            aTrsfRows.append(aTrsfId)
+            aTypeRows.append(aType)
+            anEnds.append(aRow + 1)
+
+            if aChildren[anId]:
+                anOpen.append(aRow)
+                aStack.append(None)
+                aStack.extend((aChild, aRow, aDepth + 1) for aChild in reversed(aChildren[anId]))
+
+        self.myTransforms = np.array(aTransforms).reshape(-1, 4, 4)
+        self.myParents = np.array(aParents, dtype=np.int32)
+        self.mySGEIds = np.array(aSGERows, dtype=np.int32)
+        self.myDepths = np.array(aDepths, dtype=np.int16)
+        self.myNameIds = np.array(aNames, dtype=np.int32)
+        self.myTransformIds = np.array(aTrsfRows, dtype=np.int32)
+        self.myTypes = np.array(aTypeRows, dtype=np.int8)
+        self.mySubtreeEnds = np.array(anEnds, dtype=np.int32)
+
+    # Number of occurrences of each unique element of theType, indexed by SGE id
+    def Counts(self, theType: int = PART) -> np.ndarray:
+        return np.bincount(self.mySGEIds[self.myTypes == theType], minlength=len(self.mySGEs))
+
+    # Same totals as exploring/BOM: (name, type, count) for parts and assemblies
+    def BOM(self) -> list:
+        aCounts = self.Counts(PART) + self.Counts(ASSEMBLY)
+        aTypes = np.empty(len(self.mySGEs), dtype=np.int8)
+        aTypes[self.mySGEIds] = self.myTypes
+        aNameIds = np.empty(len(self.mySGEs), dtype=np.int32)
+        aNameIds[self.mySGEIds] = self.myNameIds
+        return [(self.myNames[aNameIds[i]], TYPE_NAMES[aTypes[i]], int(aCounts[i]))
+                for i in np.flatnonzero(aCounts)]
+
+    # Matrices of all occurrences relative to their parents, identity for non-instances
+    def LocalMatrices(self) -> np.ndarray:
+        return np.concatenate((np.identity(4)[np.newaxis], self.myTransforms))[self.myTransformIds + 1]
+
+    # World matrices of all occurrences, composed level by level with batched np.matmul
+    def WorldMatrices(self) -> np.ndarray:
+        aLocals = self.LocalMatrices()
+        aWorlds = aLocals.copy()
+        for aDepth in range(1, int(self.myDepths.max(initial=0)) + 1):
+            aRows = np.flatnonzero(self.myDepths == aDepth)
+            aWorlds[aRows] = np.matmul(aWorlds[self.myParents[aRows]], aLocals[aRows])
+        return aWorlds
+
+    # Rows of part occurrences with their world matrices
+    def PartOccurrences(self):
+        aRows = np.flatnonzero(self.myTypes == PART)
+        return aRows, self.WorldMatrices()[aRows]
+
+    # Rows of occurrences of elements named theName
+    def Find(self, theName: str) -> np.ndarray:
+        try:
+            aNameId = self.myNames.index(theName)
+        except ValueError:
+            return np.empty(0, dtype=np.int64)
+        return np.flatnonzero(self.myNameIds == aNameId)
+
+    def Subtree(self, theRow: int) -> np.ndarray:
+        return np.arange(theRow, self.mySubtreeEnds[theRow])
+
+    # Rows of the instance path from the root down to theRow
+    def Path(self, theRow: int) -> list:
+        aPath = []
+        while theRow >= 0:
+            aPath.append(int(theRow))
+            theRow = self.myParents[theRow]
+        return aPath[::-1]
+
+    # Mask of occurrences that remain after removing the subtrees of theRows
+    def Without(self, theRows) -> np.ndarray:
+        aDelta = np.zeros(len(self) + 1, dtype=np.int32)
+        np.add.at(aDelta, np.asarray(theRows), 1)
+        np.add.at(aDelta, self.mySubtreeEnds[theRows], -1)
+        return np.cumsum(aDelta[:-1]) == 0
+
+    def Save(self, thePath: str):
+        np.savez(thePath, parents=self.myParents, sge_ids=self.mySGEIds, depths=self.myDepths,
+                 name_ids=self.myNameIds, transform_ids=self.myTransformIds, types=self.myTypes,
+                 subtree_ends=self.mySubtreeEnds, transforms=self.myTransforms,
+                 names=np.array(self.myNames, dtype=str))
+
+    def PrintSummary(self):
+        print(f"{len(self)} occurrences of {len(self.mySGEs)} unique elements, "
+              f"{len(self.myNames)} unique names, {len(self.myTransforms)} transformations, "
+              f"depth {int(self.myDepths.max(initial=0))}")
+        for aType in (PART, ASSEMBLY, INSTANCE):
+            print(f"    {TYPE_NAMES[aType]}: {int(np.count_nonzero(self.myTypes == aType))}")
+
+
+def main(theSource: str, theOutput: str = None):
+    aKey = license.Value()
+
+    if not cadex.LicenseManager.Activate(aKey):
+        print("Failed to activate CAD Exchanger license.")
+        return 1
+
+    aModel = cadex.ModelData_Model()
+
+    if not cadex.ModelData_ModelReader().Read(cadex.Base_UTF16String(theSource), aModel):
+        print("Failed to read the file " + theSource)
+        return 1
+
+    aStart = time.perf_counter()
+    anIndex = OccurrenceIndex()
+    anIndex.Build(aModel)
+    print(f"Index built in {time.perf_counter() - aStart:.4f} s")
+    anIndex.PrintSummary()
+
+    aStart = time.perf_counter()
+    aBOM = anIndex.BOM()
+    aRows, aMatrices = anIndex.PartOccurrences()
+    print(f"BOM and world transformations computed in {time.perf_counter() - aStart:.4f} s")
+
+    aMargin = max((len(aName) for aName, _, _ in aBOM), default=0)
+    print("Total:")
+    print("\t" + "name".ljust(aMargin) + " | " + "type".ljust(aMargin) + " | count")
+    for aName, aType, aCount in aBOM:
+        print("\t" + aName.ljust(aMargin) + " | " + aType.ljust(aMargin) + " | " + str(aCount))
+
+    print("Part occurrences:")
+    for aRow, aMatrix in zip(aRows, aMatrices):
+        aName = anIndex.myNames[anIndex.myNameIds[aRow]] or "noName"
+        print(f"\t{aName} at depth {anIndex.myDepths[aRow]} has world translation {aMatrix[:3, 3]}")
+
+    if theOutput:
+        anIndex.Save(theOutput)
+
+    print("Completed")
+    return 0
+
+if __name__ == "__main__":
+    if len(sys.argv) != 2 and len(sys.argv) != 3:
+        print("Usage: " + os.path.abspath(Path(__file__).resolve()) + " <input_file> [<output_file>], where:")
+        print("    <input_file>  is a name of the XML file to be read")
+        print("    <output_file> is a name of the .npz file to save the index to")
+        sys.exit(1)
+
+    aSource = os.path.abspath(sys.argv[1])
+    anOutput = os.path.abspath(sys.argv[2]) if len(sys.argv) == 3 else None
+    sys.exit(main(aSource, anOutput))
@@ -39,14 +39,22 @@ import cadexchanger.CadExSTEP as step
 
 sys.path.append(os.path.abspath(os.path.dirname(Path(__file__).resolve()) + "/../../"))
 import cadex_license as license
+sys.path.append(os.path.abspath(os.path.dirname(Path(__file__).resolve()) + "/../common"))
+from outputbackend import OUTPUT_FORMATS, OutputBackend, TextOutput, CreateOutput
 
 class TabulatedOutput:
     myNestingLevel = 0
+    myOutput = TextOutput()
+
+    @classmethod
+    def SetOutput(cls, theOutput: OutputBackend):
+        cls.myOutput = theOutput
 
     @classmethod
     def WriteLine(cls, theObject: str):
         cls.PrintTabulation()
-        print(theObject)
+        cls.myOutput.Write(theObject)
+        cls.myOutput.NewLine()
 
     @classmethod
     def IncreaseIndent(cls):
@@ -61,14 +69,16 @@ class TabulatedOutput:
         if cls.myNestingLevel <= 0:
             return
         # Emulate tabulation like tree.
+        aPrefix = ""
         for i in range(cls.myNestingLevel - 1):
             if i < 2 or i == 3:
-                print("|  ", end="")
+                aPrefix += "|  "
             else:
-                print("   ", end="")
-        print("|__", end="")
+                aPrefix += "   "
+        aPrefix += "|__"
         if cls.myNestingLevel > 3:
-            print(" ", end="")
+            aPrefix += " "
+        cls.myOutput.Indent(cls.myNestingLevel, aPrefix)
 
 
 class SceneGraphVisitor(cadex.ModelData_Model_ElementVisitor):
@@ -256,7 +266,9 @@ class PMIOutlineVisitor(cadex.ModelData_PMIOutlineVisitor):
     def VisitLeaveCompositeOutline(self, theOutline: cadex.ModelData_PMICompositeOutline):
         TabulatedOutput.DecreaseIndent()
 
-def main(theSource: str):
+# theFormat selects the output backend: "text", "jsonl" or "null",
+# theOutput is a file to write to instead of the standard output
+def main(theSource: str, theFormat: str = "text", theOutput: str = None):
     aKey = license.Value()
 
     if not cadex.LicenseManager.Activate(aKey):
@@ -274,18 +286,35 @@ def main(theSource: str):
         print("Failed to open and convert the file ", theSource)
         return 1
 
+    aStream = open(theOutput, "w", encoding="utf-8") if theOutput else None
+    anOutput = CreateOutput(theFormat, aStream)
+    TabulatedOutput.SetOutput(anOutput)
+
     # Create a PMI visitor
     aVisitor = SceneGraphVisitor()
     aModel.AcceptElementVisitor(aVisitor)
 
-    print("Completed")
+    anOutput.Flush()
+    if aStream:
+        aStream.close()
+
+    # JSON Lines on the standard output must stay parseable, so the status goes to stderr there
+    print("Completed", file=sys.stderr if theFormat == "jsonl" and not theOutput else sys.stdout)
     return 0
 
 if __name__ == "__main__":
-    if len(sys.argv) != 2:
+    anOptions = sys.argv[2:]
+    anIsOutput = 2 <= len(anOptions) <= 3 and anOptions[0] == "--format" and anOptions[1] in OUTPUT_FORMATS
+    if len(sys.argv) < 2 or (anOptions and not anIsOutput):
+        print("Usage: " + os.path.abspath(Path(__file__).resolve()) +
+              " <input_file> [--format text|jsonl|null [<output_file>]], where:")
         print("    <input_file>  is a name of the STEP file to be read")
+        print("    --format      writes PMI as text (default), as JSON Lines records or discards it")
+        print("    <output_file> is a name of the file to write PMI to, standard output by default")
         sys.exit()
 
     aSource = os.path.abspath(sys.argv[1])
+    aFormat = anOptions[1] if anIsOutput else "text"
+    anOutput = os.path.abspath(anOptions[2]) if anIsOutput and len(anOptions) == 3 else None
 
-    sys.exit(main(aSource))
+    sys.exit(main(aSource, aFormat, anOutput))
@@ -34,6 +34,8 @@ import sys
 from pathlib import Path
 import os
 
+import numpy as np
+
 import cadexchanger.CadExCore as cadex
 
 sys.path.append(os.path.abspath(os.path.dirname(Path(__file__).resolve()) + "/../../"))
@@ -126,7 +128,103 @@ class PartPolyVisitor(cadex.ModelData_Model_VoidElementVisitor):
                     aColor = theTS.VertexColor(i, j)
 
 
-def main(theSource: str):
+# Extracts an IndexedTriangleSet into contiguous NumPy arrays in one pass without printing:
+#   "coordinates" (V, 3) float64 vertices of the set in their stored order
+#   "indices"     (F, 3) int32 indices of triangle vertices into "coordinates" as stored in the set
+#   "normals"     (F, 3, 3) float32, "uv" (F, 3, 2) float32, "colors" (F, 3, 4) float32 per triangle corner,
+#                 present only if the set has them
+# Every vertex is read once, so vertices at the same position (e.g. on a seam, with different
+# normals or UV coordinates) stay apart. The SDK is still queried per vertex and triangle corner,
+# but every attribute is checked once per set and the values go straight into the arrays
+def TriangleSetArrays(theTS: cadex.ModelData_IndexedTriangleSet) -> dict:
+    n = theTS.NumberOfFaces()
+    aCorners = [(i, j) for i in range(n) for j in range(3)]
+
+    aCoordinate = theTS.Coordinate
+    aCoords = np.array([(p.X(), p.Y(), p.Z()) for p in (aCoordinate(i) for i in range(theTS.NumberOfVertices()))],
+                       dtype=np.float64).reshape(-1, 3)
+    aCoordinateIndex = theTS.CoordinateIndex
+    anIndices = np.array([aCoordinateIndex(i, j) for i, j in aCorners], dtype=np.int32).reshape(n, 3)
+    anArrays = {"coordinates": aCoords, "indices": anIndices}
+
+    if theTS.HasNormals():
+        aNormal = theTS.VertexNormal
+        anArrays["normals"] = np.array([(v.X(), v.Y(), v.Z()) for v in (aNormal(i, j) for i, j in aCorners)],
+                                       dtype=np.float32).reshape(n, 3, 3)
+    if theTS.HasUVCoordinates():
+        anUV = theTS.UVCoordinate
+        anArrays["uv"] = np.array([(p.X(), p.Y()) for p in (anUV(i, j) for i, j in aCorners)],
+                                  dtype=np.float32).reshape(n, 3, 2)
+    if theTS.HasColors():
+        aColor = theTS.VertexColor
+        anArrays["colors"] = np.array([(c.R(), c.G(), c.B(), c.A()) for c in (aColor(i, j) for i, j in aCorners)],
+                                      dtype=np.float32).reshape(n, 3, 4)
+    return anArrays
+
+# Extracts a PolyLineSet into a flat vertex buffer in CSR layout:
+#   "coordinates" (N, 3) vertices of all polylines one after another
+#   "offsets"     (L + 1,) int64, vertices of polyline i are coordinates[offsets[i]:offsets[i + 1]]
+def PolyLineSetArrays(thePLS: cadex.ModelData_PolyLineSet, theDType=np.float64) -> dict:
+    n = thePLS.NumberOfPolyLines()
+    aNumberOfVertices = thePLS.NumberOfVertices
+    anOffsets = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum([aNumberOfVertices(i) for i in range(n)], out=anOffsets[1:])
+
+    aCoordinate = thePLS.Coordinate
+    aCoords = np.array([(p.X(), p.Y(), p.Z()) for p in (aCoordinate(i, j)
+                        for i in range(n) for j in range(anOffsets[i + 1] - anOffsets[i]))],
+                       dtype=theDType).reshape(-1, 3)
+    return {"coordinates": aCoords, "offsets": anOffsets}
+
+# Extracts a PolyPointSet into a (N, 3) "coordinates" array
+def PolyPointSetArrays(thePS: cadex.ModelData_PolyPointSet, theDType=np.float64) -> dict:
+    aCoordinate = thePS.Coordinate
+    aCoords = np.array([(p.X(), p.Y(), p.Z()) for p in (aCoordinate(i) for i in range(thePS.NumberOfVertices()))],
+                       dtype=theDType).reshape(-1, 3)
+    return {"coordinates": aCoords}
+
+# Gathers arrays of all poly vertex sets of all parts instead of printing them
+class PartPolyArrayVisitor(cadex.ModelData_Model_VoidElementVisitor):
+    def __init__(self):
+        super().__init__()
+        # Lists of (part name, PolyShape index, arrays)
+        self.myTriangleSets = []
+        self.myPolyLineSets = []
+        self.myPolyPointSets = []
+
+    def VisitPart(self, thePart: cadex.ModelData_Part):
+        aPolyRep = thePart.PolyRepresentation(cadex.ModelData_RM_Poly)
+        if not aPolyRep:
+            return
+        for i, aPVS in enumerate(aPolyRep.Get()):
+            if aPVS.TypeId() == cadex.ModelData_IndexedTriangleSet.GetTypeId():
+                anITS = cadex.ModelData_IndexedTriangleSet.Cast(aPVS)
+                self.myTriangleSets.append((str(thePart.Name()), i, TriangleSetArrays(anITS)))
+            elif aPVS.TypeId() == cadex.ModelData_PolyLineSet.GetTypeId():
+                aPLS = cadex.ModelData_PolyLineSet.Cast(aPVS)
+                self.myPolyLineSets.append((str(thePart.Name()), i, PolyLineSetArrays(aPLS)))
+            elif aPVS.TypeId() == cadex.ModelData_PolyPointSet.GetTypeId():
+                aPPS = cadex.ModelData_PolyPointSet.Cast(aPVS)
+                self.myPolyPointSets.append((str(thePart.Name()), i, PolyPointSetArrays(aPPS)))
+
+    def PrintSummary(self):
+        aNumberOfTriangles = 0
+        for aName, i, anArrays in self.myTriangleSets:
+            aNumberOfTriangles += len(anArrays["indices"])
+            anAttributes = ", ".join(aKey for aKey in ("normals", "uv", "colors") if aKey in anArrays)
+            print(f"Part {aName or 'noname'}, PolyShape {i}: {len(anArrays['indices'])} triangles, "
+                  f"{len(anArrays['coordinates'])} vertices" + (f", {anAttributes}" if anAttributes else ""))
+        for aName, i, anArrays in self.myPolyLineSets:
+            print(f"Part {aName or 'noname'}, PolyShape {i}: {len(anArrays['offsets']) - 1} polylines, "
+                  f"{len(anArrays['coordinates'])} vertices")
+        for aName, i, anArrays in self.myPolyPointSets:
+            print(f"Part {aName or 'noname'}, PolyShape {i}: {len(anArrays['coordinates'])} points")
+
+        print(f"Total: {len(self.myTriangleSets)} triangle sets, {aNumberOfTriangles} triangles, "
+              f"{len(self.myPolyLineSets)} polyline sets, {len(self.myPolyPointSets)} point sets")
+
+
+def main(theSource: str, theUseArrays: bool = False):
     aKey = license.Value()
 
     if not cadex.LicenseManager.Activate(aKey):
@@ -147,17 +245,23 @@ def main(theSource: str):
     aMesher.Compute(aModel)
 
     # Explore Poly representation of model parts
-    aVisitor = PartPolyVisitor()
-    aModel.AcceptElementVisitor(aVisitor)
+    if theUseArrays:
+        aVisitor = PartPolyArrayVisitor()
+        aModel.AcceptElementVisitor(aVisitor)
+        aVisitor.PrintSummary()
+    else:
+        aVisitor = PartPolyVisitor()
+        aModel.AcceptElementVisitor(aVisitor)
 
     print("Completed")
     return 0
 
 if __name__ == "__main__":
-    if len(sys.argv) != 2:
-        print("Usage: " + os.path.abspath(Path(__file__).resolve()) + " <input_file>, where:")
+    if len(sys.argv) != 2 and (len(sys.argv) != 3 or sys.argv[2] != "--arrays"):
+        print("Usage: " + os.path.abspath(Path(__file__).resolve()) + " <input_file> [--arrays], where:")
         print("    <input_file>  is a name of the XML file to be read")
+        print("    --arrays      extracts poly data into NumPy arrays instead of printing it")
         sys.exit(1)
 
     aSource = os.path.abspath(sys.argv[1])
-    sys.exit(main(aSource))
+    sys.exit(main(aSource, len(sys.argv) == 3))
@@ -0,0 +1,252 @@
+#!/usr/bin/env python3
+
+# $Id$
+
+# Copyright (C) 2008-2014, Roman Lygin. All rights reserved.
+# Copyright (C) 2014-2022, CADEX. All rights reserved.
+
+# This file is part of the CAD Exchanger software.
+
+# You may use this file under the terms of the BSD license as follows:
+
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+# * Redistributions of source code must retain the above copyright notice,
+# this list of conditions and the following disclaimer.
+# * Redistributions in binary form must reproduce the above copyright notice,
+# this list of conditions and the following disclaimer in the documentation
+# and/or other materials provided with the distribution.
+
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+
+
+import sys
+from pathlib import Path
+import os
+import re
+
+import numpy as np
+
+import cadexchanger.CadExCore as cadex
+
+sys.path.append(os.path.abspath(os.path.dirname(Path(__file__).resolve()) + "/../../"))
+import cadex_license as license
+
+
+# Packs a list of index lists into CSR form: row i is theIndices[theOffsets[i]:theOffsets[i + 1]]
+def CSR(theLists: list):
+    anOffsets = np.zeros(len(theLists) + 1, dtype=np.int64)
+    np.cumsum([len(aList) for aList in theLists], out=anOffsets[1:])
+    anIndices = np.fromiter((i for aList in theLists for i in aList), dtype=np.int32, count=anOffsets[-1])
+    return anOffsets, anIndices
+
+# Transposes a CSR relation of theNumberOfRows rows into theNumberOfColumns rows
+def TransposeCSR(theOffsets: np.ndarray, theIndices: np.ndarray, theNumberOfColumns: int):
+    aRows = np.repeat(np.arange(len(theOffsets) - 1, dtype=np.int32), np.diff(theOffsets))
+    anOrder = np.argsort(theIndices, kind="stable")
+    anOffsets = np.zeros(theNumberOfColumns + 1, dtype=np.int64)
+    np.cumsum(np.bincount(theIndices, minlength=theNumberOfColumns), out=anOffsets[1:])
+    return anOffsets, aRows[anOrder]
+
+# Face-edge-vertex adjacency of a B-Rep representation in CSR arrays.
+# Shapes get ids in order of discovery; myFaces, myEdges and myVertices map ids back to shapes.
+# The representation is walked once, after that adjacency queries are array lookups:
+#   myFaceEdgeOffsets, myFaceEdges       - edges bounding each face, a seam edge is listed twice
+#   myEdgeVertexOffsets, myEdgeVertices  - vertices of each edge
+#   myEdgeFaceOffsets, myEdgeFaces       - faces using each edge (transpose of face->edges),
+#                                          the face of a seam edge is listed twice
+class TopologyGraph:
+    def __init__(self):
+        self.myFaces = []
+        self.myEdges = []
+        self.myVertices = []
+        self.myFaceEdgeOffsets, self.myFaceEdges = CSR([])
+        self.myEdgeVertexOffsets, self.myEdgeVertices = CSR([])
+        self.myEdgeFaceOffsets, self.myEdgeFaces = CSR([])
+
+    # Returns the id of theShape, registering it in theShapes if it is met for the first time
+    @staticmethod
+    def ShapeId(theShape: cadex.ModelData_Shape, theIds: dict, theShapes: list) -> int:
+        anId = theIds.get(theShape)
+        if anId is None:
+            anId = len(theShapes)
+            theIds[theShape] = anId
+            theShapes.append(theShape)
+        return anId
+
+    def Build(self, theBRep: cadex.ModelData_BRepRepresentation):
+        aFaceIds, anEdgeIds, aVertexIds = {}, {}, {}
+        aFaceEdges, anEdgeVertices = [], []
+
+        def EdgeId(theEdge: cadex.ModelData_Shape) -> int:
+            anId = self.ShapeId(theEdge, anEdgeIds, self.myEdges)
+            if anId == len(anEdgeVertices):
+                aVertices = []
+                for aVertex in cadex.ModelData_Shape_Iterator(theEdge, cadex.ModelData_ST_Vertex):
+                    aVertexId = self.ShapeId(aVertex, aVertexIds, self.myVertices)
+                    if aVertexId not in aVertices:
+                        aVertices.append(aVertexId)
+                anEdgeVertices.append(aVertices)
+            return anId
+
+        for aBody in theBRep.Get():
+            for aFace in cadex.ModelData_Shape_Iterator(aBody, cadex.ModelData_ST_Face):
+                if self.ShapeId(aFace, aFaceIds, self.myFaces) < len(aFaceEdges):
+                    continue
+                # Seam edges are met twice, with both orientations, and both uses are kept
+                # so that a seam counts as a manifold edge rather than a boundary one
+                anEdges = cadex.ModelData_Shape_Iterator(aFace, cadex.ModelData_ST_Edge)
+                aFaceEdges.append([EdgeId(anEdge) for anEdge in anEdges])
+
+            # Free edges of wireframe bodies don't bound any face
+            for anEdge in cadex.ModelData_Shape_Iterator(aBody, cadex.ModelData_ST_Edge):
+                EdgeId(anEdge)
+
+        self.myFaceEdgeOffsets, self.myFaceEdges = CSR(aFaceEdges)
+        self.myEdgeVertexOffsets, self.myEdgeVertices = CSR(anEdgeVertices)
+        self.myEdgeFaceOffsets, self.myEdgeFaces = TransposeCSR(self.myFaceEdgeOffsets, self.myFaceEdges,
+                                                                len(self.myEdges))
+
+    def NumberOfFaces(self) -> int:
+        return len(self.myFaceEdgeOffsets) - 1
+
+    def NumberOfEdges(self) -> int:
+        return len(self.myEdgeVertexOffsets) - 1
+
+    def NumberOfVertices(self) -> int:
+        return int(self.myEdgeVertices.max(initial=-1)) + 1
+
+    def FaceEdges(self, theFace: int) -> np.ndarray:
+        return self.myFaceEdges[self.myFaceEdgeOffsets[theFace]:self.myFaceEdgeOffsets[theFace + 1]]
+
+    def EdgeVertices(self, theEdge: int) -> np.ndarray:
+        return self.myEdgeVertices[self.myEdgeVertexOffsets[theEdge]:self.myEdgeVertexOffsets[theEdge + 1]]
+
+    def EdgeFaces(self, theEdge: int) -> np.ndarray:
+        return self.myEdgeFaces[self.myEdgeFaceOffsets[theEdge]:self.myEdgeFaceOffsets[theEdge + 1]]
+
+    # Faces sharing at least one edge with theFace
+    def AdjacentFaces(self, theFace: int) -> np.ndarray:
+        anEdges = self.FaceEdges(theFace)
+        aFaces = np.concatenate([self.EdgeFaces(anEdge) for anEdge in anEdges]) if len(anEdges) else anEdges
+        return np.setdiff1d(aFaces, [theFace])
+
+    # Number of face uses of each edge: 0 for free edges, 1 for boundary (open) edges,
+    # 2 for manifold edges (including seams used twice by one face) and more for non-manifold ones
+    def EdgeValences(self) -> np.ndarray:
+        return np.diff(self.myEdgeFaceOffsets)
+
+    # Mask of seam edges, i.e. edges whose both uses belong to the same face
+    def SeamEdges(self) -> np.ndarray:
+        aManifold = self.EdgeValences() == 2
+        aFirst = self.myEdgeFaceOffsets[:-1][aManifold]
+        aSeams = np.zeros(self.NumberOfEdges(), dtype=bool)
+        aSeams[aManifold] = self.myEdgeFaces[aFirst] == self.myEdgeFaces[aFirst + 1]
+        return aSeams
+
+    def Save(self, thePath: str):
+        np.savez(thePath,
+                 face_edge_offsets=self.myFaceEdgeOffsets, face_edges=self.myFaceEdges,
+                 edge_vertex_offsets=self.myEdgeVertexOffsets, edge_vertices=self.myEdgeVertices,
+                 edge_face_offsets=self.myEdgeFaceOffsets, edge_faces=self.myEdgeFaces)
+
+    # Restores the arrays saved by Save(); shape lists are left empty
+    @classmethod
+    def Load(cls, thePath: str):
+        aGraph = cls()
+        with np.load(thePath) as anArrays:
+            aGraph.myFaceEdgeOffsets, aGraph.myFaceEdges = anArrays["face_edge_offsets"], anArrays["face_edges"]
+            aGraph.myEdgeVertexOffsets, aGraph.myEdgeVertices = anArrays["edge_vertex_offsets"], anArrays["edge_vertices"]
+            aGraph.myEdgeFaceOffsets, aGraph.myEdgeFaces = anArrays["edge_face_offsets"], anArrays["edge_faces"]
+        return aGraph
+
+    def PrintSummary(self):
+        aValences = self.EdgeValences()
+        print(f"    {self.NumberOfFaces()} faces, {self.NumberOfEdges()} edges, {self.NumberOfVertices()} vertices")
+        print(f"    free edges: {int(np.count_nonzero(aValences == 0))}, "
+              f"boundary edges: {int(np.count_nonzero(aValences == 1))}, "
+              f"seam edges: {int(np.count_nonzero(self.SeamEdges()))}, "
+              f"non-manifold edges: {int(np.count_nonzero(aValences > 2))}")
+
+
+# Keeps one topology graph per part, so that repeated queries don't walk the B-Rep again
+class TopologyGraphCache:
+    def __init__(self):
+        self.myGraphs = {}
+
+    def Get(self, thePart: cadex.ModelData_Part) -> TopologyGraph:
+        aGraph = self.myGraphs.get(thePart)
+        if aGraph is None:
+            aGraph = TopologyGraph()
+            aBRep = thePart.BRepRepresentation()
+            if aBRep:
+                aGraph.Build(aBRep)
+            self.myGraphs[thePart] = aGraph
+        return aGraph
+
+
+class PartTopologyVisitor(cadex.ModelData_Model_VoidElementVisitor):
+    def __init__(self, theCache: TopologyGraphCache, theOutputDir: str = None):
+        super().__init__()
+        self.myCache = theCache
+        self.myOutputDir = theOutputDir
+
+    def VisitPart(self, thePart: cadex.ModelData_Part):
+        if thePart in self.myCache.myGraphs or not thePart.BRepRepresentation():
+            return
+
+        aGraph = self.myCache.Get(thePart)
+        aName = str(thePart.Name()) or "noName"
+        print(f"Part {aName}:")
+        aGraph.PrintSummary()
+
+        if self.myOutputDir:
+            # Part names may contain path separators and other characters not allowed in file names
+            aFileName = re.sub(r"[^\w.-]", "_", aName)
+            aGraph.Save(os.path.join(self.myOutputDir, f"{len(self.myCache.myGraphs)}_{aFileName}.npz"))
+
+
+def main(theSource: str, theOutputDir: str = None):
+    aKey = license.Value()
+
+    if not cadex.LicenseManager.Activate(aKey):
+        print("Failed to activate CAD Exchanger license.")
+        return 1
+
+    aModel = cadex.ModelData_Model()
+
+    if not cadex.ModelData_ModelReader().Read(cadex.Base_UTF16String(theSource), aModel):
+        print("Failed to read the file " + theSource)
+        return 1
+
+    if theOutputDir:
+        os.makedirs(theOutputDir, exist_ok=True)
+
+    # Each unique part is walked once even if it is instanced many times
+    aVisitor = PartTopologyVisitor(TopologyGraphCache(), theOutputDir)
+    aModel.AcceptElementVisitor(aVisitor)
+
+    print("Completed")
+    return 0
+
+if __name__ == "__main__":
+    if len(sys.argv) != 2 and len(sys.argv) != 3:
+        print("Usage: " + os.path.abspath(Path(__file__).resolve()) + " <input_file> [<output_dir>], where:")
+        print("    <input_file>  is a name of the XML file to be read")
+        print("    <output_dir>  is a name of the directory to save topology graphs of parts to as .npz files")
+        sys.exit(1)
+
+    aSource = os.path.abspath(sys.argv[1])
+    anOutputDir = os.path.abspath(sys.argv[2]) if len(sys.argv) == 3 else None
+    sys.exit(main(aSource, anOutputDir))
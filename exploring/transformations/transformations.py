@@ -34,10 +34,14 @@ import sys
 from pathlib import Path
 import os
 
+import numpy as np
+
 import cadexchanger.CadExCore as cadex
 
 sys.path.append(os.path.abspath(os.path.dirname(Path(__file__).resolve()) + "/../../"))
 import cadex_license as license
+sys.path.append(os.path.abspath(os.path.dirname(Path(__file__).resolve()) + "/../common"))
+from matrices import TransformationMatrix
 
 
 class InstancesTransformationsVisitor(cadex.ModelData_Model_VoidElementVisitor):
@@ -75,7 +79,113 @@ class InstancesTransformationsVisitor(cadex.ModelData_Model_VoidElementVisitor):
         self.myTransformationMatrix.pop()
 
 
-def main(theSource):
+# Computes world transformations of all part occurrences at once.
+# The scene graph is expanded breadth-first one instance level at a time. Local matrices
+# are read from the SDK once per unique instance and all occurrences of a level are composed
+# with their parents by a single batched np.matmul instead of one Multiplied() call per node.
+# After Compute():
+#   myMatrices        - (N, 4, 4) world matrices of part occurrences
+#   myPartIds         - (N,) indices into myParts
+#   myInstancePaths   - (N, depth) indices into myInstances from the root down, padded with -1
+class WorldTransformTable:
+    def __init__(self):
+        self.myParts = []
+        self.myInstances = []
+        self.myPartIndices = {}
+        self.myInstanceIndices = {}
+        # Local matrices of myInstances, the array grows by doubling so that every level of
+        # Compute() gathers its matrices with a single fancy index instead of restacking them
+        self.myLocalMatrices = np.empty((16, 4, 4))
+        self.myMatrices = np.empty((0, 4, 4))
+        self.myPartIds = np.empty(0, dtype=np.int64)
+        self.myInstancePaths = np.empty((0, 0), dtype=np.int64)
+
+    def PartIndex(self, thePart: cadex.ModelData_Part) -> int:
+        anIndex = self.myPartIndices.get(thePart)
+        if anIndex is None:
+            anIndex = len(self.myParts)
+            self.myPartIndices[thePart] = anIndex
+            self.myParts.append(thePart)
+        return anIndex
+
+    def InstanceIndex(self, theInstance: cadex.ModelData_Instance) -> int:
+        anIndex = self.myInstanceIndices.get(theInstance)
+        if anIndex is None:
+            anIndex = len(self.myInstances)
+            self.myInstanceIndices[theInstance] = anIndex
+            self.myInstances.append(theInstance)
+            if anIndex == len(self.myLocalMatrices):
+                self.myLocalMatrices = np.concatenate((self.myLocalMatrices, np.empty_like(self.myLocalMatrices)))
+            if theInstance.HasTransformation():
+                self.myLocalMatrices[anIndex] = TransformationMatrix(theInstance.Transformation())
+            else:
+                self.myLocalMatrices[anIndex] = np.identity(4)
+        return anIndex
+
+    def Compute(self, theModel: cadex.ModelData_Model):
+        aPartType = cadex.ModelData_Part.GetTypeId()
+        anAssemblyType = cadex.ModelData_Assembly.GetTypeId()
+        anInstanceType = cadex.ModelData_Instance.GetTypeId()
+
+        aMatrices, aPartIds, aPaths = [], [], []
+
+        # Level frontier: elements with the row of their world matrix and the instance path
+        aLevelMatrices = np.identity(4)[np.newaxis]
+        aFrontier = [(aRoot, 0, ()) for aRoot in cadex.ModelData_Model_ElementIterator(theModel)]
+        while aFrontier:
+            anOccurrenceRows, anOccurrenceParts = [], []
+            aParentRows, anInstanceIds, aChildren = [], [], []
+            for aSGE, aRow, aPath in aFrontier:
+                aType = aSGE.TypeId()
+                if aType == aPartType:
+                    anOccurrenceRows.append(aRow)
+                    anOccurrenceParts.append(self.PartIndex(cadex.ModelData_Part.Cast(aSGE)))
+                    aPaths.append(aPath)
+                elif aType == anAssemblyType:
+                    for aChild in cadex.ModelData_Model_ElementIterator(cadex.ModelData_Assembly.Cast(aSGE)):
+                        anInstance = cadex.ModelData_Instance.Cast(aChild)
+                        anInstanceIds.append(self.InstanceIndex(anInstance))
+                        aParentRows.append(aRow)
+                        aChildren.append((anInstance.Reference(), aPath))
+                elif aType == anInstanceType:
+                    anInstance = cadex.ModelData_Instance.Cast(aSGE)
+                    anInstanceIds.append(self.InstanceIndex(anInstance))
+                    aParentRows.append(aRow)
+                    aChildren.append((anInstance.Reference(), aPath))
+
+            if anOccurrenceRows:
+                aMatrices.append(aLevelMatrices[anOccurrenceRows])
+                aPartIds.extend(anOccurrenceParts)
+
+            if not anInstanceIds:
+                break
+
+            aLevelMatrices = np.matmul(aLevelMatrices[aParentRows], self.myLocalMatrices[anInstanceIds])
+            aFrontier = [(aReference, i, aPath + (anInstanceIds[i],))
+                         for i, (aReference, aPath) in enumerate(aChildren) if aReference]
+
+        if aMatrices:
+            self.myMatrices = np.concatenate(aMatrices)
+        self.myPartIds = np.asarray(aPartIds, dtype=np.int64)
+        aDepth = max((len(aPath) for aPath in aPaths), default=0)
+        self.myInstancePaths = np.full((len(aPaths), aDepth), -1, dtype=np.int64)
+        for i, aPath in enumerate(aPaths):
+            self.myInstancePaths[i, :len(aPath)] = aPath
+
+    def Save(self, thePath: str):
+        np.savez(thePath, matrices=self.myMatrices, part_ids=self.myPartIds,
+                 instance_paths=self.myInstancePaths,
+                 part_names=np.array([str(aPart.Name()) for aPart in self.myParts], dtype=str))
+
+    def PrintSummary(self):
+        print(f"{len(self.myMatrices)} part occurrences of {len(self.myParts)} unique parts "
+              f"through {len(self.myInstances)} unique instances")
+        for aPartId, aMatrix in zip(self.myPartIds, self.myMatrices):
+            aName = str(self.myParts[aPartId].Name()) or "noName"
+            print(f"Part {aName} has world translation {aMatrix[:3, 3]}")
+
+
+def main(theSource, theUseTable=False, theOutput=None):
     aKey = license.Value()
 
     if not cadex.LicenseManager.Activate(aKey):
@@ -88,18 +198,29 @@ def main(theSource):
         print("Failed to read the file " + theSource)
         return 1
 
-    # Visitor to check and print transformations of instances
-    aVisitor = InstancesTransformationsVisitor()
-    aModel.AcceptElementVisitor(aVisitor)
+    if theUseTable:
+        aTable = WorldTransformTable()
+        aTable.Compute(aModel)
+        if theOutput:
+            aTable.Save(theOutput)
+        else:
+            aTable.PrintSummary()
+    else:
+        # Visitor to check and print transformations of instances
+        aVisitor = InstancesTransformationsVisitor()
+        aModel.AcceptElementVisitor(aVisitor)
 
     print("Completed")
     return 0
 
 if __name__ == "__main__":
-    if len(sys.argv) != 2:
-        print("Usage: " + os.path.abspath(Path(__file__).resolve()) + " <input_file>, where:")
+    if len(sys.argv) < 2 or len(sys.argv) > 4 or (len(sys.argv) > 2 and sys.argv[2] != "--table"):
+        print("Usage: " + os.path.abspath(Path(__file__).resolve()) + " <input_file> [--table [<output_file>]], where:")
         print("    <input_file>  is a name of the XML file to be read")
+        print("    --table       computes world transformations of all part occurrences as NumPy arrays")
+        print("    <output_file> is a name of the .npz file to save the table to")
         sys.exit(1)
 
     aSource = os.path.abspath(sys.argv[1])
-    sys.exit(main(aSource))
+    anOutput = os.path.abspath(sys.argv[3]) if len(sys.argv) == 4 else None
+    sys.exit(main(aSource, len(sys.argv) > 2, anOutput))
@@ -35,10 +35,11 @@ from pathlib import Path
 import os
 
 import cadexchanger.CadExCore as cadex
-import cadexchanger.CadExACIS as acis
 
 sys.path.append(os.path.abspath(os.path.dirname(Path(__file__).resolve()) + "/../../"))
 import cadex_license as license
+sys.path.append(os.path.abspath(os.path.dirname(Path(__file__).resolve()) + "/../../conversion/common"))
+from formatregistry import FormatRegistry
 
 
 class ProgressBarObserver(cadex.Base_ProgressStatus_Observer):
@@ -52,6 +53,11 @@ class ProgressBarObserver(cadex.Base_ProgressStatus_Observer):
         print(f"{theInfo.Value()}: complete!")
 
 def main(theSource: str):
+    if not FormatRegistry.IsSupported(theSource):
+        print(f"Unsupported format of the file {theSource}, supported extensions are: "
+              + ", ".join(sorted(FormatRegistry.myFormats)))
+        return 1
+
     aKey = license.Value()
 
     if not cadex.LicenseManager.Activate(aKey):
@@ -69,7 +75,7 @@ def main(theSource: str):
 
         with cadex.Base_ProgressScope(aStatus) as aTopScope:                         # The top scope occupies the whole progress status range
             with cadex.Base_ProgressScope(aTopScope, 40) as aReaderScope:            # 40% of TopScope for file importing
-                aReader = acis.ACIS_Reader()
+                aReader = FormatRegistry.Reader(theSource)                           # ACIS_Reader for SAT files
                 aReader.SetProgressStatus(aStatus)                                   # Connect progress status object
 
                 if not aStatus.WasCanceled():
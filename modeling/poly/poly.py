@@ -34,6 +34,8 @@ import sys
 from pathlib import Path
 import os
 
+import numpy as np
+
 import cadexchanger.CadExCore as cadex
 
 sys.path.append(os.path.abspath(os.path.dirname(Path(__file__).resolve()) + "/../../"))
@@ -130,7 +132,69 @@ def CreateITS() -> cadex.ModelData_IndexedTriangleSet:
     anITS.AddColors(aColors, aColorIndices, aCounts)
     return anITS
 
-def main():
+# Creates ITS from NumPy arrays or any array-like objects, checking them first:
+#   theCoords (V, 3) floats, theIndices flat vertex indices, theCounts number of vertices of each face,
+#   theNormals (N, 3) floats and theColors (C, 3) 0-255 integers with their own flat indices.
+# Sizes and index ranges are validated before anything is created (ValueError otherwise).
+# This is a convenience for array input, not a faster path: AddCoordinates(), AddNormals() and
+# AddColors() take lists of ModelData_Point, ModelData_Vectorf and ModelData_Color, so a wrapper
+# object is still created per element and the cost grows with the number of elements as in CreateITS()
+def CreateCheckedITS(theCoords, theIndices, theCounts, theNormals=None, theNormalIndices=None,
+                         theColors=None, theColorIndices=None) -> cadex.ModelData_IndexedTriangleSet:
+    aCoords = np.asarray(theCoords, dtype=np.float64).reshape(-1, 3)
+    aCounts = np.asarray(theCounts, dtype=np.int32).ravel()
+    aNumberOfCorners = int(aCounts.sum())
+
+    def Indices(theName: str, theValues, theNumberOfValues: int) -> list:
+        anIndices = np.asarray(theValues, dtype=np.int32).ravel()
+        if len(anIndices) != aNumberOfCorners:
+            raise ValueError(f"{theName} has {len(anIndices)} indices while the faces have {aNumberOfCorners} vertices")
+        if len(anIndices) and (anIndices.min() < 0 or anIndices.max() >= theNumberOfValues):
+            raise ValueError(f"{theName} refers outside of its {theNumberOfValues} values")
+        return anIndices.tolist()
+
+    if (theNormals is None) != (theNormalIndices is None):
+        raise ValueError("theNormals and theNormalIndices must be given together")
+    if (theColors is None) != (theColorIndices is None):
+        raise ValueError("theColors and theColorIndices must be given together")
+
+    anIndices = Indices("theIndices", theIndices, len(aCoords))
+    if theNormals is not None:
+        aNormals = np.asarray(theNormals, dtype=np.float32).reshape(-1, 3)
+        aNormalIndices = Indices("theNormalIndices", theNormalIndices, len(aNormals))
+    if theColors is not None:
+        aColors = np.asarray(theColors, dtype=np.int32).reshape(-1, 3)
+        aColorIndices = Indices("theColorIndices", theColorIndices, len(aColors))
+
+    aCounts = aCounts.tolist()
+    anITS = cadex.ModelData_IndexedTriangleSet()
+    aPoints = list(map(cadex.ModelData_Point, *aCoords.T.tolist()))
+    anITS.AddCoordinates(aPoints, anIndices, aCounts)
+
+    if theNormals is not None:
+        aVectors = list(map(cadex.ModelData_Vectorf, *aNormals.T.tolist()))
+        anITS.AddNormals(aVectors, aNormalIndices, aCounts)
+
+    if theColors is not None:
+        aColorObjects = list(map(cadex.ModelData_Color, *aColors.T.tolist()))
+        anITS.AddColors(aColorObjects, aColorIndices, aCounts)
+
+    return anITS
+
+# Creates the same cube as CreateITS() from arrays, e.g. produced by a simulation
+def CreateITSFromArrays() -> cadex.ModelData_IndexedTriangleSet:
+    aCoords = np.array([[ 1.0,  1.0,  1.0], [-1.0,  1.0,  1.0], [-1.0, -1.0,  1.0], [ 1.0, -1.0,  1.0],
+                        [ 1.0,  1.0, -1.0], [-1.0,  1.0, -1.0], [-1.0, -1.0, -1.0], [ 1.0, -1.0, -1.0]])
+    aVerticesIndices = np.array([0, 1, 2, 3, 1, 0, 4, 5, 2, 1, 5, 6, 3, 2, 6, 7, 0, 3, 7, 4, 7, 6, 5, 4])
+    aCounts = np.full(6, 4)
+    aNormals = np.array([[0, 0, 1], [0, 1, 0], [-1, 0, 0], [0, -1, 0], [1, 0, 0], [0, 0, -1]])
+    aColors = np.array([[255, 0, 0], [0, 255, 0], [0, 0, 255], [255, 255, 0], [0, 255, 255], [255, 255, 255]])
+    # Every face has a single normal and color
+    aFaceIndices = np.repeat(np.arange(6), 4)
+
+    return CreateCheckedITS(aCoords, aVerticesIndices, aCounts, aNormals, aFaceIndices, aColors, aFaceIndices)
+
+def main(theUseArrays: bool = False):
     aKey = license.Value()
 
     if not cadex.LicenseManager.Activate(aKey):
@@ -143,7 +207,7 @@ def main():
     aPLS = CreatePolyLineSet()
 
     # Create IndexedTriangleSet and explore it
-    anITS = CreateITS()
+    anITS = CreateITSFromArrays() if theUseArrays else CreateITS()
 
     aPolyWithPPS = cadex.ModelData_PolyRepresentation(aPPS)
     aPolyWithPLS = cadex.ModelData_PolyRepresentation(aPLS)
@@ -163,4 +227,9 @@ def main():
     return 0
 
 if __name__ == "__main__":
-    sys.exit(main())
+    if len(sys.argv) > 2 or (len(sys.argv) == 2 and sys.argv[1] != "--arrays"):
+        print("Usage: " + os.path.abspath(Path(__file__).resolve()) + " [--arrays], where:")
+        print("    --arrays      creates the IndexedTriangleSet from NumPy arrays")
+        sys.exit(1)
+
+    sys.exit(main(len(sys.argv) == 2))